@@ -7,12 +7,54 @@ Simplified version with database connection pooling
 import os
 import json
 import asyncio
+import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, NamedTuple, Tuple
 from datetime import datetime
 import asyncpg
 
+log = logging.getLogger(__name__)
+
+class TracebackSampler(logging.Filter):
+    """Keep full tracebacks for the first `limit` errors, then log only the exception type and message"""
+
+    def __init__(self, limit: int = 5):
+        super().__init__()
+        self.limit = limit
+        self.seen = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.exc_info and record.exc_info[1] is not None:
+            self.seen += 1
+            if self.seen > self.limit:
+                exc = record.exc_info[1]
+                record.msg = f"{record.getMessage()} [{type(exc).__name__}: {exc}]"
+                record.args = None
+                record.exc_info = None
+                record.exc_text = None
+        return True
+
+def configure_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Route log records through a queue so tasks never block on terminal I/O.
+    The caller must stop() the returned listener to flush pending records.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+
+    root = logging.getLogger()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(TracebackSampler(int(os.getenv("EVAL_TRACEBACK_LIMIT", "5"))))
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+    listener.start()
+    return listener
+
 # JSON encoder for datetime objects
 class DateTimeEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -20,19 +62,50 @@ class DateTimeEncoder(json.JSONEncoder):
             return obj.isoformat()
         return super(DateTimeEncoder, self).default(obj)
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import aiofiles
+except ImportError:  # aiofiles is optional; fall back to a worker thread
+    aiofiles = None
+
+async def _write_bytes_async(path: Path, payload: bytes) -> None:
+    """Write a file without blocking the event loop"""
+    if aiofiles is not None:
+        async with aiofiles.open(path, "wb") as f:
+            await f.write(payload)
+    else:
+        await asyncio.to_thread(path.write_bytes, payload)
+
+def _dump_json_bytes(data: Any) -> bytes:
+    """Serialize evaluation data to indented JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, cls=DateTimeEncoder).encode()
+
 from pydantic_ai import Agent
-from core.models import Intent, ComprehensiveAnalysis, Assessment, Recommendation, LLMAnalysis, EvaluationResult
+from pydantic_ai.exceptions import ModelHTTPError
+from core.models import Intent, ComprehensiveAnalysis, Assessment, Recommendation, LLMAnalysis, EvaluationResult, EVALUATION_RESULT_ADAPTER
 from core.agents import (
     intent_agent, 
     sql_instructor_agent, 
     quality_assessor_agent
 )
-from utils.discovery import MetadataExtractor, detect_sql_patterns
+from utils.discovery import MetadataExtractor, detect_sql_patterns, iter_sql_files
 from utils.cache import (
     _is_cached_valid, 
     _get_cache_path, 
     _load_cached_result, 
-    _save_cached_result
+    _save_cached_result,
+    _get_content_key,
+    _load_content_cached,
+    _save_content_cached,
+    _open_stat_index,
+    _lookup_stat_key,
+    _record_stat_key
 )
 
 from repositories.sql_file_repository import SQLFileRepository
@@ -46,12 +119,171 @@ from database.tables import EvaluationBase
 from config import ProjectFolderConfig, EvaluationConfig
 
 
+# Bump whenever prompts or result schema change to invalidate cached evaluations
+PROMPT_VERSION = "1"
+
+# Rate-limited (HTTP 429) agent calls are retried with exponential backoff
+RATE_LIMIT_STATUS = 429
+RATE_LIMIT_RETRIES = 5
+
+# Shared instructions for output analysis. Kept byte-identical across calls
+# (no file-specific interpolation) so the provider's prompt cache can serve it.
+OUTPUT_ANALYSIS_RUBRIC = """
+        Analyze this SQL exercise and provide a structured evaluation with SPECIFIC, ACTIONABLE recommendations.
+        The exercise CONTEXT and SQL EXECUTION OUTPUT are given at the end of this message.
+
+        ANALYSIS REQUIREMENTS:
+
+        1. **TECHNICAL ANALYSIS**: Evaluate SQL syntax, performance, correctness
+        2. **EDUCATIONAL ANALYSIS**: Assess learning value, clarity, progression
+        3. **PATTERN ANALYSIS**: Review detected SQL patterns for quality and relevance
+        4. **RECOMMENDATIONS**: Provide 2-4 specific, actionable suggestions
+
+        RECOMMENDATION GUIDELINES:
+        - **BE SPECIFIC**: Instead of "add comments", say "Add a comment explaining why INNER JOIN is used here"
+        - **BE ACTIONABLE**: Provide clear implementation steps
+        - **BE CONTEXT-AWARE**: Consider the learner's level and exercise purpose
+        - **AVOID GENERICISM**: Don't repeat obvious suggestions across similar files
+        - **FOCUS ON LEARNING**: Prioritize educational value over technical perfection
+
+        PRIORITY CRITERIA:
+        - **HIGH**: Blocks learning, syntax errors, fundamental misunderstandings
+        - **MEDIUM**: Important improvements that enhance understanding
+        - **LOW**: Nice-to-have enhancements for advanced learners
+
+        Provide your analysis in this EXACT JSON structure:
+
+        {
+          "analysis": {
+            "overall_feedback": "comprehensive feedback combining technical and educational aspects",
+            "difficulty_level": "Beginner" | "Intermediate" | "Advanced" | "Expert",
+            "time_estimate": "estimated time like '5 min' or '10-15 min'",
+            "technical_reasoning": {
+              "score": 1-10,
+              "explanation": "detailed technical analysis",
+              "strengths": ["list", "of", "strengths"],
+              "weaknesses": ["list", "of", "weaknesses"],
+              "syntax_quality": "assessment of SQL syntax",
+              "performance_considerations": "performance analysis"
+            },
+            "educational_reasoning": {
+              "score": 1-10,
+              "explanation": "detailed educational analysis",
+              "learning_objectives": ["list", "of", "objectives"],
+              "skill_development": ["list", "of", "skills"],
+              "real_world_relevance": "real-world applicability",
+              "pedagogical_value": "teaching effectiveness assessment"
+            },
+            "detected_patterns": [
+              {
+                "name": "pattern_name_from_detected_list",
+                "confidence": 0.0-1.0,
+                "quality": "Excellent" | "Good" | "Fair" | "Poor",
+                "description": "brief pattern description"
+              }
+            ]
+          },
+          "assessment": {
+            "grade": "A" | "B" | "C" | "D" | "E" | "F",
+            "score": 1-10,
+            "overall_assessment": "PASS" | "FAIL" | "NEEDS_REVIEW"
+          },
+          "recommendations": [
+            {
+              "priority": "High" | "Medium" | "Low",
+              "implementation_effort": "Low" | "Medium" | "High",
+              "recommendation_text": "improvement suggestion"
+            }
+          ]
+        }
+
+        IMPORTANT GUIDELINES:
+        - Only include patterns from the detected list given in the CONTEXT below
+        - Use EXACT literal values for difficulty_level, quality, grade, overall_assessment, priority, implementation_effort
+        - Provide numeric scores as integers (1-10)
+        - Provide confidence as decimal (0.0-1.0)
+        - Focus on the actual SQL execution results shown below
+        - Make recommendations specific and actionable, not generic
+"""
+
+
+def _report_cached_tokens(result) -> None:
+    """Print how much of the prompt was served from the provider's prefix cache"""
+    try:
+        usage = result.usage()
+    except Exception:
+        return
+    details = getattr(usage, "details", None) or {}
+    cached = details.get("cached_tokens", getattr(usage, "cache_read_tokens", 0)) or 0
+    prompt_tokens = getattr(usage, "request_tokens", None) or getattr(usage, "input_tokens", 0) or 0
+    if prompt_tokens:
+        log.info("🧮 Prompt cache: %s/%s tokens cached (%.0f%%)", cached, prompt_tokens, 100 * cached / prompt_tokens)
+
+
+def _build_model(model_name: str, client):
+    """Wrap a pre-built AsyncOpenAI client into a pydantic-ai model"""
+    from pydantic_ai.models.openai import OpenAIModel
+    from pydantic_ai.providers.openai import OpenAIProvider
+    return OpenAIModel(model_name, provider=OpenAIProvider(openai_client=client))
+
+
+def create_openai_client():
+    """
+    Create a single AsyncOpenAI client for a whole evaluation run.
+    Uses the aiohttp transport when available, since httpx throughput
+    degrades as concurrency grows.
+    """
+    try:
+        from openai import AsyncOpenAI
+    except ImportError:
+        return None
+
+    try:
+        from openai import DefaultAioHttpClient
+        http_client = DefaultAioHttpClient()
+    except ImportError:
+        # Size the httpx pool so concurrent calls reuse warm keep-alive sockets
+        import httpx
+        from openai import DefaultAsyncHttpxClient
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=64)
+        )
+
+    return AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'), http_client=http_client)
+
+
+async def prewarm_openai_client(client) -> None:
+    """Open the TCP/TLS connection with a cheap call so the first evaluation doesn't pay for it"""
+    if client is None:
+        return
+    try:
+        await client.models.list()
+    except Exception as e:
+        log.warning("⚠️  OpenAI connection pre-warm failed: %s", e)
+
+
+class EvaluationOutcome(NamedTuple):
+    """Validated evaluation plus its already-serialized JSON payload"""
+    model: EvaluationResult
+    raw_json: bytes
+
+
 class SQLEvaluator:
     """AI-powered SQL evaluation system with database connection pooling"""
     
-    def __init__(self):
+    def __init__(self, client=None):
         self.model_name = os.getenv('MODEL_NAME', 'gpt-4o-mini')
 
+        # Optional pre-built AsyncOpenAI client shared across evaluations
+        self.client = client
+        self.model = _build_model(self.model_name, client) if client is not None else None
+
+        # Content-addressed result cache: unchanged files skip the LLM entirely
+        self.cache_enabled = EvaluationConfig().cache_enabled
+        self.cache_dir = ProjectFolderConfig().cache_dir
+        self.cache_hits = 0
+        self._stat_index = _open_stat_index(self.cache_dir) if self.cache_enabled else None
+
         self.agents = {
             "intent_analyst": intent_agent,
             "sql_instructor": sql_instructor_agent,
@@ -69,6 +301,9 @@ class SQLEvaluator:
         
         # Quests database: execution sandbox only, no schema needed
         self.sql_execution_manager = DatabaseManager(None, database_type="quests")
+        # Every file resets the one shared sandbox, so executions must not overlap;
+        # only the LLM calls run concurrently
+        self._sandbox_lock = asyncio.Lock()
     
     @property
     def intent_agent(self):
@@ -85,8 +320,26 @@ class SQLEvaluator:
         """Direct access to quality assessor agent for testing"""
         return self.agents["quality_assessor"]
     
+    async def _run_agent(self, agent_name: str, prompt: str, output_type, max_retries: int = RATE_LIMIT_RETRIES):
+        """Run an agent, retrying with exponential backoff while the provider rate limits"""
+        delay = 1.0
+        for attempt in range(max_retries + 1):
+            try:
+                return await self.agents[agent_name].run(prompt, output_type=output_type, model=self.model)
+            except ModelHTTPError as e:
+                if e.status_code != RATE_LIMIT_STATUS or attempt == max_retries:
+                    raise
+                log.warning("⏳ Rate limited in %s, retrying in %.0fs (attempt %s/%s)", agent_name, delay, attempt + 1, max_retries)
+                await asyncio.sleep(delay)
+                delay *= 2
+    
     async def analyze_sql_intent(self, sql_metadata: dict) -> Intent:
         """Analyze educational intent using OpenAI"""
+        intent, _ = await self._analyze_sql_intent(sql_metadata)
+        return intent
+    
+    async def _analyze_sql_intent(self, sql_metadata: dict) -> Tuple[Intent, bool]:
+        """Analyze educational intent, also reporting whether the LLM call succeeded"""
         
         quest_name=sql_metadata['quest_name']
         purpose=sql_metadata['purpose']
@@ -95,146 +348,90 @@ class SQLEvaluator:
         sql_content=sql_metadata['sql_content']
 
         prompt = f"""
-        Analyze this SQL exercise for educational intent:
-        
-        Quest: {quest_name}
-        Initial Purpose: {purpose}
-        Initial Concepts: {concepts}
-        Initial Difficulty: {difficulty}
+        Analyze this SQL exercise for educational intent.
         
         Note: The complete SQL code and execution results are available in the technical analysis phase.
-        Base your analysis on the metadata above and the educational context.
+        Base your analysis on the metadata below and the educational context.
         
         Provide a comprehensive analysis of the educational intent, including:
         - Detailed learning objectives
         - Educational context
         - Real-world applicability
         - Specific skills learners will develop
+        
+        Quest: {quest_name}
+        Initial Purpose: {purpose}
+        Initial Concepts: {concepts}
+        Initial Difficulty: {difficulty}
         """
         
         try:
-            result = await self.agents["intent_analyst"].run(prompt, output_type=Intent)
-            return result.output  # Extract the actual data from AgentRunResult
+            result = await self._run_agent("intent_analyst", prompt, Intent)
+            return result.output, True  # Extract the actual data from AgentRunResult
         except Exception as e:
-            print(f"Error in intent analysis: {e}")
+            log.warning("Error in intent analysis: %s", e)
             # Fallback
             return Intent(
                 detailed_purpose=purpose,
                 educational_context=f"SQL exercise in {quest_name}",
                 real_world_applicability="Database design and management",
                 specific_skills=concepts.split(", ")
-            )
+            ), False
     
     async def analyze_sql_output(self, quest_name: str,
                                 purpose: str, difficulty: str, concepts: str,
                                 output_content: str, sql_patterns: List[str]) -> LLMAnalysis:
         """Analyze SQL output using OpenAI"""
+        analysis, _ = await self._analyze_sql_output(
+            quest_name, purpose, difficulty, concepts, output_content, sql_patterns
+        )
+        return analysis
+    
+    async def _analyze_sql_output(self, quest_name: str,
+                                  purpose: str, difficulty: str, concepts: str,
+                                  output_content: str, sql_patterns: List[str]) -> Tuple[LLMAnalysis, bool]:
+        """Analyze SQL output, also reporting whether the LLM call succeeded"""
         
-        prompt = f"""
-        Analyze this SQL exercise and provide a structured evaluation with SPECIFIC, ACTIONABLE recommendations:
-
+        # Static rubric goes first so OpenAI can reuse the cached prefix across files;
+        # everything file-specific is appended at the end.
+        prompt = f"""{OUTPUT_ANALYSIS_RUBRIC}
         CONTEXT:
         Quest: {quest_name}
         Purpose: {purpose}
         Difficulty: {difficulty}
         Concepts: {concepts}
         SQL Patterns Detected: {', '.join(sql_patterns)}
+        Only include patterns from this list: {', '.join(sql_patterns)}
 
         SQL EXECUTION OUTPUT:
         {output_content}
-
-        ANALYSIS REQUIREMENTS:
-
-        1. **TECHNICAL ANALYSIS**: Evaluate SQL syntax, performance, correctness
-        2. **EDUCATIONAL ANALYSIS**: Assess learning value, clarity, progression
-        3. **PATTERN ANALYSIS**: Review detected SQL patterns for quality and relevance
-        4. **RECOMMENDATIONS**: Provide 2-4 specific, actionable suggestions
-
-        RECOMMENDATION GUIDELINES:
-        - **BE SPECIFIC**: Instead of "add comments", say "Add a comment explaining why INNER JOIN is used here"
-        - **BE ACTIONABLE**: Provide clear implementation steps
-        - **BE CONTEXT-AWARE**: Consider the learner's level and exercise purpose
-        - **AVOID GENERICISM**: Don't repeat obvious suggestions across similar files
-        - **FOCUS ON LEARNING**: Prioritize educational value over technical perfection
-
-        PRIORITY CRITERIA:
-        - **HIGH**: Blocks learning, syntax errors, fundamental misunderstandings
-        - **MEDIUM**: Important improvements that enhance understanding
-        - **LOW**: Nice-to-have enhancements for advanced learners
-
-        Provide your analysis in this EXACT JSON structure:
-
-        {{
-          "analysis": {{
-            "overall_feedback": "comprehensive feedback combining technical and educational aspects",
-            "difficulty_level": "Beginner" | "Intermediate" | "Advanced" | "Expert",
-            "time_estimate": "estimated time like '5 min' or '10-15 min'",
-            "technical_reasoning": {{
-              "score": 1-10,
-              "explanation": "detailed technical analysis",
-              "strengths": ["list", "of", "strengths"],
-              "weaknesses": ["list", "of", "weaknesses"],
-              "syntax_quality": "assessment of SQL syntax",
-              "performance_considerations": "performance analysis"
-            }},
-            "educational_reasoning": {{
-              "score": 1-10,
-              "explanation": "detailed educational analysis",
-              "learning_objectives": ["list", "of", "objectives"],
-              "skill_development": ["list", "of", "skills"],
-              "real_world_relevance": "real-world applicability",
-              "pedagogical_value": "teaching effectiveness assessment"
-            }},
-            "detected_patterns": [
-              {{
-                "name": "pattern_name_from_detected_list",
-                "confidence": 0.0-1.0,
-                "quality": "Excellent" | "Good" | "Fair" | "Poor",
-                "description": "brief pattern description"
-              }}
-            ]
-          }},
-          "assessment": {{
-            "grade": "A" | "B" | "C" | "D" | "E" | "F",
-            "score": 1-10,
-            "overall_assessment": "PASS" | "FAIL" | "NEEDS_REVIEW"
-          }},
-          "recommendations": [
-            {{
-              "priority": "High" | "Medium" | "Low",
-              "implementation_effort": "Low" | "Medium" | "High",
-              "recommendation_text": "improvement suggestion"
-            }}
-          ]
-        }}
-
-        IMPORTANT GUIDELINES:
-        - Only include patterns from this list: {', '.join(sql_patterns)}
-        - Use EXACT literal values for difficulty_level, quality, grade, overall_assessment, priority, implementation_effort
-        - Provide numeric scores as integers (1-10)
-        - Provide confidence as decimal (0.0-1.0)
-        - Focus on the actual SQL execution results shown above
-        - Make recommendations specific and actionable, not generic
         """
         
         try:
-            result = await self.agents["sql_instructor"].run(prompt, output_type=LLMAnalysis)
-            return result.output  # Extract the actual data from AgentRunResult
+            result = await self._run_agent("sql_instructor", prompt, LLMAnalysis)
+            _report_cached_tokens(result)
+            return result.output, True  # Extract the actual data from AgentRunResult
         except Exception as e:
-            print(f"Error in output analysis: {e}")
+            log.warning("Error in output analysis: %s", e)
             # Fallback with simplified structure - PRESERVE detected patterns
             from core.models import TechnicalReasoning, EducationalReasoning
             
             # Convert pattern names to SQLPatternDetection objects for the fallback
-            pattern_detections = []
-            for pattern_name in sql_patterns:
-                from core.models import SQLPatternDetection
-                pattern_detections.append(SQLPatternDetection(
-                    name=pattern_name,
-                    confidence=0.8,  # Default confidence for detected patterns
-                    quality="Good",  # Default quality 
-                    description=f"Pattern detected: {pattern_name}"
-                ))
+            # Validate one template, then copy it per pattern without re-validating
+            from core.models import SQLPatternDetection
+            template = SQLPatternDetection(
+                name="pattern",
+                confidence=0.8,  # Default confidence for detected patterns
+                quality="Good",  # Default quality 
+                description=None
+            )
+            pattern_detections = [
+                template.model_copy(update={
+                    "name": pattern_name,
+                    "description": f"Pattern detected: {pattern_name}"
+                })
+                for pattern_name in sql_patterns
+            ]
             
             return LLMAnalysis(
                 analysis=ComprehensiveAnalysis(
@@ -269,19 +466,20 @@ class SQLEvaluator:
                     recommendation_text="Analysis failed - manual review needed",
                     implementation_effort="High"
                 )]
-            )
+            ), False
     
-    async def execute_sql_file(self, file_path: Path) -> Dict[str, Any]:
-        """Execute SQL file using connection pool"""
+    async def execute_sql_file(self, file_path: Path, sql_content: Optional[str] = None) -> Dict[str, Any]:
+        """Execute SQL file using connection pool (sql_content skips re-reading the file)"""
         try:
-            # Clean up execution sandbox before running SQL file
-            self._cleanup_execution_sandbox()
-            
-            # Use the SQL execution manager (connects to quests database)
-            return await self.sql_execution_manager.execute_sql_file(str(file_path))
+            async with self._sandbox_lock:
+                # Clean up execution sandbox before running SQL file
+                self._cleanup_execution_sandbox()
+                
+                # Use the SQL execution manager (connects to quests database)
+                return await self.sql_execution_manager.execute_sql_file(str(file_path), sql_content)
             
         except Exception as e:
-            print(f"Error executing SQL file: {e}")
+            log.error("Error executing SQL file: %s", e)
             return {
                 "success": False,
                 "errors": 1,
@@ -299,20 +497,21 @@ class SQLEvaluator:
         """
         tables_dropped = self.sql_execution_manager.drop_all_tables()
         if tables_dropped > 0:
-            print(f"🧹 Cleaned up {tables_dropped} tables from execution sandbox")
+            log.info("🧹 Cleaned up %s tables from execution sandbox", tables_dropped)
         else:
-            print("🧹 Execution sandbox is already clean")
+            log.debug("🧹 Execution sandbox is already clean")
     
-    def parse_sql_file(self, file_path: Path) -> str:
-        """Parse SQL file content"""
+    def parse_sql_file(self, file_path: Path, sql_content: Optional[str] = None) -> str:
+        """Parse SQL file content (pass sql_content to reuse an earlier read)"""
         # Extract metadata
         quest_name = file_path.parts[-3] if len(file_path.parts) >= 3 else "unknown"
         filename = file_path.name
-        sql_content = file_path.read_text()
+        if sql_content is None:
+            sql_content = file_path.read_text()
 
         metadata = MetadataExtractor.parse_header(sql_content)
         if not metadata:
-            print(f"⚠️  No metadata found in {file_path}")
+            log.warning("⚠️  No metadata found in %s", file_path)
             metadata = {"quest": quest_name, "filename": filename}
 
         purpose = metadata.get("purpose", "No purpose defined")
@@ -329,15 +528,49 @@ class SQLEvaluator:
             "difficulty": difficulty
         }
     
-    async def evaluate_sql_file(self, file_path: Path) -> EvaluationResult:
-        """Evaluate a single SQL file"""
-        print(f"Evaluating: {file_path}")
+    async def evaluate_sql_file(self, file_path: Path, persist: bool = True) -> EvaluationResult:
+        """Evaluate a single SQL file (set persist=False to save it yourself)"""
+        outcome = await self.evaluate_sql_file_raw(file_path, persist=persist)
+        return outcome.model
+    
+    async def evaluate_sql_file_raw(self, file_path: Path, persist: bool = True) -> "EvaluationOutcome":
+        """Evaluate a single SQL file, also returning its serialized JSON for sidecar writes"""
+        log.info("Evaluating: %s", file_path)
+        
+        cache_version = f"{PROMPT_VERSION}:{self.model_name}"
+        
+        # Unchanged (mtime, size) maps straight to a content key: no read, no hash
+        file_stat = None
+        if self.cache_enabled:
+            file_stat = file_path.stat()
+            known_key = _lookup_stat_key(self._stat_index, file_path, file_stat, cache_version)
+            cached = _load_content_cached(self.cache_dir, known_key) if known_key else None
+            if cached is not None:
+                self.cache_hits += 1
+                log.info("📋 Cache hit for %s (unchanged)", file_path.name, extra={"cache_hit": True})
+                return await self._cached_outcome(file_path, cached, persist)
+        
+        # Read once: the same bytes feed the cache key and the prompt
+        file_bytes = file_path.read_bytes()
+        
+        # Short-circuit on byte-identical content evaluated with the same prompts
+        cache_key = None
+        if self.cache_enabled:
+            # The path is part of the key: prompts and metadata depend on the quest and file
+            content_version = f"{cache_version}:{self._normalize_lookup_path(file_path)}"
+            cache_key = _get_content_key(file_bytes, content_version)
+            cached = _load_content_cached(self.cache_dir, cache_key)
+            if cached is not None:
+                self.cache_hits += 1
+                _record_stat_key(self._stat_index, file_path, file_stat, cache_version, cache_key)
+                log.info("📋 Cache hit for %s", file_path.name, extra={"cache_hit": True})
+                return await self._cached_outcome(file_path, cached, persist)
         
         # Parse sql file
-        sql_context = self.parse_sql_file(file_path) 
+        sql_context = self.parse_sql_file(file_path, file_bytes.decode())
 
         # Execute SQL
-        execution_result = await self.execute_sql_file(file_path)        
+        execution_result = await self.execute_sql_file(file_path, sql_context["sql_content"])        
         sql_context["execution_result"] = execution_result
         sql_context["output_content"] = execution_result.get("output_content", "No output")
 
@@ -349,8 +582,8 @@ class SQLEvaluator:
         sql_context["pattern_names"] = pattern_names
 
         # Analyze with AI
-        sql_intent: Intent = await self.analyze_sql_intent(sql_context)
-        llm_analysis: LLMAnalysis = await self.analyze_sql_output(
+        sql_intent, intent_ok = await self._analyze_sql_intent(sql_context)
+        llm_analysis, analysis_ok = await self._analyze_sql_output(
             sql_context["quest_name"],
             sql_context["purpose"],
             sql_context["difficulty"],
@@ -359,10 +592,6 @@ class SQLEvaluator:
             sql_context["pattern_names"]
         )
 
-        # Create basic evaluation
-        score = llm_analysis.assessment.score
-        assessment = llm_analysis.assessment.overall_assessment
-        
         # Create execution result model
         from core.models import ExecutionResult
         execution_model = ExecutionResult(
@@ -377,104 +606,160 @@ class SQLEvaluator:
         
         # Create result
         result = EvaluationResult(
-            metadata={
-                "file": sql_context["filename"],
-                "quest": sql_context["quest_name"],
-                "full_path": str(file_path)
-            },
+            metadata=self._result_metadata(file_path),
             intent=sql_intent,
             execution=execution_model,
-            basic_evaluation={
-                "overall_assessment": assessment,
-                "score": score,
-                "pattern_analysis": f"Detected {len(sql_patterns)} SQL patterns",
-                "issues": "",
-                "recommendations": "Good example with room for improvement"
-            },
-            basic_analysis={
-                "correctness": "Output appears to execute successfully" if execution_result.get("success", False) else "Execution failed",
-                "completeness": f"Generated {execution_result.get('output_lines', 0)} lines of output with {execution_result.get('result_sets', 0)} result sets",
-                "learning_value": "Demonstrates intended SQL patterns",
-                "quality": "Output is clear and readable"
-            },
-            llm_analysis=llm_analysis,
-            enhanced_intent=sql_intent
+            llm_analysis=llm_analysis
         )
         
         # Persist to database
-        await self._save_to_database(file_path, result)
+        if persist:
+            await self._save_to_database(file_path, result)
         
-        return result
+        # Serialize once; the same bytes feed the cache and the JSON sidecar
+        raw_json = _dump_json_bytes(result.model_dump(mode="json"))
+        # Fallback analyses and failed runs may be transient, so they are never cached
+        if cache_key and intent_ok and analysis_ok and execution_model.success:
+            _save_content_cached(self.cache_dir, cache_key, raw_json)
+            _record_stat_key(self._stat_index, file_path, file_stat, cache_version, cache_key)
+        
+        return EvaluationOutcome(result, raw_json)
+    
+    @staticmethod
+    def _result_metadata(file_path: Path) -> Dict[str, Any]:
+        """File metadata stored with every evaluation result"""
+        return {
+            "file": file_path.name,
+            "quest": file_path.parts[-3] if len(file_path.parts) >= 3 else "unknown",
+            "full_path": str(file_path)
+        }
+    
+    async def _cached_outcome(self, file_path: Path, cached: bytes, persist: bool) -> "EvaluationOutcome":
+        """Rebuild a cached result for this file and persist it like a fresh evaluation"""
+        result = EVALUATION_RESULT_ADAPTER.validate_json(cached)
+        metadata = self._result_metadata(file_path)
+        if result.metadata != metadata:
+            result = result.model_copy(update={"metadata": metadata})
+            cached = _dump_json_bytes(result.model_dump(mode="json"))
+        if persist:
+            await self._save_to_database(file_path, result)
+        return EvaluationOutcome(result, cached)
     
     async def _save_to_database(self, file_path: Path, result: EvaluationResult):
+        """Save evaluation result to database without blocking the event loop"""
+        await asyncio.to_thread(self._save_to_database_sync, file_path, result)
+    
+    async def save_evaluations_to_db(self, items: List[tuple]):
+        """Save many (file_path, result) pairs in one session and one commit"""
+        if items:
+            await asyncio.to_thread(self._save_batch_to_database_sync, items)
+    
+    @staticmethod
+    def _normalize_lookup_path(file_path: Path) -> str:
+        """Normalize path for database lookup"""
+        # Database stores paths like: "quests/1-data-modeling/00-basic-concepts/01-basic-table-creation.sql"
+        file_path_str = str(file_path)
+        if "quests/" in file_path_str:
+            # Extract from "quests/" onwards (keep "quests/" prefix)
+            quests_index = file_path_str.find("quests/")
+            return file_path_str[quests_index:]
+        # If path doesn't contain quests/, assume it's already normalized
+        return file_path_str
+    
+    @staticmethod
+    def _build_evaluation_payload(lookup_path: str, result: EvaluationResult):
+        """Split a result into evaluation data and execution metadata for the repository"""
+        # Convert pydantic result to dict for database saving
+        evaluation_data = result.model_dump()
+        execution = evaluation_data.get('execution', {})
+        
+        # Add file_path to evaluation_data for the EvaluationRepository
+        evaluation_data['file_path'] = lookup_path
+        
+        # Extract execution metadata separately for proper database storage
+        execution_metadata = {
+            "execution_success": execution.get('success', False),
+            "execution_time_ms": execution.get('execution_time_ms'),
+            "output_lines": execution.get('output_lines', 0),
+            "result_sets": execution.get('result_sets', 0),
+            "rows_affected": execution.get('rows_affected', 0),
+            "error_count": execution.get('errors', 0),
+            "warning_count": execution.get('warnings', 0),
+            "execution_output": execution.get('output_content', '')
+        }
+        return evaluation_data, execution_metadata
+    
+    def _save_to_database_sync(self, file_path: Path, result: EvaluationResult):
         """Save evaluation result to database"""
         try:
-            # Convert pydantic result to dict for database saving
-            evaluation_data = result.model_dump()
-            
             # The enhanced database manager will handle the SQL file creation and evaluation saving
             if not self.db_manager.SessionLocal:
-                print(f"⚠️  Database not available for {file_path}")
+                log.warning("⚠️  Database not available for %s", file_path)
                 return
             
             session = self.db_manager.SessionLocal()
             try:
-                # Get existing SQL file from database
-                from database.tables import SQLFile, Quest, Subcategory
-                from repositories.sql_file_repository import SQLFileRepository
+                from repositories.evaluation_repository import EvaluationRepository
                 
-                # Normalize path for database lookup 
-                # Database stores paths like: "quests/1-data-modeling/00-basic-concepts/01-basic-table-creation.sql"
-                file_path_str = str(file_path)
-                if "quests/" in file_path_str:
-                    # Extract from "quests/" onwards (keep "quests/" prefix)
-                    quests_index = file_path_str.find("quests/")
-                    lookup_path = file_path_str[quests_index:]
-                    print(f"🔍 Using normalized path for database lookup: {lookup_path}")
-                else:
-                    # If path doesn't contain quests/, assume it's already normalized
-                    lookup_path = file_path_str
+                lookup_path = self._normalize_lookup_path(file_path)
+                log.debug("🔍 Using normalized path for database lookup: %s", lookup_path)
                 
                 sql_file_repository = SQLFileRepository(session)
                 sql_file = sql_file_repository.get_by_path(lookup_path)
 
                 if sql_file:
                     # Save evaluation with the existing SQL file
-                    print(f"✅ Found SQL file (ID: {sql_file.id}) for path: {file_path}")
-                    from repositories.evaluation_repository import EvaluationRepository
+                    log.debug("✅ Found SQL file (ID: %s) for path: %s", sql_file.id, file_path)
                     evaluation_repository = EvaluationRepository(session)
-                    
-                    # Add file_path to evaluation_data for the EvaluationRepository
-                    evaluation_data_with_path = evaluation_data.copy()
-                    evaluation_data_with_path['file_path'] = lookup_path
-                    
-                    # Extract execution metadata separately for proper database storage
-                    execution_metadata = {
-                        "execution_success": evaluation_data.get('execution', {}).get('success', False),
-                        "execution_time_ms": evaluation_data.get('execution', {}).get('execution_time_ms'),
-                        "output_lines": evaluation_data.get('execution', {}).get('output_lines', 0),
-                        "result_sets": evaluation_data.get('execution', {}).get('result_sets', 0),
-                        "rows_affected": evaluation_data.get('execution', {}).get('rows_affected', 0),
-                        "error_count": evaluation_data.get('execution', {}).get('errors', 0),
-                        "warning_count": evaluation_data.get('execution', {}).get('warnings', 0),
-                        "execution_output": evaluation_data.get('execution', {}).get('output_content', '')
-                    }
-                    
-                    evaluation_repository.upsert_evaluation(evaluation_data_with_path, execution_metadata)
+                    evaluation_data, execution_metadata = self._build_evaluation_payload(lookup_path, result)
+                    evaluation_repository.upsert_evaluation(evaluation_data, execution_metadata)
                     session.commit()
-                    print(f"✅ Successfully saved evaluation for {file_path}")
+                    log.info("✅ Successfully saved evaluation for %s", file_path)
                 else:
                     session.rollback()
-                    print(f"⚠️  SQL file not found in database: {file_path}")
-                    print(f"💡 Hint: Run 'python init_database.py' to populate SQL files")
+                    log.warning("⚠️  SQL file not found in database: %s", file_path)
+                    log.warning("💡 Hint: Run 'python init_database.py' to populate SQL files")
             except Exception as e:
                 session.rollback()
-                print(f"❌ Error saving evaluation for {file_path}: {e}")
+                log.error("❌ Error saving evaluation for %s: %s", file_path, e)
             finally:
                 session.close()
                 
         except Exception as e:
-            print(f"❌ Database save error for {file_path}: {e}")
+            log.error("❌ Database save error for %s: %s", file_path, e)
+    
+    def _save_batch_to_database_sync(self, items: List[tuple]):
+        """Upsert a batch of evaluations inside a single transaction"""
+        if not self.db_manager.SessionLocal:
+            log.warning("⚠️  Database not available for %s evaluations", len(items))
+            return
+        
+        from repositories.evaluation_repository import EvaluationRepository
+        
+        session = self.db_manager.SessionLocal()
+        try:
+            sql_file_repository = SQLFileRepository(session)
+            evaluation_repository = EvaluationRepository(session)
+            saved = 0
+            
+            for file_path, result in items:
+                lookup_path = self._normalize_lookup_path(file_path)
+                if not sql_file_repository.get_by_path(lookup_path):
+                    log.warning("⚠️  SQL file not found in database: %s", file_path)
+                    continue
+                evaluation_data, execution_metadata = self._build_evaluation_payload(lookup_path, result)
+                if evaluation_repository.upsert_evaluation(evaluation_data, execution_metadata, commit=False):
+                    saved += 1
+            
+            session.commit()
+            log.info("✅ Saved %s/%s evaluations to database", saved, len(items))
+            if saved < len(items):
+                log.warning("💡 Hint: Run 'python init_database.py' to populate SQL files")
+        except Exception as e:
+            session.rollback()
+            log.error("❌ Error saving evaluation batch: %s", e)
+        finally:
+            session.close()
     
     async def close(self):
         """Close database connection pool"""
@@ -500,7 +785,7 @@ class QuestEvaluator:
         if cache_enabled and _is_cached_valid(file_path) and skip_unchanged:
             cached_result = _load_cached_result(self.folder_config.cache_dir, file_path)
             if cached_result:
-                print(f"📋 Using cached result for {file_path.name}")
+                log.info("📋 Using cached result for %s", file_path.name)
                 return cached_result
 
         try:
@@ -517,7 +802,7 @@ class QuestEvaluator:
             return result_dict
             
         except Exception as e:
-            print(f"❌ Error evaluating {file_path}: {e}")
+            log.exception("❌ Evaluation failed for %s", file_path)
             return {
                 "error": str(e),
                 "file": file_path.name,
@@ -526,13 +811,13 @@ class QuestEvaluator:
     
     async def evaluate_quest(self, quest_path: Path) -> Dict[str, Any]:
         """Evaluate all files in a quest with controlled parallelism"""
-        sql_files = list(quest_path.rglob("*.sql"))
+        sql_files = [Path(p) for p in iter_sql_files(quest_path)]
         
         if not sql_files:
             return {"quest": quest_path.name, "files": [], "success": 0, "total": 0}
         
-        print(f"🔍 Found {len(sql_files)} SQL files in {quest_path.name}")
-        print(f"⚡ Processing with {self.config.max_concurrent_files} concurrent files")
+        log.info("🔍 Found %s SQL files in %s", len(sql_files), quest_path.name)
+        log.info("⚡ Processing with %s concurrent files", self.config.max_concurrent_files)
         
         # Process files in batches to control concurrency
         results = []
@@ -548,7 +833,7 @@ class QuestEvaluator:
             # Process results
             for j, result in enumerate(batch_results):
                 if isinstance(result, Exception):
-                    print(f"❌ Exception in {batch[j].name}: {result}")
+                    log.error("❌ Exception in %s: %s", batch[j].name, result)
                     results.append({
                         "error": str(result),
                         "file": batch[j].name,
@@ -585,16 +870,16 @@ class QuestEvaluator:
                 original_filename = result["metadata"]["file"]
                 file_name = original_filename.replace(".sql", ".json")
                 result_file = output_path / file_name
-                result_file.write_text(json.dumps(result, indent=2, cls=DateTimeEncoder))
-                print(f"✅ Saved: {result_file}")
+                result_file.write_bytes(_dump_json_bytes(result))
+                log.info("✅ Saved: %s", result_file)
             elif "file" in result:
                 # Fallback for error results
                 file_name = result["file"].replace(".sql", ".json")
                 result_file = output_path / file_name
-                result_file.write_text(json.dumps(result, indent=2, cls=DateTimeEncoder))
-                print(f"⚠️  Saved error result: {result_file}")
+                result_file.write_bytes(_dump_json_bytes(result))
+                log.warning("⚠️  Saved error result: %s", result_file)
             else:
-                print(f"❌ Result missing file info: {result.keys()}")
+                log.error("❌ Result missing file info: %s", list(result.keys()))
         
         return {
             "quest": quest_path.name,
@@ -612,21 +897,21 @@ class QuestEvaluator:
         quest_dirs = [d for d in quests_dir.iterdir() if d.is_dir() and d.name[0].isdigit()]
         quest_dirs.sort(key=lambda x: int(x.name.split('-')[0]))
         
-        print(f"🎯 Found {len(quest_dirs)} quests to evaluate")
+        log.info("🎯 Found %s quests to evaluate", len(quest_dirs))
         
         all_results = []
         total_files = 0
         total_success = 0
         
         for quest_dir in quest_dirs:
-            print(f"\n📚 Processing quest: {quest_dir.name}")
+            log.info("📚 Processing quest: %s", quest_dir.name)
             quest_result = await self.evaluate_quest(quest_dir)
             all_results.append(quest_result)
             
             total_files += quest_result["total"]
             total_success += quest_result["success"]
             
-            print(f"✅ Quest {quest_dir.name}: {quest_result['success']}/{quest_result['total']} files")
+            log.info("✅ Quest %s: %s/%s files", quest_dir.name, quest_result['success'], quest_result['total'])
             
             # Delay between quests to avoid overwhelming the system
             await asyncio.sleep(2)
@@ -639,37 +924,87 @@ class QuestEvaluator:
         }
 
 
+def _log_result_summary(sql_file: Path, result: EvaluationResult) -> None:
+    """Log a one-line result summary, resolving nested models once into locals"""
+    analysis = result.llm_analysis
+    asm = analysis.assessment
+    tech = analysis.analysis.technical_reasoning
+    edu = analysis.analysis.educational_reasoning
+    recs = analysis.recommendations
+    log.info(
+        "📊 %s: %s (%s/10, grade %s) | technical %s/10 | educational %s/10 | %s recommendations",
+        sql_file.name, asm.overall_assessment, asm.score, asm.grade,
+        tech.score, edu.score, len(recs)
+    )
+
+
 async def main():
     """Main evaluation function"""
     
-    # Load API key
-    evaluator = SQLEvaluator()
+    listener = configure_logging()
+    
+    # Load API key and share one client (and its connection pool) across the run
+    client = create_openai_client()
+    evaluator = SQLEvaluator(client=client)
     
     try:
         # Find SQL files
-        sql_files = list(Path("quests").rglob("*.sql"))
-        print(f"Found {len(sql_files)} SQL files to evaluate")
+        sql_files = [Path(p) for p in iter_sql_files("quests")]
+        log.info("Found %s SQL files to evaluate", len(sql_files))
+        
+        # Precompute output paths and create each output directory once
+        out_paths = {
+            p: Path("ai-evaluations", p.parts[-3], p.parts[-2], f"{p.stem}.json")
+            for p in sql_files
+        }
+        for output_dir in {out.parent for out in out_paths.values()}:
+            output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Evaluate each file
-        for sql_file in sql_files:  # Start with one file for testing           
+        # Keep concurrency just under the model's RPM/TPM limits
+        sem = asyncio.Semaphore(int(os.getenv("OAI_CONCURRENCY", "20")))
+        
+        # DB rows are accumulated and flushed in one transaction at the end
+        pending_saves = []
+        
+        async def one(sql_file: Path):
             try:
-                result = await evaluator.evaluate_sql_file(sql_file)
-                
-                # Save result to JSON file
-                output_dir = Path("ai-evaluations") / sql_file.parts[-3] / sql_file.parts[-2]
-                output_dir.mkdir(parents=True, exist_ok=True)
+                async with sem:
+                    result, raw_json = await evaluator.evaluate_sql_file_raw(sql_file, persist=False)
                 
-                output_file = output_dir / f"{sql_file.stem}.json"
-                output_file.write_text(result.model_dump_json(indent=2))
+                # Save result to JSON file; the database write is batched
+                output_file = out_paths[sql_file]
+                pending_saves.append((sql_file, result))
+                await _write_bytes_async(output_file, raw_json)
                 
-                print(f"✅ Evaluation saved to: {output_file}")
-                
-            except Exception as e:
-                print(f"❌ Error evaluating {sql_file}: {e}")
+                log.info("✅ Evaluation saved to: %s", output_file)
+                _log_result_summary(sql_file, result)
+            except Exception:
+                # Keep one bad file from cancelling the rest of the task group
+                log.exception("❌ Evaluation failed for %s", sql_file)
+        
+        # Evaluate all files concurrently
+        await prewarm_openai_client(client)
+        async with asyncio.TaskGroup() as tg:
+            for sql_file in sql_files:
+                tg.create_task(one(sql_file))
+        await evaluator.save_evaluations_to_db(pending_saves)
+        
+        log.info("📋 Cache hits: %s/%s", evaluator.cache_hits, len(sql_files))
     
     finally:
-        # Clean up database connections
+        # Clean up database and HTTP connections
         await evaluator.close()
+        if client is not None:
+            await client.close()
+        listener.stop()
+
+def run(coro):
+    """Run a coroutine on uvloop when available, else on the default asyncio loop"""
+    try:
+        import uvloop
+    except ImportError:  # uvloop is unavailable on Windows
+        return asyncio.run(coro)
+    return uvloop.run(coro)
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    run(main())
@@ -1,6 +1,16 @@
-from pydantic import BaseModel, Field, conint, confloat, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, conint, confloat, field_validator
 from typing import List, Optional, Dict, Any, Literal, Annotated
 from datetime import datetime
+import re
+
+# Patterns used by the cleanup validators below
+WORD_PATTERN = re.compile(r'\b[A-Za-z]+\b')
+GRADE_LETTER_PATTERN = re.compile(r'\b[A-F]\b')
+
+# Canonical values, checked first so well-formed LLM output skips the cleanup scans
+VALID_DIFFICULTY_LEVELS = frozenset({"Beginner", "Intermediate", "Advanced", "Expert"})
+VALID_GRADES = frozenset({"A", "B", "C", "D", "E", "F"})
+VALID_ASSESSMENTS = frozenset({"PASS", "FAIL", "NEEDS_REVIEW"})
 
 
 class SQLPatternDetection(BaseModel):
@@ -68,15 +78,16 @@ class ComprehensiveAnalysis(BaseModel):
     @field_validator('difficulty_level', mode='before')
     def clean_difficulty_level(cls, v):
         """Extract clean difficulty level from potentially decorated text"""
+        if isinstance(v, str) and v in VALID_DIFFICULTY_LEVELS:
+            return v
         if isinstance(v, str):
             # Remove emojis and extract the difficulty level
-            import re
             # Look for known difficulty levels in the text
             for level in ["Beginner", "Intermediate", "Advanced", "Expert"]:
                 if level.lower() in v.lower():
                     return level
             # If no match found, try to extract first word that looks like a level
-            words = re.findall(r'\b[A-Za-z]+\b', v)
+            words = WORD_PATTERN.findall(v)
             for word in words:
                 if word.lower() in ["beginner", "intermediate", "advanced", "expert"]:
                     return word.capitalize()
@@ -94,14 +105,15 @@ class Assessment(BaseModel):
     @field_validator('grade', mode='before')
     def clean_grade(cls, v):
         """Extract clean grade from potentially decorated text"""
+        if isinstance(v, str) and v in VALID_GRADES:
+            return v
         if isinstance(v, str):
-            import re
             # Look for letter grades A-F
             for grade in ["A", "B", "C", "D", "E", "F"]:
                 if grade in v.upper():
                     return grade
             # Try to extract first letter that looks like a grade
-            letters = re.findall(r'\b[A-F]\b', v.upper())
+            letters = GRADE_LETTER_PATTERN.findall(v.upper())
             if letters:
                 return letters[0]
         return v
@@ -109,6 +121,8 @@ class Assessment(BaseModel):
     @field_validator('overall_assessment', mode='before')
     def clean_overall_assessment(cls, v):
         """Extract clean assessment from potentially decorated text"""
+        if isinstance(v, str) and v in VALID_ASSESSMENTS:
+            return v
         if isinstance(v, str):
             v_upper = v.upper()
             for assessment in ["PASS", "FAIL", "NEEDS_REVIEW"]:
@@ -159,3 +173,6 @@ class EvaluationResult(BaseModel):
         """Convenience property to access execution success status."""
         return self.execution.success
 
+
+# Prebuilt validator reused for every cached/raw evaluation payload
+EVALUATION_RESULT_ADAPTER = TypeAdapter(EvaluationResult)
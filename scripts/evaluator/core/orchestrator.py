@@ -11,9 +11,9 @@ from .models import EvaluationResult, Intent, LLMAnalysis
 import asyncio
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EvaluationContext:
-    """Context object passed between agents"""
+    """Context object passed between agents (read-only)"""
     sql_content: str
     quest_name: str
     metadata: Dict[str, Any]
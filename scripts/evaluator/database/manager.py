@@ -1,4 +1,5 @@
 import os
+import re
 import hashlib
 import asyncio
 from typing import Optional, Dict, Any, List, Tuple
@@ -11,6 +12,25 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 from .utils import get_evaluator_connection_string, get_quests_connection_string
 
+# Opening tag of a PostgreSQL dollar-quoted string: $$ or $tag$
+DOLLAR_TAG_PATTERN = re.compile(r'\$[A-Za-z_]*\$')
+
+# Plain reads (no SELECT ... INTO) can run through a server-side cursor; the
+# split statements may still carry their leading comments
+STREAMABLE_STATEMENT_PATTERN = re.compile(r'^(?:\s|--[^\n]*\n|/\*.*?\*/)*(?:SELECT|VALUES)\b', re.IGNORECASE | re.DOTALL)
+SELECT_INTO_PATTERN = re.compile(r'\bINTO\b', re.IGNORECASE)
+PREVIEW_ROWS = 10
+STREAM_YIELD_PER = 1000
+
+# Long runs of DML against the same target (e.g. seed INSERTs) can keep a few
+# statements verbatim and fold the rest into one count line. Off by default:
+# execution output is graded by the LLM and stored, so it must stay complete.
+DML_TARGET_PATTERN = re.compile(
+    r'^(?:\s|--[^\n]*\n|/\*.*?\*/)*(INSERT\s+INTO\s+[\w."]+|UPDATE\s+[\w."]+|DELETE\s+FROM\s+[\w."]+)',
+    re.IGNORECASE | re.DOTALL
+)
+REPEATED_STATEMENT_PREVIEW = 3
+
 class DatabaseManager:
     def __init__(self, base=None, connection_string: Optional[str] = None, database_type: str = "evaluator"):
         """
@@ -38,6 +58,7 @@ class DatabaseManager:
         self.use_pool = os.getenv("USE_ASYNC_POOL", "false").lower() == "true"
         self.atomic = os.getenv("ATOMIC_EXECUTION", "true").lower() == "true"
         self.detailed = os.getenv("DETAILED_LOGGING", "false").lower() == "true"
+        self.fold_dml = os.getenv("FOLD_DML_OUTPUT", "false").lower() == "true"
         self._setup_engine()
 
     async def _get_db_pool(self):
@@ -48,8 +69,11 @@ class DatabaseManager:
                 max_size=10,  # Increased to handle concurrent access
                 command_timeout=30,  # Add timeout to prevent hanging
                 max_inactive_connection_lifetime=300,  # 5 minutes
+                # Timeouts ride in the startup packet instead of two SETs per acquire
                 server_settings={
-                    'application_name': f'sql_adventure_{self.database_type}'
+                    'application_name': f'sql_adventure_{self.database_type}',
+                    'lock_timeout': '10s',
+                    'statement_timeout': '30s'
                 }
             )
         return self._db_pool
@@ -68,7 +92,10 @@ class DatabaseManager:
                     "connect_timeout": 30
                 }
             )
-            self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+            # Committed objects stay loaded, so reading ids after commit costs no round-trip
+            self.SessionLocal = sessionmaker(
+                autocommit=False, autoflush=False, expire_on_commit=False, bind=self.engine
+            )
 
             self._ensure_database_exists()
             
@@ -127,10 +154,11 @@ class DatabaseManager:
             print(f"⚠️  Could not drop tables: {e}")
             return 0
 
-    async def execute_sql_file(self, file_path: str) -> Dict[str, Any]:
-        with open(file_path, 'r') as f:
-            content = f.read()
-        return await self._execute_sql(content)
+    async def execute_sql_file(self, file_path: str, sql_content: Optional[str] = None) -> Dict[str, Any]:
+        # Callers that already hold the file content can pass it to skip a re-read
+        if sql_content is None:
+            sql_content = Path(file_path).read_bytes().decode('utf-8')
+        return await self._execute_sql(sql_content)
 
     async def _execute_sql(self, sql_content: str) -> Dict[str, Any]:
         statements = _safe_split_sql(sql_content)
@@ -148,15 +176,12 @@ class DatabaseManager:
             'warning_messages': []  # Capture actual warning messages
         }
         start_all = datetime.now()
+        dml_run: Dict[str, Any] = {}  # current run of same-target DML being folded
 
         if self.use_pool:
             pool = await self._get_db_pool()
             try:
                 async with pool.acquire() as conn:
-                    # Set shorter lock timeout to prevent deadlocks
-                    await conn.execute("SET lock_timeout = '10s'")
-                    await conn.execute("SET statement_timeout = '30s'")
-                    
                     tx = conn.transaction()
                     if self.atomic:
                         await tx.start()
@@ -178,6 +203,7 @@ class DatabaseManager:
                                         summary['result_sets'] += 1
                                         # Capture actual query results for SELECT statements
                                         result_text = _format_query_results(stmt, result)
+                                        dml_run.clear()
                                         summary['output_content'].append(result_text)
                                         if self.detailed:
                                             detail['rows_returned'] = count
@@ -201,7 +227,11 @@ class DatabaseManager:
                                     summary['rows_affected'] += affected_rows
                                     
                                     # Show full SQL statement for technical analysis
-                                    summary['output_content'].append(f"Query: {stmt}\nNo results returned.\n")
+                                    _append_statement_output(
+                                        summary['output_content'], dml_run, stmt,
+                                        [f"Query: {stmt}\nNo results returned.\n"], affected_rows,
+                                        fold=self.fold_dml
+                                    )
                                     
                                 if self.detailed:
                                     detail['execution_time_ms'] = _elapsed_ms(stmt_start)
@@ -237,22 +267,31 @@ class DatabaseManager:
                 detail = _init_detail(idx, stmt, self.detailed)
                 stmt_start = datetime.now() if self.detailed else None
                 try:
-                    result = conn.execute(text(stmt))
+                    statement = text(stmt)
+                    if _is_streamable(stmt):
+                        # Large result sets are fetched in chunks, not buffered whole
+                        statement = statement.execution_options(stream_results=True, yield_per=STREAM_YIELD_PER)
+                    result = conn.execute(statement)
                     if result.returns_rows:
-                        rows = result.fetchall()
+                        columns = result.keys()
+                        preview, total_rows = _collect_preview(result)
                         summary['result_sets'] += 1
                         # Capture actual query results for SELECT statements
-                        result_text = _format_sync_query_results(stmt, rows, result.keys())
+                        result_text = _format_sync_query_results(stmt, preview, columns, total_rows)
+                        dml_run.clear()
                         summary['output_content'].append(result_text)
                         if self.detailed:
-                            detail['rows_returned'] = len(rows)
+                            detail['rows_returned'] = total_rows
                     else:
                         affected = result.rowcount or 0
                         summary['rows_affected'] += affected
                         # Show full SQL statement for technical analysis
-                        summary['output_content'].append(f"Statement executed: {stmt.strip()}")
+                        entries = [f"Statement executed: {stmt.strip()}"]
                         if affected > 0:
-                            summary['output_content'].append(f"Rows affected: {affected}")
+                            entries.append(f"Rows affected: {affected}")
+                        _append_statement_output(
+                            summary['output_content'], dml_run, stmt, entries, affected, fold=self.fold_dml
+                        )
                         if self.detailed:
                             detail['rows_affected'] = affected
                     if self.detailed:
@@ -277,7 +316,7 @@ class DatabaseManager:
         if summary['output_content']:
             summary['output_content'] = '\n\n'.join(summary['output_content'])
             # Count actual output lines
-            summary['output_lines'] = len(summary['output_content'].split('\n'))
+            summary['output_lines'] = summary['output_content'].count('\n') + 1
         else:
             summary['output_content'] = 'No output generated'
             summary['output_lines'] = 0
@@ -315,8 +354,53 @@ def _format_query_results(stmt: str, result) -> str:
     return "\n".join(output)
 
 
-def _format_sync_query_results(stmt: str, rows, columns) -> str:
+def _is_streamable(stmt: str) -> bool:
+    """Whether a statement is a plain read that can use a server-side cursor"""
+    return bool(STREAMABLE_STATEMENT_PATTERN.match(stmt)) and not SELECT_INTO_PATTERN.search(stmt)
+
+
+def _append_statement_output(output: List[str], run: Dict[str, Any], stmt: str,
+                             entries: List[str], affected: int, fold: bool = False):
+    """Append a non-query statement's output; with fold, long same-target DML runs collapse"""
+    if not fold:
+        output.extend(entries)
+        return
+    match = DML_TARGET_PATTERN.match(stmt)
+    target = ' '.join(match.group(1).split()) if match else None
+    if target is None or run.get('key') != target.upper():
+        run.clear()
+        if target is not None:
+            run.update(key=target.upper(), count=0, rows=0, fold_index=None)
+    if target is not None:
+        run['count'] += 1
+        if run['count'] > REPEATED_STATEMENT_PREVIEW:
+            run['rows'] += affected
+            line = (f"... and {run['count'] - REPEATED_STATEMENT_PREVIEW} more {target} statements "
+                    f"({run['rows']} rows affected)")
+            if run['fold_index'] is None:
+                run['fold_index'] = len(output)
+                output.append(line)
+            else:
+                output[run['fold_index']] = line
+            return
+    output.extend(entries)
+
+
+def _collect_preview(result, limit: int = PREVIEW_ROWS) -> Tuple[list, int]:
+    """Keep the first rows for display while counting the rest as they stream by"""
+    preview = []
+    total = 0
+    for row in result:
+        if total < limit:
+            preview.append(row)
+        total += 1
+    return preview, total
+
+
+def _format_sync_query_results(stmt: str, rows, columns, total_rows: Optional[int] = None) -> str:
     """Format SQLAlchemy query results for display"""
+    if total_rows is None:
+        total_rows = len(rows)
     if not rows:
         return f"Query: {stmt.strip()}\nNo results returned."
     
@@ -330,14 +414,14 @@ def _format_sync_query_results(stmt: str, rows, columns) -> str:
         output.append("-" * len(header))
         
         # Rows (limit to first 10 for readability)
-        for i, row in enumerate(rows[:10]):
+        for i, row in enumerate(rows[:PREVIEW_ROWS]):
             row_data = " | ".join(str(val).ljust(15)[:15] for val in row)
             output.append(row_data)
             
-        if len(rows) > 10:
-            output.append(f"... and {len(rows) - 10} more rows")
+        if total_rows > PREVIEW_ROWS:
+            output.append(f"... and {total_rows - PREVIEW_ROWS} more rows")
             
-        output.append(f"\nTotal rows: {len(rows)}")
+        output.append(f"\nTotal rows: {total_rows}")
     
     return "\n".join(output)
 
@@ -351,8 +435,86 @@ def _elapsed_ms(start: datetime) -> int:
     return int((datetime.now() - start).total_seconds() * 1000)
 
 def _safe_split_sql(content: str) -> List[str]:
-    # Naive split, can be replaced with sqlparse for more robust behavior
-    return [s.strip() for s in content.split(';') if s.strip()]
+    """
+    Split SQL into statements on top-level semicolons in a single linear pass.
+    A small state machine skips semicolons inside quotes, comments and
+    dollar-quoted bodies, avoiding a full sqlparse parse.
+    """
+    splits = []
+    # Semicolons inside parentheses (e.g. multi-action rules); they only
+    # become split points if the parentheses are never closed
+    pending = []
+    i = 0
+    n = len(content)
+    paren_depth = 0
+
+    while i < n:
+        ch = content[i]
+        nxt = content[i + 1] if i + 1 < n else ''
+
+        if ch == '-' and nxt == '-':
+            # Line comment: skip to end of line
+            end = content.find('\n', i)
+            i = n if end == -1 else end + 1
+            continue
+        if ch == '/' and nxt == '*':
+            # Block comment
+            end = content.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if ch == "'" or ch == '"':
+            # Quoted literal/identifier; doubled quotes are escapes, and so are
+            # backslashes inside E'...' strings
+            backslash_escapes = ch == "'" and _opens_escape_string(content, i)
+            i += 1
+            while i < n:
+                if backslash_escapes and content[i] == '\\':
+                    i += 2
+                    continue
+                if content[i] == ch:
+                    if i + 1 < n and content[i + 1] == ch:
+                        i += 2
+                        continue
+                    break
+                i += 1
+            i += 1
+            continue
+        if ch == '$':
+            # Dollar-quoted body such as $$ ... $$ or $fn$ ... $fn$
+            match = DOLLAR_TAG_PATTERN.match(content, i)
+            if match:
+                tag = match.group(0)
+                end = content.find(tag, match.end())
+                i = n if end == -1 else end + len(tag)
+                continue
+        if ch == '(':
+            paren_depth += 1
+        elif ch == ')':
+            if paren_depth:
+                paren_depth -= 1
+                if not paren_depth:
+                    pending.clear()
+        elif ch == ';':
+            (pending if paren_depth else splits).append(i)
+        i += 1
+
+    # An unbalanced parenthesis must not swallow the statements after it
+    splits.extend(pending)
+
+    statements = []
+    start = 0
+    for end in splits + [n]:
+        statement = content[start:end].strip()
+        if statement:
+            statements.append(statement)
+        start = end + 1
+    return statements
+
+def _opens_escape_string(content: str, quote_index: int) -> bool:
+    """Whether the quote at quote_index opens an E'...' string (prefix not part of a longer word)"""
+    if quote_index == 0 or content[quote_index - 1] not in 'eE':
+        return False
+    return quote_index == 1 or not (content[quote_index - 2].isalnum() or content[quote_index - 2] in '_$')
 
 def _make_concurrent_safe(stmt: str) -> str:
     """Make SQL statements more concurrent-safe by adding IF NOT EXISTS where appropriate"""
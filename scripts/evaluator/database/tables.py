@@ -7,16 +7,64 @@ Focus: Current state evaluation with upsert logic, minimal complexity
 from datetime import datetime
 from typing import List, Optional
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, Boolean, Float, 
-    ForeignKey, UniqueConstraint, Index, CheckConstraint
+    Column, Integer, SmallInteger, String, Text, DateTime, Boolean, Float, 
+    ForeignKey, UniqueConstraint, Index, CheckConstraint, Computed
 )
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import JSON, UUID
+from sqlalchemy.dialects.postgresql import JSON, JSONB, UUID
 import uuid
 
 EvaluationBase = declarative_base()
 
+# Letter grades from best to worst, grouped into report buckets. The grade
+# check constraint and the reporting SQL are both derived from this mapping.
+GRADE_BUCKETS = {
+    'A': ('A+', 'A', 'A-'),
+    'B': ('B+', 'B', 'B-'),
+    'C': ('C+', 'C', 'C-'),
+    'D': ('D+', 'D', 'D-'),
+    'F': ('F',),
+}
+LETTER_GRADES = tuple(grade for grades in GRADE_BUCKETS.values() for grade in grades)
+
+
+def sql_grade_list(grades) -> str:
+    """Render grades as a SQL literal list body, e.g. 'A+', 'A', 'A-'"""
+    return ", ".join(f"'{grade}'" for grade in grades)
+
+
+# Stored expression mapping letter_grade to its bucket letter
+GRADE_CLASS_SQL = "CASE " + " ".join(
+    f"WHEN letter_grade IN ({sql_grade_list(grades)}) THEN '{bucket}'"
+    for bucket, grades in GRADE_BUCKETS.items()
+) + " END"
+
+# Stored expression counting detected patterns; non-array values count as none
+PATTERN_COUNT_SQL = (
+    "CASE WHEN jsonb_typeof(detected_patterns) = 'array' "
+    "THEN jsonb_array_length(detected_patterns) ELSE 0 END"
+)
+
+# Dashboard ranking of a recommendation by (priority, expected_impact); other
+# combinations rank lowest
+PRIORITY_WEIGHTS = {
+    ('High', 'High'): 10,
+    ('High', 'Medium'): 8,
+    ('High', 'Low'): 6,
+    ('Medium', 'High'): 7,
+    ('Medium', 'Medium'): 5,
+    ('Medium', 'Low'): 3,
+    ('Low', 'High'): 4,
+    ('Low', 'Medium'): 2,
+}
+
+# Stored expression mapping a recommendation to its priority score
+PRIORITY_SCORE_SQL = "CASE " + " ".join(
+    f"WHEN priority = '{priority}' AND expected_impact = '{impact}' THEN {score}"
+    for (priority, impact), score in PRIORITY_WEIGHTS.items()
+) + " ELSE 1 END"
+
 # Core hierarchy tables (keep as-is, they work well)
 class Quest(EvaluationBase):
     """Quest information"""
@@ -103,9 +151,11 @@ class Evaluation(EvaluationBase):
     overall_assessment = Column(String(20), nullable=False)  # PASS, FAIL, NEEDS_REVIEW
     numeric_score = Column(Integer, nullable=False)  # 1-10
     letter_grade = Column(String(2), nullable=False)  # A, B, C, D, F
+    grade_class = Column(String(1), Computed(GRADE_CLASS_SQL, persisted=True))  # Bucket of letter_grade
     
     # Detected patterns as JSONB (simplified from junction table)
-    detected_patterns = Column(JSON)  # [{"name": "table_creation", "confidence": 0.9, "quality": "Good"}, ...]
+    detected_patterns = Column(JSONB)  # [{"name": "table_creation", "confidence": 0.9, "quality": "Good"}, ...]
+    pattern_count = Column(Integer, Computed(PATTERN_COUNT_SQL, persisted=True))  # Length of detected_patterns
     
     # Relationships
     sql_file = relationship("SQLFile", back_populates="evaluation")
@@ -117,11 +167,24 @@ class Evaluation(EvaluationBase):
     __table_args__ = (
         CheckConstraint("overall_assessment IN ('PASS', 'FAIL', 'NEEDS_REVIEW')", name='valid_assessment'),
         CheckConstraint("numeric_score >= 1 AND numeric_score <= 10", name='valid_score'),
-        CheckConstraint("letter_grade IN ('A', 'B', 'C', 'D', 'F', 'A+', 'A-', 'B+', 'B-', 'C+', 'C-', 'D+', 'D-')", name='valid_grade'),
-        Index('idx_evaluation_file', 'sql_file_id'),
-        Index('idx_evaluation_quest', 'quest_id'),
-        Index('idx_evaluation_last_evaluated', 'last_evaluated'),
+        CheckConstraint(f"letter_grade IN ({sql_grade_list(LETTER_GRADES)})", name='valid_grade'),
+        # Covering indexes for the per-file history and per-quest report aggregates.
+        # The INCLUDE columns are what keep latest-row and date-window lookups
+        # index-only; keep them in step with the report queries. detected_patterns
+        # is left out on purpose: large JSONB values overflow btree index tuples.
+        Index('idx_evaluation_file_recent', 'sql_file_id', last_evaluated.desc(),
+              postgresql_include=['numeric_score', 'letter_grade', 'overall_assessment']),
+        Index('idx_evaluation_quest_recent', 'quest_id', last_evaluated.desc(),
+              postgresql_include=['numeric_score', 'letter_grade']),
+        Index('idx_evaluation_quest_grade_class', 'quest_id', 'grade_class'),
+        # Covering index for date-window reports: recent-first range scans that
+        # can answer score/grade aggregates without visiting the heap
+        Index('idx_evaluation_recent', last_evaluated.desc(),
+              postgresql_include=['sql_file_id', 'quest_id', 'numeric_score', 'letter_grade']),
         Index('idx_evaluation_assessment', 'overall_assessment'),
+        # Serves detected_patterns @> '[{"name": ...}]' containment lookups
+        Index('idx_evaluation_patterns', 'detected_patterns', postgresql_using='gin',
+              postgresql_ops={'detected_patterns': 'jsonb_path_ops'}),
     )
 
 # SEPARATED: Execution metadata in its own table
@@ -187,8 +250,19 @@ class Analysis(EvaluationBase):
         CheckConstraint("estimated_time_minutes > 0", name='valid_time_estimate'),
     )
 
-# REMOVED: EvaluationPattern junction table (replaced with JSONB in Evaluation)
-# Pattern data will be stored as: detected_patterns = [{"name": "table_creation", "confidence": 0.9, "quality": "Good"}, ...]
+# Pattern data is stored as: detected_patterns = [{"name": "table_creation", "confidence": 0.9, "quality": "Good"}, ...]
+# DERIVED: Evaluation/pattern links, kept in sync with detected_patterns by a trigger
+class EvaluationPattern(EvaluationBase):
+    """Catalog patterns detected in each evaluation, for indexed pattern rollups"""
+    __tablename__ = 'evaluation_patterns'
+    
+    evaluation_id = Column(Integer, ForeignKey('evaluations.id', ondelete='CASCADE'), primary_key=True)
+    pattern_id = Column(Integer, ForeignKey('sql_patterns.id', ondelete='CASCADE'), primary_key=True)
+    
+    __table_args__ = (
+        Index('idx_evaluation_pattern_pattern', 'pattern_id'),
+    )
+
 
 # KEEP: Recommendations for Copilot learning
 class Recommendation(EvaluationBase):
@@ -203,6 +277,7 @@ class Recommendation(EvaluationBase):
     recommendation_text = Column(Text, nullable=False)
     implementation_effort = Column(String(20))  # Low, Medium, High
     expected_impact = Column(String(20))  # High, Medium, Low
+    priority_score = Column(SmallInteger, Computed(PRIORITY_SCORE_SQL, persisted=True))  # Dashboard rank
     
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
@@ -214,9 +289,10 @@ class Recommendation(EvaluationBase):
         CheckConstraint("priority IN ('High', 'Medium', 'Low')", name='valid_priority'),
         CheckConstraint("implementation_effort IN ('Low', 'Medium', 'High')", name='valid_effort'),
         CheckConstraint("expected_impact IN ('High', 'Medium', 'Low')", name='valid_impact'),
-        Index('idx_recommendation_evaluation', 'evaluation_id'),
+        Index('idx_recommendation_evaluation_priority', 'evaluation_id', 'priority'),
         Index('idx_recommendation_priority', 'priority'),
         Index('idx_recommendation_category', 'category'),
+        Index('idx_recommendation_priority_score', priority_score.desc(), created_at.desc()),
     )
 
 # ENHANCED: Pattern catalog with regex patterns and examples
@@ -28,7 +28,8 @@ from database.tables import (
     EvaluationBase, Quest, Subcategory, SQLFile, SQLPattern,
 )
 from sqlalchemy import text
-from utils.discovery import discover_quests
+from utils.discovery import discover_quests, iter_sql_files
+from reporting.mart import drop_analytics_relation
 from repositories.quest_repository import QuestRepository
 from repositories.sql_file_repository import SQLFileRepository
 from repositories.sql_pattern_repository import SQLPatternRepository
@@ -113,7 +114,7 @@ async def process_single_sql_file(sql_file_repo, file_path: str):
         raise
 
 
-async def generate_patterns_fast() -> List[Tuple[str, str, str, str, str, str, str, List[str]]]:
+def generate_patterns_fast() -> List[Tuple[str, str, str, str, str, str, str, List[str]]]:
     """Generate patterns using static data instead of AI calls for faster initialization"""
     print("⚡ Using pre-computed patterns for fast initialization...")
 
@@ -166,7 +167,7 @@ def _drop_analytics_views(engine):
         with engine.connect() as conn:
             for view in views_to_drop:
                 try:
-                    conn.execute(text(f"DROP VIEW IF EXISTS {view} CASCADE"))
+                    drop_analytics_relation(conn, view)
                     print(f"   🗑️  Dropped view: {view}")
                 except Exception as e:
                     print(f"   ⚠️  Could not drop view {view}: {e}")
@@ -273,7 +274,7 @@ async def main():
             sql_file_repo = SQLFileRepository(session)
 
             # Collect all SQL files first
-            sql_files = list(quests_dir.rglob("*.sql"))
+            sql_files = [Path(p) for p in iter_sql_files(quests_dir)]
             print(f"   📊 Found {len(sql_files)} SQL files to process")
 
             # Batch process SQL files in parallel with larger batches
@@ -293,7 +294,7 @@ async def main():
             pattern_repo = SQLPatternRepository(session)
 
             # Use fast static pattern loading instead of AI generation
-            patterns = await generate_patterns_fast()
+            patterns = generate_patterns_fast()
             pattern_repo.upsert(patterns)
             session.commit()
 
@@ -4,16 +4,456 @@ Database Views and Analytics Functions for SQL Adventure AI Evaluator
 Provides comprehensive reporting and analysis capabilities
 """
 
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
 from sqlalchemy import text
-from typing import Dict, Any, List
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+from typing import IO, Callable, Dict, Any, List, Optional
+
+try:
+    import redis
+except ImportError:  # redis is optional; fall back to an in-process cache
+    redis = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
 
 from database.manager import DatabaseManager
+from database.tables import (
+    GRADE_CLASS_SQL, LETTER_GRADES, PATTERN_COUNT_SQL, PRIORITY_SCORE_SQL,
+    Evaluation, EvaluationPattern, Recommendation,
+)
+
+# Grade buckets are read from the stored evaluations.grade_class column
+GRADE_ORDER_VALUES = ", ".join(f"('{grade}', {rank})" for rank, grade in enumerate(LETTER_GRADES, start=1))
+
+# Aggregating views are materialized and refreshed off the request path; each
+# maps to the unique key column that REFRESH ... CONCURRENTLY requires. Views
+# built on others come after them, so refreshing in this order stays consistent.
+MATERIALIZED_VIEWS = {
+    'evaluation_summary': 'evaluation_id',
+    'quest_performance': 'quest_id',
+    'pattern_analysis': 'id',
+    'file_progress': 'file_id',
+    'recommendations_dashboard': 'recommendation_id',
+}
+
+# Dashboard payloads are reused for a short while; refreshes invalidate them early
+DASHBOARD_CACHE_TTL_SECONDS = 60
+DASHBOARD_CACHE_KEY = "dash:v1"
+DETAILED_CACHE_PREFIX = "det:"
+# Summary entries are keyed by the source-table snapshot, so new evaluations miss them
+SUMMARY_CACHE_PREFIX = "cs:"
+_dashboard_cache: Dict[tuple, tuple] = {}
+# Characters escaped when a database URL is used in a Redis SCAN pattern
+REDIS_GLOB_SPECIAL = re.compile(r'([*?\[\]\\])')
+
+# Indexes replaced by the covering indexes declared on the models
+SUPERSEDED_INDEXES = (
+    'idx_evaluation_file', 'idx_evaluation_quest', 'idx_evaluation_quest_scores',
+    'idx_recommendation_evaluation',
+    # Plain btree replaced by the covering idx_evaluation_recent under a new name,
+    # since CREATE INDEX IF NOT EXISTS would keep the old definition
+    'idx_evaluation_last_evaluated',
+)
+
+# Reporting queries; they are folded into the JSON bundles below
+SUMMARY_SQL = """
+    WITH system_counts AS (
+        SELECT 
+            (SELECT COUNT(*) FROM quests) as total_quests,
+            (SELECT COUNT(*) FROM subcategories) as total_subcategories,
+            (SELECT COUNT(*) FROM sql_files) as total_sql_files,
+            (SELECT COUNT(*) FROM sql_patterns) as total_patterns,
+            (SELECT COUNT(DISTINCT category) FROM sql_patterns) as pattern_categories
+    ),
+    evaluation_metrics AS (
+        -- Totals, grades, activity and pattern coverage from a single scan of evaluations
+        SELECT 
+            COUNT(*) as total_evaluations,
+            ROUND(AVG(e.numeric_score), 2) as overall_avg_score,
+            COUNT(*) FILTER (WHERE em.execution_success = true)::float / 
+            NULLIF(COUNT(*), 0) * 100 as overall_success_rate,
+            COUNT(*) FILTER (WHERE e.grade_class = 'A') as excellent_evaluations,
+            COUNT(*) FILTER (WHERE e.grade_class = 'B') as good_evaluations,
+            COUNT(*) FILTER (WHERE e.grade_class = 'C') as fair_evaluations,
+            COUNT(*) FILTER (WHERE e.grade_class IN ('D', 'F')) as poor_evaluations,
+            COUNT(*) FILTER (WHERE e.last_evaluated >= CURRENT_DATE - INTERVAL '1 day') as evals_last_day,
+            COUNT(*) FILTER (WHERE e.last_evaluated >= CURRENT_DATE - INTERVAL '7 days') as evals_last_week,
+            COUNT(*) FILTER (WHERE e.last_evaluated >= CURRENT_DATE - INTERVAL '30 days') as evals_last_month,
+            COUNT(*) FILTER (
+                WHERE e.detected_patterns IS NOT NULL
+                AND e.detected_patterns NOT IN ('[]'::jsonb, 'null'::jsonb)
+            ) as analyses_with_patterns
+        FROM evaluations e
+        LEFT JOIN execution_metadata em ON e.id = em.evaluation_id
+    ),
+    recommendation_metrics AS (
+        SELECT 
+            COUNT(DISTINCT r.evaluation_id) FILTER (WHERE r.priority = 'High') as high_priority_issues,
+            COUNT(DISTINCT r.evaluation_id) FILTER (WHERE r.priority = 'Medium') as medium_priority_issues
+        FROM recommendations r
+    )
+    SELECT 
+        sc.*,
+        em.*,
+        rm.*
+    FROM system_counts sc, evaluation_metrics em, recommendation_metrics rm
+"""
+
+QUEST_BREAKDOWN_SQL = """
+    SELECT 
+        q.name as quest_name,
+        q.display_name as quest_display_name,
+        COUNT(DISTINCT sc.id) as subcategory_count,
+        COUNT(DISTINCT sf.id) as file_count,
+        COUNT(DISTINCT e.id) as evaluation_count,
+        ROUND(AVG(e.numeric_score)::numeric, 2) as avg_score,
+        CASE 
+            WHEN COUNT(e.id) > 0 THEN
+                ROUND((COUNT(*) FILTER (WHERE em.execution_success = true)::numeric / 
+                COUNT(e.id) * 100), 1)
+            ELSE 0
+        END as success_rate,
+        MAX(e.last_evaluated) as last_evaluated,
+        COUNT(e.id) FILTER (WHERE e.grade_class = 'A') as excellent_count
+    FROM quests q
+    LEFT JOIN subcategories sc ON q.id = sc.quest_id
+    LEFT JOIN sql_files sf ON sc.id = sf.subcategory_id
+    LEFT JOIN evaluations e ON sf.id = e.sql_file_id
+    LEFT JOIN execution_metadata em ON e.id = em.evaluation_id
+    GROUP BY q.id
+    ORDER BY q.order_index
+"""
+
+TOP_PERFORMERS_SQL = """
+    SELECT 
+        sf.file_path as relative_path,
+        q.display_name as quest_name,
+        sc.name as subcategory_name,
+        e.letter_grade,
+        e.numeric_score,
+        e.last_evaluated as evaluation_date,
+        em.execution_time_ms,
+        e.pattern_count
+    FROM sql_files sf
+    JOIN evaluations e ON sf.id = e.sql_file_id
+    JOIN subcategories sc ON sf.subcategory_id = sc.id
+    JOIN quests q ON sc.quest_id = q.id
+    LEFT JOIN execution_metadata em ON e.id = em.evaluation_id
+    WHERE e.grade_class = 'A'
+    ORDER BY e.numeric_score DESC, e.last_evaluated DESC
+    LIMIT 10
+"""
+
+PATTERN_INSIGHTS_SQL = """
+    SELECT 
+        sp.display_name,
+        sp.category,
+        sp.complexity_level,
+        COUNT(*) as usage_count,
+        ROUND(AVG(e.numeric_score)::numeric, 1) as avg_score_when_used
+    FROM sql_patterns sp
+    JOIN evaluation_patterns ep ON ep.pattern_id = sp.id
+    JOIN evaluations e ON e.id = ep.evaluation_id
+    GROUP BY sp.id
+    ORDER BY usage_count DESC, avg_score_when_used DESC NULLS LAST
+    LIMIT 10
+"""
+
+SCORE_DISTRIBUTION_SQL = f"""
+    WITH grade_order(letter_grade, sort_rank) AS (
+        VALUES {GRADE_ORDER_VALUES}
+    )
+    SELECT 
+        e.letter_grade,
+        COUNT(*) as count,
+        ROUND(COUNT(*)::numeric / SUM(COUNT(*)) OVER () * 100, 1) as percentage
+    FROM evaluations e
+    JOIN sql_files sf ON e.sql_file_id = sf.id
+    JOIN subcategories sc ON sf.subcategory_id = sc.id
+    JOIN quests q ON sc.quest_id = q.id
+    LEFT JOIN grade_order go ON go.letter_grade = e.letter_grade
+    WHERE e.last_evaluated >= CURRENT_DATE - make_interval(days => :days)
+    AND (CAST(:quest_name AS TEXT) IS NULL OR q.name = :quest_name)
+    GROUP BY e.letter_grade, go.sort_rank
+    ORDER BY COALESCE(go.sort_rank, {len(LETTER_GRADES) + 1})
+"""
+
+PATTERN_TRENDS_SQL = """
+    SELECT 
+        DATE(e.last_evaluated) as evaluation_date,
+        'Mixed' as category,  -- Simplified since we don't have pattern categories in JSON
+        COUNT(DISTINCT e.id) as pattern_usage_count
+    FROM evaluations e
+    JOIN analyses a ON e.id = a.evaluation_id
+    JOIN sql_files sf ON e.sql_file_id = sf.id
+    JOIN subcategories sc ON sf.subcategory_id = sc.id
+    JOIN quests q ON sc.quest_id = q.id
+    WHERE e.pattern_count > 0
+    AND e.last_evaluated >= CURRENT_DATE - make_interval(days => :days)
+    AND (CAST(:quest_name AS TEXT) IS NULL OR q.name = :quest_name)
+    GROUP BY DATE(e.last_evaluated)
+    ORDER BY evaluation_date
+"""
+
+PERFORMANCE_TRENDS_SQL = """
+    SELECT 
+        DATE(e.last_evaluated) as evaluation_date,
+        COUNT(*) as evaluation_count,
+        ROUND(AVG(e.numeric_score), 2) as avg_score,
+        ROUND(AVG(em.execution_time_ms), 2) as avg_execution_time,
+        COUNT(*) FILTER (WHERE em.execution_success = true)::float / 
+        NULLIF(COUNT(*), 0) * 100 as success_rate
+    FROM evaluations e
+    JOIN sql_files sf ON e.sql_file_id = sf.id
+    JOIN subcategories sc ON sf.subcategory_id = sc.id
+    JOIN quests q ON sc.quest_id = q.id
+    LEFT JOIN execution_metadata em ON e.id = em.evaluation_id
+    WHERE e.last_evaluated >= CURRENT_DATE - make_interval(days => :days)
+    AND (CAST(:quest_name AS TEXT) IS NULL OR q.name = :quest_name)
+    GROUP BY DATE(e.last_evaluated)
+    ORDER BY evaluation_date
+"""
+
+RECENT_EVALUATIONS_SQL = """
+    SELECT * FROM evaluation_summary 
+    ORDER BY evaluation_date DESC 
+    LIMIT 10
+"""
+
+# Reporting reads run read-only with a timeout so a bad plan fails fast,
+# and may use parallel workers for the full-table aggregates
+REPORTING_SESSION_SETUP = text("""
+    SET TRANSACTION READ ONLY;
+    SET LOCAL statement_timeout = '30s';
+    SET LOCAL max_parallel_workers_per_gather = 4
+""")
+
+IMPROVEMENT_OPPORTUNITIES_SQL = """
+    SELECT * FROM get_improvement_opportunities() LIMIT 10
+"""
+
+
+
+def _json_bundle(parts: Dict[str, str], single_row: tuple = ()) -> Any:
+    """Fold several reporting queries into one statement returning a JSON object"""
+    fields = []
+    for name, sql in parts.items():
+        if name in single_row:
+            fields.append(f"'{name}', (SELECT row_to_json(r) FROM ({sql}) r)")
+        else:
+            fields.append(f"'{name}', COALESCE((SELECT json_agg(r) FROM ({sql}) r), '[]'::json)")
+    # Returned as text so the payload is parsed once, by orjson when available
+    return text("SELECT json_build_object(" + ",\n".join(fields) + ")::text")
+
+
+# One round-trip per report; statements are built once at import so
+# SQLAlchemy can reuse their compiled form
+SUMMARY_PARTS = {
+    'summary': SUMMARY_SQL,
+    'quest_breakdown': QUEST_BREAKDOWN_SQL,
+    'top_performers': TOP_PERFORMERS_SQL,
+    'pattern_insights': PATTERN_INSIGHTS_SQL,
+}
+SUMMARY_BUNDLE_QUERY = _json_bundle(SUMMARY_PARTS, single_row=('summary',))
+DASHBOARD_BUNDLE_QUERY = _json_bundle({
+    **SUMMARY_PARTS,
+    'recent_evaluations': RECENT_EVALUATIONS_SQL,
+    'improvement_opportunities': IMPROVEMENT_OPPORTUNITIES_SQL,
+}, single_row=('summary',))
+DETAILED_ANALYTICS_QUERY = _json_bundle({
+    'score_distribution': SCORE_DISTRIBUTION_SQL,
+    'pattern_trends': PATTERN_TRENDS_SQL,
+    'performance_trends': PERFORMANCE_TRENDS_SQL,
+})
+
+EXISTING_MATERIALIZED_VIEWS_QUERY = text("""
+    SELECT matviewname FROM pg_matviews WHERE matviewname = ANY(:names)
+""")
+
+# pg_prewarm is optional and installed by an administrator, never from the reporting path
+PREWARM_EXTENSION_QUERY = text("SELECT 1 FROM pg_extension WHERE extname = 'pg_prewarm'")
+
+# Hashes of applied analytics DDL scripts, so an unchanged script is not re-run
+MART_SCHEMA_TABLE_SQL = text("""
+    CREATE TABLE IF NOT EXISTS _mart_schema (
+        hash TEXT PRIMARY KEY,
+        applied_at TIMESTAMPTZ DEFAULT now()
+    )
+""")
+MART_SCHEMA_LOCK_QUERY = text("SELECT pg_advisory_xact_lock(hashtext('_mart_schema'))")
+MART_SCHEMA_APPLIED_QUERY = text("SELECT 1 FROM _mart_schema WHERE hash = :hash")
+MART_SCHEMA_RECORD_QUERY = text("INSERT INTO _mart_schema (hash) VALUES (:hash) ON CONFLICT DO NOTHING")
+# Bounds each DDL statement, so a blocked view rebuild fails instead of stalling writers behind it
+MART_DDL_TIMEOUT_SQL = text("SET LOCAL statement_timeout = '60s'")
+
+# Snapshot of the source tables the materialized views were last built from;
+# a refresh is skipped while it still matches. The date is part of it because
+# recency columns (last 7/30 days, 'Outdated') age even when no rows change
+MART_REFRESH_TABLE_SQL = text("""
+    CREATE TABLE IF NOT EXISTS _mart_refresh (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE,
+        source_state TEXT NOT NULL,
+        refreshed_at TIMESTAMPTZ DEFAULT now()
+    )
+""")
+MART_SOURCE_STATE_QUERY = text("""
+    SELECT concat_ws(':',
+        CURRENT_DATE,
+        (SELECT MAX(last_evaluated) FROM evaluations),
+        (SELECT COUNT(*) FROM evaluations),
+        (SELECT COUNT(*) FROM recommendations),
+        (SELECT COUNT(*) FROM sql_files),
+        (SELECT COUNT(*) FROM sql_patterns)
+    )
+""")
+MART_REFRESHED_STATE_QUERY = text("SELECT source_state FROM _mart_refresh")
+MART_RECORD_REFRESH_QUERY = text("""
+    INSERT INTO _mart_refresh (source_state) VALUES (:state)
+    ON CONFLICT (id) DO UPDATE SET source_state = EXCLUDED.source_state, refreshed_at = now()
+""")
+
+
+def _json_default(obj):
+    """Encode the Decimal and date values reporting rows carry"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dump_payload(data: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default)
+    return json.dumps(data, default=_json_default).encode()
+
+
+def _load_payload(payload) -> Dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def _pattern_links_sql(evaluation: str) -> str:
+    """(evaluation id, catalog pattern id) rows for the patterns an evaluation row names"""
+    return f"""
+        SELECT DISTINCT {evaluation}.id as evaluation_id, p.id as pattern_id
+        FROM jsonb_array_elements(
+            CASE WHEN jsonb_typeof({evaluation}.detected_patterns) = 'array' THEN {evaluation}.detected_patterns END
+        ) pat
+        JOIN sql_patterns p ON p.name = pat ->> 'name'"""
+
+
+def drop_relation_sql(name: str) -> str:
+    """DDL dropping an analytics view whether it is currently plain or materialized"""
+    return f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_matviews WHERE matviewname = '{name}') THEN
+                DROP MATERIALIZED VIEW {name} CASCADE;
+            ELSIF EXISTS (SELECT 1 FROM pg_views WHERE viewname = '{name}') THEN
+                DROP VIEW {name} CASCADE;
+            END IF;
+        END $$;
+        """
+
+
+def drop_analytics_relation(conn, name: str):
+    """Drop an analytics view whether it is currently plain or materialized"""
+    conn.execute(text(drop_relation_sql(name)))
+
 
 class AnalyticsViewManager:
     """Manages database views and analytics functions"""
     
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
+        redis_url = os.getenv("REDIS_URL")
+        self._redis = redis.Redis.from_url(redis_url) if redis is not None and redis_url else None
+        self._prewarm_available: Optional[bool] = None
+    
+    def _cache_scope(self) -> str:
+        return str(self.db_manager.engine.url) if self.db_manager.engine else ''
+    
+    def _redis_key(self, key: str) -> str:
+        """Scope a shared Redis key to this database, like the in-process keys"""
+        return f"{self._cache_scope()}|{key}"
+    
+    def _cached(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return a recent payload for key, computing and storing it on a miss"""
+        if self._redis is not None:
+            try:
+                payload = self._redis.get(self._redis_key(key))
+                if payload is not None:
+                    return _load_payload(payload)
+            except Exception as e:
+                print(f"⚠️  Dashboard cache unavailable: {e}")
+        else:
+            cached = _dashboard_cache.get((self._cache_scope(), key))
+            if cached and time.monotonic() < cached[0]:
+                # Callers own what they get back; the cached payload stays untouched
+                return copy.deepcopy(cached[1])
+        
+        result = compute()
+        if not result or 'error' in result:
+            return result
+        
+        if self._redis is not None:
+            try:
+                self._redis.setex(self._redis_key(key), DASHBOARD_CACHE_TTL_SECONDS, _dump_payload(result))
+            except Exception as e:
+                print(f"⚠️  Dashboard cache unavailable: {e}")
+        else:
+            # Snapshot-keyed summaries are never revisited once stale, so expired entries go on write
+            now = time.monotonic()
+            for cache_key in [k for k, (expires_at, _) in _dashboard_cache.items() if expires_at <= now]:
+                del _dashboard_cache[cache_key]
+            _dashboard_cache[(self._cache_scope(), key)] = (
+                now + DASHBOARD_CACHE_TTL_SECONDS, copy.deepcopy(result)
+            )
+        return result
+    
+    def invalidate_cache(self):
+        """Forget cached dashboard payloads after the underlying data changed"""
+        if self._redis is not None:
+            try:
+                self._redis.delete(self._redis_key(DASHBOARD_CACHE_KEY))
+                scope = REDIS_GLOB_SPECIAL.sub(r'\\\1', self._cache_scope())
+                for prefix in (DETAILED_CACHE_PREFIX, SUMMARY_CACHE_PREFIX):
+                    for key in self._redis.scan_iter(match=f"{scope}|{prefix}*"):
+                        self._redis.delete(key)
+            except Exception as e:
+                print(f"⚠️  Dashboard cache unavailable: {e}")
+        else:
+            scope = self._cache_scope()
+            for cache_key in [k for k in _dashboard_cache if k[0] == scope]:
+                del _dashboard_cache[cache_key]
+    
+    @contextmanager
+    def _reporting_connection(self):
+        """Yield a pooled connection in a read-only transaction, always returning it"""
+        # Reports only run text queries, so a bare connection skips ORM session setup
+        with self.db_manager.engine.begin() as conn:
+            conn.execute(REPORTING_SESSION_SETUP)
+            yield conn
+    
+    def _fetch_bundle(self, query, params=None) -> Dict[str, Any]:
+        """Run one bundled reporting query and return its decoded JSON object"""
+        with self._reporting_connection() as conn:
+            return _load_payload(conn.execute(query, params).scalar())
     
     def create_analytics_views(self):
         """Create all analytics views and functions"""
@@ -22,37 +462,281 @@ class AnalyticsViewManager:
             return False
         
         try:
+            script = ";\n".join(statement.strip().rstrip(';') for statement in self.analytics_ddl())
+            schema_hash = hashlib.blake2b(script.encode(), digest_size=16).hexdigest()
             with self.db_manager.engine.connect() as conn:
-                # Create evaluation summary view
-                self._create_evaluation_summary_view(conn)
-                
-                # Create quest performance view
-                self._create_quest_performance_view(conn)
-                
-                # Create pattern analysis view
-                self._create_pattern_analysis_view(conn)
+                # Serialize concurrent creators; the lock is released at commit
+                conn.execute(MART_SCHEMA_TABLE_SQL)
+                conn.execute(MART_REFRESH_TABLE_SQL)
+                conn.execute(MART_SCHEMA_LOCK_QUERY)
                 
-                # Create file progress view
-                self._create_file_progress_view(conn)
-                
-                # Create recommendations dashboard view
-                self._create_recommendations_dashboard_view(conn)
-                
-                # Create analytics functions
-                self._create_analytics_functions(conn)
+                # Skip the DDL when this exact script was applied and its views still exist
+                existing = conn.execute(
+                    EXISTING_MATERIALIZED_VIEWS_QUERY, {'names': list(MATERIALIZED_VIEWS)}
+                ).scalars().all()
+                if len(existing) == len(MATERIALIZED_VIEWS) and conn.execute(
+                    MART_SCHEMA_APPLIED_QUERY, {'hash': schema_hash}
+                ).scalar():
+                    conn.commit()
+                    print("✅ Analytics views and functions are up to date")
+                    return True
                 
+                # The whole script goes to the server in one round-trip and one transaction
+                conn.execute(MART_DDL_TIMEOUT_SQL)
+                conn.execute(text(script))
+                conn.execute(MART_SCHEMA_RECORD_QUERY, {'hash': schema_hash})
+                conn.execute(MART_RECORD_REFRESH_QUERY, {'state': conn.execute(MART_SOURCE_STATE_QUERY).scalar()})
                 conn.commit()
-                print("✅ Analytics views and functions created successfully")
-                return True
+            self.invalidate_cache()
+            self.prewarm_materialized_views()
+            print("✅ Analytics views and functions created successfully")
+            return True
                 
         except Exception as e:
             print(f"❌ Error creating analytics views: {e}")
             return False
     
-    def _create_evaluation_summary_view(self, conn):
+    def analytics_ddl(self) -> List[str]:
+        """Every statement create_analytics_views runs, in order"""
+        ddl: List[str] = []
+        
+        # Drop the views first: they read columns the migrations below retype, and
+        # materialized views cannot be replaced in place
+        for name in MATERIALIZED_VIEWS:
+            ddl.append(drop_relation_sql(name))
+        
+        # Upgrade pattern storage from JSON to indexable JSONB
+        self._migrate_detected_patterns(ddl)
+        self._migrate_grade_class(ddl)
+        self._migrate_pattern_count(ddl)
+        self._migrate_priority_score(ddl)
+        
+        # Normalize detected pattern names into indexed evaluation/pattern links
+        self._sync_evaluation_patterns(ddl)
+        
+        # Bring report-serving indexes up to the model definitions
+        self._ensure_report_indexes(ddl)
+        
+        # Create evaluation summary view
+        self._create_evaluation_summary_view(ddl)
+        
+        # Create quest performance view
+        self._create_quest_performance_view(ddl)
+        
+        # Create pattern analysis view
+        self._create_pattern_analysis_view(ddl)
+        
+        # Create file progress view
+        self._create_file_progress_view(ddl)
+        
+        # Create recommendations dashboard view
+        self._create_recommendations_dashboard_view(ddl)
+        
+        # Unique keys allow concurrent refreshes
+        self._index_materialized_views(ddl)
+        
+        # Create analytics functions
+        self._create_analytics_functions(ddl)
+        return ddl
+    
+    def _index_materialized_views(self, ddl: List[str]):
+        """Create the unique index each materialized view needs for concurrent refresh"""
+        for name, key in MATERIALIZED_VIEWS.items():
+            ddl.append(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{name}_key ON {name} ({key})")
+    
+    def refresh_materialized_views(self, concurrent: bool = True, force: bool = False) -> bool:
+        """Recompute the materialized analytics views when their sources changed, without blocking readers by default"""
+        if not self.db_manager.engine:
+            print("❌ Database not connected")
+            return False
+        
+        mode = "CONCURRENTLY " if concurrent else ""
+        try:
+            with self.db_manager.engine.connect() as conn:
+                conn.execute(MART_REFRESH_TABLE_SQL)
+                # Taken before refreshing, so writes landing meanwhile leave the views dirty
+                state = conn.execute(MART_SOURCE_STATE_QUERY).scalar()
+                if not force and conn.execute(MART_REFRESHED_STATE_QUERY).scalar() == state:
+                    conn.commit()
+                    return True
+                
+                existing = conn.execute(
+                    EXISTING_MATERIALIZED_VIEWS_QUERY, {'names': list(MATERIALIZED_VIEWS)}
+                ).scalars().all()
+                conn.commit()
+                # Commit per view so each refresh holds its lock only briefly
+                for name in MATERIALIZED_VIEWS:
+                    if name in existing:
+                        conn.execute(text(f"REFRESH MATERIALIZED VIEW {mode}{name}"))
+                        conn.commit()
+                conn.execute(MART_RECORD_REFRESH_QUERY, {'state': state})
+                conn.commit()
+            self.invalidate_cache()
+            self.prewarm_materialized_views()
+            return True
+        
+        except Exception as e:
+            print(f"❌ Error refreshing analytics views: {e}")
+            return False
+    
+    def prewarm_materialized_views(self) -> bool:
+        """Load the materialized views into shared buffers so first reads skip the disk"""
+        if self._prewarm_available is False:
+            return False
+        try:
+            with self.db_manager.engine.connect() as conn:
+                if self._prewarm_available is None:
+                    self._prewarm_available = conn.execute(PREWARM_EXTENSION_QUERY).first() is not None
+                if not self._prewarm_available:
+                    return False
+                existing = conn.execute(
+                    EXISTING_MATERIALIZED_VIEWS_QUERY, {'names': list(MATERIALIZED_VIEWS)}
+                ).scalars().all()
+                for name in existing:
+                    conn.execute(text("SELECT pg_prewarm(CAST(:name AS regclass))"), {'name': name})
+                conn.commit()
+            return True
+        
+        except Exception as e:
+            print(f"⚠️  Could not prewarm analytics views: {e}")
+            return False
+    
+    def export_view_csv(self, view_name: str, output: IO[bytes]) -> bool:
+        """Stream a materialized analytics view to output as CSV with one COPY"""
+        if view_name not in MATERIALIZED_VIEWS:
+            print(f"❌ Unknown analytics view: {view_name}")
+            return False
+        if not self.db_manager.engine:
+            print("❌ Database not connected")
+            return False
+        
+        raw = self.db_manager.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            key = MATERIALIZED_VIEWS[view_name]
+            cursor.copy_expert(
+                f"COPY (SELECT * FROM {view_name} ORDER BY {key}) TO STDOUT WITH (FORMAT csv, HEADER)", output
+            )
+            cursor.close()
+            return True
+        except Exception as e:
+            print(f"❌ Error exporting {view_name}: {e}")
+            return False
+        finally:
+            raw.close()
+    
+    def refresh_in_background(self, concurrent: bool = True) -> threading.Thread:
+        """Start a materialized view refresh without waiting for it"""
+        worker = threading.Thread(
+            target=self.refresh_materialized_views, args=(concurrent,), name="analytics-refresh"
+        )
+        worker.start()
+        return worker
+    
+    def _migrate_detected_patterns(self, ddl: List[str]):
+        """Convert evaluations.detected_patterns to JSONB on databases created before it was"""
+        ddl.append("""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'evaluations'
+                AND column_name = 'detected_patterns'
+                AND data_type = 'json'
+            ) THEN
+                ALTER TABLE evaluations
+                    ALTER COLUMN detected_patterns TYPE jsonb USING detected_patterns::jsonb;
+            END IF;
+        END $$;
+        """)
+    
+    def _migrate_grade_class(self, ddl: List[str]):
+        """Add the stored grade_class column to databases created before it existed"""
+        ddl.append(
+            "ALTER TABLE evaluations ADD COLUMN IF NOT EXISTS grade_class VARCHAR(1) "
+            f"GENERATED ALWAYS AS ({GRADE_CLASS_SQL}) STORED"
+        )
+    
+    def _sync_evaluation_patterns(self, ddl: List[str]):
+        """Create evaluation_patterns and the triggers that keep it in step with detected_patterns"""
+        ddl.append(str(CreateTable(EvaluationPattern.__table__, if_not_exists=True).compile(dialect=postgresql.dialect())))
+        ddl.append(f"""
+        CREATE OR REPLACE FUNCTION sync_evaluation_patterns() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM evaluation_patterns WHERE evaluation_id = NEW.id;
+            INSERT INTO evaluation_patterns (evaluation_id, pattern_id){_pattern_links_sql('NEW')};
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """)
+        ddl.append("DROP TRIGGER IF EXISTS trg_evaluation_patterns ON evaluations")
+        ddl.append("""
+        CREATE TRIGGER trg_evaluation_patterns
+        AFTER INSERT OR UPDATE OF detected_patterns ON evaluations
+        FOR EACH ROW EXECUTE FUNCTION sync_evaluation_patterns()
+        """)
+        # Patterns added to the catalog later are linked to evaluations that already name them
+        ddl.append("""
+        CREATE OR REPLACE FUNCTION link_catalog_pattern() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM evaluation_patterns WHERE pattern_id = NEW.id;
+            INSERT INTO evaluation_patterns (evaluation_id, pattern_id)
+            SELECT e.id, NEW.id
+            FROM evaluations e
+            WHERE e.detected_patterns @> jsonb_build_array(jsonb_build_object('name', NEW.name));
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """)
+        ddl.append("DROP TRIGGER IF EXISTS trg_catalog_pattern_links ON sql_patterns")
+        ddl.append("""
+        CREATE TRIGGER trg_catalog_pattern_links
+        AFTER INSERT OR UPDATE OF name ON sql_patterns
+        FOR EACH ROW EXECUTE FUNCTION link_catalog_pattern()
+        """)
+        # Backfill evaluations stored before the trigger existed
+        ddl.append(f"""
+        INSERT INTO evaluation_patterns (evaluation_id, pattern_id)
+        SELECT link.* FROM evaluations e CROSS JOIN LATERAL ({_pattern_links_sql('e')}
+        ) link
+        ON CONFLICT DO NOTHING
+        """)
+    
+    def _migrate_pattern_count(self, ddl: List[str]):
+        """Add the stored pattern_count column to databases created before it existed"""
+        ddl.append(
+            "ALTER TABLE evaluations ADD COLUMN IF NOT EXISTS pattern_count INTEGER "
+            f"GENERATED ALWAYS AS ({PATTERN_COUNT_SQL}) STORED"
+        )
+    
+    def _migrate_priority_score(self, ddl: List[str]):
+        """Add the stored priority_score column to databases created before it existed"""
+        ddl.append(
+            "ALTER TABLE recommendations ADD COLUMN IF NOT EXISTS priority_score SMALLINT "
+            f"GENERATED ALWAYS AS ({PRIORITY_SCORE_SQL}) STORED"
+        )
+    
+    def _ensure_report_indexes(self, ddl: List[str]):
+        """Create model-declared indexes missing from databases built before them"""
+        dialect = postgresql.dialect()
+        for table in (Evaluation.__table__, EvaluationPattern.__table__, Recommendation.__table__):
+            for index in table.indexes:
+                ddl.append(str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect)))
+        for name in SUPERSEDED_INDEXES:
+            ddl.append(f"DROP INDEX IF EXISTS {name}")
+    
+    def _create_evaluation_summary_view(self, ddl: List[str]):
         """Create evaluation summary view"""
         view_sql = """
-        CREATE OR REPLACE VIEW evaluation_summary AS
+        CREATE MATERIALIZED VIEW evaluation_summary AS
+        WITH rec AS (
+            SELECT 
+                evaluation_id,
+                COUNT(*) as total,
+                COUNT(*) FILTER (WHERE priority = 'High') as high
+            FROM recommendations
+            GROUP BY evaluation_id
+        )
         SELECT 
             e.id as evaluation_id,
             e.last_evaluated as evaluation_date,
@@ -78,26 +762,25 @@ class AnalyticsViewManager:
             a.difficulty_level as assessed_difficulty,
             a.estimated_time_minutes,
             -- Pattern counts (from JSONB field)
-            COALESCE(json_array_length(e.detected_patterns), 0) as pattern_count,
-            -- Recommendation counts
-            (SELECT COUNT(*) FROM recommendations r WHERE r.evaluation_id = e.id) as recommendation_count,
-            -- High priority recommendation count
-            (SELECT COUNT(*) FROM recommendations r WHERE r.evaluation_id = e.id AND r.priority = 'High') as high_priority_recommendations
+            e.pattern_count,
+            -- Recommendation counts, aggregated once per evaluation
+            COALESCE(rec.total, 0) as recommendation_count,
+            COALESCE(rec.high, 0) as high_priority_recommendations
         FROM evaluations e
         JOIN sql_files sf ON e.sql_file_id = sf.id
         JOIN subcategories sc ON sf.subcategory_id = sc.id
         JOIN quests q ON e.quest_id = q.id
         LEFT JOIN execution_metadata em ON e.id = em.evaluation_id
         LEFT JOIN analyses a ON e.id = a.evaluation_id
-        ORDER BY evaluation_date DESC;
+        LEFT JOIN rec ON rec.evaluation_id = e.id;
         """
         
-        conn.execute(text(view_sql))
+        ddl.append(view_sql)
     
-    def _create_quest_performance_view(self, conn):
+    def _create_quest_performance_view(self, ddl: List[str]):
         """Create quest performance analytics view"""
         quest_performance_sql = """
-        CREATE OR REPLACE VIEW quest_performance AS
+        CREATE MATERIALIZED VIEW quest_performance AS
         SELECT 
             q.id as quest_id,
             q.name as quest_name,
@@ -110,9 +793,9 @@ class AnalyticsViewManager:
             COUNT(DISTINCT e.id) as total_evaluations,
             
             -- Success metrics (from execution_metadata)
-            COUNT(CASE WHEN em.execution_success = true THEN 1 END) as successful_executions,
+            COUNT(*) FILTER (WHERE em.execution_success = true) as successful_executions,
             ROUND(
-                COUNT(CASE WHEN em.execution_success = true THEN 1 END)::numeric / 
+                COUNT(*) FILTER (WHERE em.execution_success = true)::numeric / 
                 NULLIF(COUNT(e.id), 0) * 100, 2
             ) as success_rate,
             
@@ -123,11 +806,11 @@ class AnalyticsViewManager:
             ROUND(STDDEV(e.numeric_score), 2) as score_stddev,
             
             -- Grade distribution
-            COUNT(CASE WHEN e.letter_grade IN ('A', 'A+', 'A-') THEN 1 END) as grade_a_count,
-            COUNT(CASE WHEN e.letter_grade IN ('B', 'B+', 'B-') THEN 1 END) as grade_b_count,
-            COUNT(CASE WHEN e.letter_grade IN ('C', 'C+', 'C-') THEN 1 END) as grade_c_count,
-            COUNT(CASE WHEN e.letter_grade IN ('D', 'D+', 'D-') THEN 1 END) as grade_d_count,
-            COUNT(CASE WHEN e.letter_grade = 'F' THEN 1 END) as grade_f_count,
+            COUNT(e.id) FILTER (WHERE e.grade_class = 'A') as grade_a_count,
+            COUNT(e.id) FILTER (WHERE e.grade_class = 'B') as grade_b_count,
+            COUNT(e.id) FILTER (WHERE e.grade_class = 'C') as grade_c_count,
+            COUNT(e.id) FILTER (WHERE e.grade_class = 'D') as grade_d_count,
+            COUNT(e.id) FILTER (WHERE e.grade_class = 'F') as grade_f_count,
             
             -- Performance metrics (from execution_metadata)
             ROUND(AVG(em.execution_time_ms), 2) as avg_execution_time_ms,
@@ -140,8 +823,8 @@ class AnalyticsViewManager:
             
             -- Latest evaluation
             MAX(e.last_evaluated) as latest_evaluation_date,
-            COUNT(CASE WHEN e.last_evaluated >= CURRENT_DATE - INTERVAL '7 days' THEN 1 END) as evaluations_last_7_days,
-            COUNT(CASE WHEN e.last_evaluated >= CURRENT_DATE - INTERVAL '30 days' THEN 1 END) as evaluations_last_30_days
+            COUNT(*) FILTER (WHERE e.last_evaluated >= CURRENT_DATE - INTERVAL '7 days') as evaluations_last_7_days,
+            COUNT(*) FILTER (WHERE e.last_evaluated >= CURRENT_DATE - INTERVAL '30 days') as evaluations_last_30_days
             
         FROM quests q
         LEFT JOIN subcategories sc ON q.id = sc.quest_id
@@ -149,16 +832,28 @@ class AnalyticsViewManager:
         LEFT JOIN evaluations e ON sf.id = e.sql_file_id
         LEFT JOIN execution_metadata em ON e.id = em.evaluation_id
         LEFT JOIN analyses a ON e.id = a.evaluation_id
-        GROUP BY q.id, q.name, q.display_name, q.difficulty_level, q.order_index
-        ORDER BY q.order_index;
+        GROUP BY q.id;
         """
         
-        conn.execute(text(quest_performance_sql))
+        ddl.append(quest_performance_sql)
     
-    def _create_pattern_analysis_view(self, conn):
-        """Create pattern analysis view (simplified for JSON type)"""
+    def _create_pattern_analysis_view(self, ddl: List[str]):
+        """Create pattern analysis view from the evaluation/pattern links"""
         pattern_analysis_sql = """
-        CREATE OR REPLACE VIEW pattern_analysis AS
+        CREATE MATERIALIZED VIEW pattern_analysis AS
+        WITH pattern_quests AS (
+            -- Quests per pattern, deduplicated on ids before their names are aggregated
+            SELECT 
+                pq.pattern_id,
+                string_agg(q.display_name, ', ' ORDER BY q.display_name) as quest_names
+            FROM (
+                SELECT DISTINCT ep.pattern_id, e.quest_id
+                FROM evaluation_patterns ep
+                JOIN evaluations e ON e.id = ep.evaluation_id
+            ) pq
+            JOIN quests q ON q.id = pq.quest_id
+            GROUP BY pq.pattern_id
+        )
         SELECT 
             p.id,
             p.name as pattern_name,
@@ -166,76 +861,66 @@ class AnalyticsViewManager:
             p.category,
             p.complexity_level,
             
-            -- Count evaluations using this pattern (simplified approach)
-            (
-                SELECT COUNT(*)
-                FROM evaluations e
-                WHERE e.detected_patterns IS NOT NULL
-                AND e.detected_patterns::text LIKE '%"' || p.name || '"%'
-            ) as evaluations_using_pattern,
+            -- Count evaluations using this pattern
+            COUNT(e.id) as evaluations_using_pattern,
             
-            -- Performance when pattern is used (simplified)
-            (
-                SELECT ROUND(AVG(e.numeric_score), 2)
-                FROM evaluations e
-                WHERE e.detected_patterns IS NOT NULL
-                AND e.detected_patterns::text LIKE '%"' || p.name || '"%'
-            ) as avg_score_when_used,
+            -- Performance when pattern is used
+            ROUND(AVG(e.numeric_score), 2) as avg_score_when_used,
             
-            -- Average confidence (placeholder - would need proper JSON parsing)
-            (
-                SELECT ROUND(AVG(e.numeric_score), 2) / 10.0  -- Normalized confidence estimate
-                FROM evaluations e
-                WHERE e.detected_patterns IS NOT NULL
-                AND e.detected_patterns::text LIKE '%"' || p.name || '"%'
-            ) as avg_eval_confidence,
+            -- Average confidence (placeholder - normalized score estimate)
+            ROUND(AVG(e.numeric_score), 2) / 10.0 as avg_eval_confidence,
             
             -- Pattern quality analysis (based on grades)
-            (
-                SELECT COUNT(*)
-                FROM evaluations e
-                WHERE e.detected_patterns IS NOT NULL
-                AND e.detected_patterns::text LIKE '%"' || p.name || '"%'
-                AND e.letter_grade IN ('A+', 'A', 'A-')
-            ) as excellent_usage,
-            
-            (
-                SELECT COUNT(*)
-                FROM evaluations e
-                WHERE e.detected_patterns IS NOT NULL
-                AND e.detected_patterns::text LIKE '%"' || p.name || '"%'
-                AND e.letter_grade IN ('B+', 'B', 'B-')
-            ) as good_usage,
+            COUNT(e.id) FILTER (WHERE e.grade_class = 'A') as excellent_usage,
+            COUNT(e.id) FILTER (WHERE e.grade_class = 'B') as good_usage,
             
             -- Quest distribution
-            (
-                SELECT string_agg(DISTINCT q.display_name, ', ')
-                FROM evaluations e
-                JOIN sql_files sf ON e.sql_file_id = sf.id
-                JOIN subcategories sc ON sf.subcategory_id = sc.id
-                JOIN quests q ON sc.quest_id = q.id
-                WHERE e.detected_patterns IS NOT NULL
-                AND e.detected_patterns::text LIKE '%"' || p.name || '"%'
-            ) as used_in_quests,
+            pq.quest_names as used_in_quests,
             
             -- Recent usage
-            (
-                SELECT MAX(e.last_evaluated)
-                FROM evaluations e
-                WHERE e.detected_patterns IS NOT NULL
-                AND e.detected_patterns::text LIKE '%"' || p.name || '"%'
-            ) as last_detected_date
+            MAX(e.last_evaluated) as last_detected_date
             
         FROM sql_patterns p
-        ORDER BY evaluations_using_pattern DESC NULLS LAST, p.name;
+        LEFT JOIN evaluation_patterns ep ON ep.pattern_id = p.id
+        LEFT JOIN evaluations e ON e.id = ep.evaluation_id
+        LEFT JOIN pattern_quests pq ON pq.pattern_id = p.id
+        GROUP BY p.id, pq.quest_names;
         """
         
-        conn.execute(text(pattern_analysis_sql))
+        ddl.append(pattern_analysis_sql)
     
-    def _create_file_progress_view(self, conn):
+    def _create_file_progress_view(self, ddl: List[str]):
         """Create file progress tracking view"""
         view_sql = """
-        CREATE OR REPLACE VIEW file_progress AS
+        CREATE MATERIALIZED VIEW file_progress AS
+        WITH pattern_complexity AS (
+            -- Complexity levels of each evaluation's detected patterns, in one grouped join
+            SELECT 
+                ep.evaluation_id,
+                STRING_AGG(DISTINCT p.complexity_level, ', ') as complexities
+            FROM evaluation_patterns ep
+            JOIN sql_patterns p ON p.id = ep.pattern_id
+            GROUP BY ep.evaluation_id
+        ),
+        ranked AS (
+            -- One pass over evaluations ranks each file's history newest first
+            SELECT 
+                e.id as evaluation_id,
+                e.sql_file_id,
+                e.overall_assessment,
+                e.numeric_score,
+                e.letter_grade,
+                e.last_evaluated,
+                e.pattern_count,
+                em.execution_success,
+                COUNT(*) OVER (PARTITION BY e.sql_file_id) as total_evaluations,
+                -- Change from the evaluation before this one; NULL when there is none
+                e.numeric_score - LEAD(e.numeric_score) OVER history as score_trend,
+                ROW_NUMBER() OVER history as rn
+            FROM evaluations e
+            LEFT JOIN execution_metadata em ON e.id = em.evaluation_id
+            WINDOW history AS (PARTITION BY e.sql_file_id ORDER BY e.last_evaluated DESC)
+        )
         SELECT 
             sf.id as file_id,
             sf.filename,
@@ -249,82 +934,49 @@ class AnalyticsViewManager:
             sc.display_name as subcategory_display_name,
             
             -- Evaluation history
-            COUNT(e.id) as total_evaluations,
-            MAX(e.last_evaluated) as last_evaluation_date,
+            COALESCE(latest.total_evaluations, 0) as total_evaluations,
+            latest.last_evaluated as last_evaluation_date,
             
             -- Latest evaluation details
-            (SELECT e2.overall_assessment FROM evaluations e2 
-             WHERE e2.sql_file_id = sf.id 
-             ORDER BY e2.last_evaluated DESC LIMIT 1) as latest_assessment,
-            (SELECT e2.numeric_score FROM evaluations e2 
-             WHERE e2.sql_file_id = sf.id 
-             ORDER BY e2.last_evaluated DESC LIMIT 1) as latest_score,
-            (SELECT e2.letter_grade FROM evaluations e2 
-             WHERE e2.sql_file_id = sf.id 
-             ORDER BY e2.last_evaluated DESC LIMIT 1) as latest_grade,
-            (SELECT em2.execution_success FROM evaluations e2 
-             LEFT JOIN execution_metadata em2 ON e2.id = em2.evaluation_id
-             WHERE e2.sql_file_id = sf.id 
-             ORDER BY e2.last_evaluated DESC LIMIT 1) as latest_execution_success,
+            latest.overall_assessment as latest_assessment,
+            latest.numeric_score as latest_score,
+            latest.letter_grade as latest_grade,
+            latest.execution_success as latest_execution_success,
             
             -- Score trends
-            CASE 
-                WHEN COUNT(e.id) >= 2 THEN
-                    (SELECT e_latest.numeric_score FROM evaluations e_latest 
-                     WHERE e_latest.sql_file_id = sf.id 
-                     ORDER BY e_latest.last_evaluated DESC LIMIT 1) -
-                    (SELECT e_prev.numeric_score FROM evaluations e_prev 
-                     WHERE e_prev.sql_file_id = sf.id 
-                     ORDER BY e_prev.last_evaluated DESC LIMIT 1 OFFSET 1)
-                ELSE NULL
-            END as score_trend,
-            
-            -- Pattern complexity (from JSON patterns in latest evaluation)
-            (SELECT COALESCE(json_array_length(e2.detected_patterns), 0) FROM evaluations e2 
-             WHERE e2.sql_file_id = sf.id 
-             ORDER BY e2.last_evaluated DESC LIMIT 1) as pattern_count,
-            
-            -- Extract pattern complexities from latest evaluation's JSON
-            (SELECT CASE 
-                WHEN e2.detected_patterns IS NOT NULL 
-                THEN 'Mixed' -- Simplified since JSON patterns don't include complexity directly
-                ELSE 'None'
-            END FROM evaluations e2 
-             WHERE e2.sql_file_id = sf.id 
-             ORDER BY e2.last_evaluated DESC LIMIT 1) as pattern_complexities,
+            latest.score_trend,
+            
+            -- Pattern count stored on the latest evaluation
+            COALESCE(latest.pattern_count, 0) as pattern_count,
+            
+            -- Complexity levels of the latest evaluation's known patterns
+            COALESCE(pc.complexities, 'None') as pattern_complexities,
             
             -- Content hash for change detection
             sf.content_hash,
             
             -- Status classification
             CASE 
-                WHEN COUNT(e.id) = 0 THEN 'Never Evaluated'
-                WHEN MAX(e.last_evaluated) < CURRENT_DATE - INTERVAL '30 days' THEN 'Outdated'
-                WHEN (SELECT e2.overall_assessment FROM evaluations e2 
-                      WHERE e2.sql_file_id = sf.id 
-                      ORDER BY e2.last_evaluated DESC LIMIT 1) = 'PASS' THEN 'Passing'
-                WHEN (SELECT e2.overall_assessment FROM evaluations e2 
-                      WHERE e2.sql_file_id = sf.id 
-                      ORDER BY e2.last_evaluated DESC LIMIT 1) = 'FAIL' THEN 'Failing'
+                WHEN latest.sql_file_id IS NULL THEN 'Never Evaluated'
+                WHEN latest.last_evaluated < CURRENT_DATE - INTERVAL '30 days' THEN 'Outdated'
+                WHEN latest.overall_assessment = 'PASS' THEN 'Passing'
+                WHEN latest.overall_assessment = 'FAIL' THEN 'Failing'
                 ELSE 'Needs Review'
             END as status
             
         FROM sql_files sf
         JOIN subcategories sc ON sf.subcategory_id = sc.id
         JOIN quests q ON sc.quest_id = q.id
-        LEFT JOIN evaluations e ON sf.id = e.sql_file_id
-        GROUP BY sf.id, sf.filename, sf.file_path, sf.display_name, sf.created_at, 
-                 sf.last_modified, sf.content_hash, q.name, q.display_name, q.order_index,
-                 sc.name, sc.display_name, sc.order_index
-        ORDER BY q.order_index, sc.order_index, sf.filename;
+        LEFT JOIN ranked latest ON latest.sql_file_id = sf.id AND latest.rn = 1
+        LEFT JOIN pattern_complexity pc ON pc.evaluation_id = latest.evaluation_id;
         """
         
-        conn.execute(text(view_sql))
+        ddl.append(view_sql)
     
-    def _create_recommendations_dashboard_view(self, conn):
+    def _create_recommendations_dashboard_view(self, ddl: List[str]):
         """Create recommendations dashboard view"""
         view_sql = """
-        CREATE OR REPLACE VIEW recommendations_dashboard AS
+        CREATE MATERIALIZED VIEW recommendations_dashboard AS
         SELECT 
             r.id as recommendation_id,
             r.category,
@@ -335,50 +987,35 @@ class AnalyticsViewManager:
             r.created_at as recommendation_date,
             
             -- Evaluation context
-            e.id as evaluation_id,
-            e.overall_assessment,
-            e.numeric_score,
-            e.letter_grade,
-            em.execution_success,
+            es.evaluation_id,
+            es.overall_assessment,
+            es.numeric_score,
+            es.letter_grade,
+            es.execution_success,
             
             -- File context
-            sf.filename,
-            sf.file_path,
-            q.name as quest_name,
-            q.display_name as quest_display_name,
-            sc.name as subcategory_name,
-            sc.display_name as subcategory_display_name,
+            es.filename,
+            es.file_path,
+            es.quest_name,
+            es.quest_display_name,
+            es.subcategory_name,
+            es.subcategory_display_name,
             
             -- Technical scores
-            a.technical_score,
-            a.educational_score,
+            es.technical_score,
+            es.educational_score,
             
-            -- Priority scoring for dashboard
-            CASE 
-                WHEN r.priority = 'High' AND r.expected_impact = 'High' THEN 10
-                WHEN r.priority = 'High' AND r.expected_impact = 'Medium' THEN 8
-                WHEN r.priority = 'High' AND r.expected_impact = 'Low' THEN 6
-                WHEN r.priority = 'Medium' AND r.expected_impact = 'High' THEN 7
-                WHEN r.priority = 'Medium' AND r.expected_impact = 'Medium' THEN 5
-                WHEN r.priority = 'Medium' AND r.expected_impact = 'Low' THEN 3
-                WHEN r.priority = 'Low' AND r.expected_impact = 'High' THEN 4
-                WHEN r.priority = 'Low' AND r.expected_impact = 'Medium' THEN 2
-                ELSE 1
-            END as priority_score
+            -- Priority scoring for dashboard, stored on the recommendation
+            r.priority_score
             
+        -- Evaluation, file, quest and analysis context comes precomputed from evaluation_summary
         FROM recommendations r
-        JOIN evaluations e ON r.evaluation_id = e.id
-        JOIN sql_files sf ON e.sql_file_id = sf.id
-        JOIN subcategories sc ON sf.subcategory_id = sc.id
-        JOIN quests q ON sc.quest_id = q.id
-        LEFT JOIN execution_metadata em ON e.id = em.evaluation_id
-        LEFT JOIN analyses a ON e.id = a.evaluation_id
-        ORDER BY priority_score DESC, r.created_at DESC;
+        JOIN evaluation_summary es ON es.evaluation_id = r.evaluation_id;
         """
         
-        conn.execute(text(view_sql))
+        ddl.append(view_sql)
     
-    def _create_analytics_functions(self, conn):
+    def _create_analytics_functions(self, ddl: List[str]):
         """Create analytics functions"""
         
         # Function to get quest statistics
@@ -392,8 +1029,6 @@ class AnalyticsViewManager:
             avg_score NUMERIC,
             latest_evaluation TIMESTAMP
         ) AS $$
-        BEGIN
-            RETURN QUERY
             SELECT 
                 qp.quest_name::VARCHAR,
                 qp.total_files,
@@ -402,14 +1037,14 @@ class AnalyticsViewManager:
                 qp.avg_score,
                 qp.latest_evaluation_date
             FROM quest_performance qp
-            WHERE quest_name_param IS NULL OR qp.quest_name = quest_name_param;
-        END;
-        $$ LANGUAGE plpgsql;
+            WHERE quest_name_param IS NULL OR qp.quest_name = quest_name_param
+            ORDER BY qp.order_index;
+        $$ LANGUAGE sql STABLE;
         """
         
-        conn.execute(text(function_sql))
+        ddl.append(function_sql)
         
-        # Function to get pattern usage trends - simplified for JSON patterns
+        # Function to get pattern usage trends - both windows counted in one pass
         trend_function_sql = """
         CREATE OR REPLACE FUNCTION get_pattern_usage_trends(days_param INTEGER DEFAULT 30)
         RETURNS TABLE(
@@ -418,54 +1053,48 @@ class AnalyticsViewManager:
             avg_quality_score NUMERIC,
             trend VARCHAR
         ) AS $$
-        BEGIN
-            RETURN QUERY
-            WITH recent_usage AS (
+            WITH windowed AS (
+                -- Pattern links from both windows, read in one scan
                 SELECT 
-                    p.name,
-                    (
-                        SELECT COUNT(*)
-                        FROM analyses a
-                        JOIN evaluations e ON a.evaluation_id = e.id
-                        WHERE JSON_CONTAINS(a.detected_patterns, JSON_QUOTE(p.name))
-                        AND e.evaluation_date >= CURRENT_DATE - (days_param || ' days')::INTERVAL
-                    ) as recent_count
-                FROM sql_patterns p
+                    ep.evaluation_id,
+                    ep.pattern_id,
+                    e.last_evaluated
+                FROM evaluation_patterns ep
+                JOIN evaluations e ON e.id = ep.evaluation_id
+                WHERE e.last_evaluated >= CURRENT_DATE - make_interval(days => days_param * 2)
             ),
-            previous_usage AS (
+            usage AS (
                 SELECT 
                     p.name,
-                    (
-                        SELECT COUNT(*)
-                        FROM analyses a
-                        JOIN evaluations e ON a.evaluation_id = e.id
-                        WHERE JSON_CONTAINS(a.detected_patterns, JSON_QUOTE(p.name))
-                        AND e.evaluation_date >= CURRENT_DATE - (days_param * 2 || ' days')::INTERVAL
-                        AND e.evaluation_date < CURRENT_DATE - (days_param || ' days')::INTERVAL
+                    COUNT(w.evaluation_id) FILTER (
+                        WHERE w.last_evaluated >= CURRENT_DATE - make_interval(days => days_param)
+                    ) as recent_count,
+                    COUNT(w.evaluation_id) FILTER (
+                        WHERE w.last_evaluated < CURRENT_DATE - make_interval(days => days_param)
                     ) as previous_count
                 FROM sql_patterns p
+                LEFT JOIN windowed w ON w.pattern_id = p.id
+                GROUP BY p.name
             )
             SELECT 
-                ru.name::VARCHAR,
-                ru.recent_count,
+                u.name::VARCHAR,
+                u.recent_count,
                 3.0::NUMERIC,  -- Simplified since we don't track confidence anymore
                 CASE 
-                    WHEN pu.previous_count IS NULL OR pu.previous_count = 0 THEN 'New'
-                    WHEN ru.recent_count > pu.previous_count THEN 'Increasing'
-                    WHEN ru.recent_count < pu.previous_count THEN 'Decreasing'
+                    WHEN u.previous_count = 0 THEN 'New'
+                    WHEN u.recent_count > u.previous_count THEN 'Increasing'
+                    WHEN u.recent_count < u.previous_count THEN 'Decreasing'
                     ELSE 'Stable'
                 END::VARCHAR as trend
-            FROM recent_usage ru
-            LEFT JOIN previous_usage pu ON ru.name = pu.name
-            ORDER BY ru.recent_count DESC;
-        END;
-        $$ LANGUAGE plpgsql;
+            FROM usage u
+            ORDER BY u.recent_count DESC;
+        $$ LANGUAGE sql STABLE;
         """
         
-        conn.execute(text(trend_function_sql))
+        ddl.append(trend_function_sql)
 
         # Function to get improvement opportunities - drop old version first
-        conn.execute(text("DROP FUNCTION IF EXISTS get_improvement_opportunities(INTEGER)"))
+        ddl.append("DROP FUNCTION IF EXISTS get_improvement_opportunities(INTEGER)")
         
         improvement_function_sql = """
         CREATE OR REPLACE FUNCTION get_improvement_opportunities()
@@ -481,8 +1110,17 @@ class AnalyticsViewManager:
             high_priority_recommendations_text TEXT,
             medium_priority_recommendations_text TEXT
         ) AS $$
-        BEGIN
-            RETURN QUERY
+            WITH rd_agg AS (
+                -- Every per-file recommendation figure from one grouped pass
+                SELECT 
+                    rd.file_path as path,
+                    COUNT(*) FILTER (WHERE rd.priority = 'High') as high_count,
+                    STRING_AGG(DISTINCT rd.category, ', ') FILTER (WHERE rd.priority IN ('High', 'Medium')) as issues,
+                    STRING_AGG(rd.recommendation_text, ' | ') FILTER (WHERE rd.priority = 'High') as high_text,
+                    STRING_AGG(rd.recommendation_text, ' | ') FILTER (WHERE rd.priority = 'Medium') as medium_text
+                FROM recommendations_dashboard rd
+                GROUP BY rd.file_path
+            )
             SELECT 
                 fp.file_path::VARCHAR,
                 fp.filename::VARCHAR,
@@ -490,381 +1128,137 @@ class AnalyticsViewManager:
                 fp.latest_score,
                 fp.latest_grade::VARCHAR,
                 fp.total_evaluations,
-                COALESCE((
-                    SELECT COUNT(*) 
-                    FROM recommendations_dashboard rd 
-                    WHERE rd.file_path = fp.file_path 
-                    AND rd.priority = 'High'
-                ), 0) as high_priority_recs,
-                COALESCE((
-                    SELECT STRING_AGG(DISTINCT rd.category, ', ')
-                    FROM recommendations_dashboard rd 
-                    WHERE rd.file_path = fp.file_path 
-                    AND rd.priority IN ('High', 'Medium')
-                ), 'No specific issues identified')::TEXT as primary_issues,
-                COALESCE((
-                    SELECT STRING_AGG(rd.recommendation_text, ' | ')
-                    FROM recommendations_dashboard rd 
-                    WHERE rd.file_path = fp.file_path 
-                    AND rd.priority = 'High'
-                ), 'No high priority recommendations')::TEXT as high_priority_text,
-                COALESCE((
-                    SELECT STRING_AGG(rd.recommendation_text, ' | ')
-                    FROM recommendations_dashboard rd 
-                    WHERE rd.file_path = fp.file_path 
-                    AND rd.priority = 'Medium'
-                ), 'No medium priority recommendations')::TEXT as medium_priority_text
+                ra.high_count as high_priority_recs,
+                COALESCE(ra.issues, 'No specific issues identified')::TEXT as primary_issues,
+                COALESCE(ra.high_text, 'No high priority recommendations')::TEXT as high_priority_text,
+                COALESCE(ra.medium_text, 'No medium priority recommendations')::TEXT as medium_priority_text
             FROM file_progress fp
+            -- Inner join keeps only files that have recommendations
+            JOIN rd_agg ra ON ra.path = fp.file_path
             WHERE fp.latest_score IS NOT NULL 
               AND fp.status NOT IN ('Never Evaluated', 'Outdated')
-              AND EXISTS (
-                  SELECT 1 FROM recommendations_dashboard rd 
-                  WHERE rd.file_path = fp.file_path
-              )
-            ORDER BY 
-                COALESCE((
-                    SELECT COUNT(*) 
-                    FROM recommendations_dashboard rd 
-                    WHERE rd.file_path = fp.file_path 
-                    AND rd.priority = 'High'
-                ), 0) DESC, 
-                fp.latest_score ASC;
-        END;
-        $$ LANGUAGE plpgsql;
+            ORDER BY ra.high_count DESC, fp.latest_score ASC;
+        $$ LANGUAGE sql STABLE;
         """
         
-        conn.execute(text(improvement_function_sql))
+        ddl.append(improvement_function_sql)
     
     def get_comprehensive_summary(self) -> Dict[str, Any]:
-        """Get comprehensive system summary with enhanced insights"""
+        """Get comprehensive system summary, cached until the evaluated data changes"""
         if not self.db_manager.SessionLocal:
             return {'error': 'Database connection not available'}
         
         try:
-            session = self.db_manager.SessionLocal()
-            
-            # Fixed summary query with proper counting
-            summary_query = text("""
-                WITH system_counts AS (
-                    SELECT 
-                        (SELECT COUNT(*) FROM quests) as total_quests,
-                        (SELECT COUNT(*) FROM subcategories) as total_subcategories,
-                        (SELECT COUNT(*) FROM sql_files) as total_sql_files,
-                        (SELECT COUNT(*) FROM evaluations) as total_evaluations,
-                        (SELECT COUNT(*) FROM sql_patterns) as total_patterns,
-                        (SELECT COUNT(DISTINCT category) FROM sql_patterns) as pattern_categories
-                ),
-                evaluation_metrics AS (
-                    SELECT 
-                        ROUND(AVG(e.numeric_score), 2) as overall_avg_score,
-                        COUNT(CASE WHEN em.execution_success = true THEN 1 END)::float / 
-                        NULLIF(COUNT(*), 0) * 100 as overall_success_rate,
-                        COUNT(CASE WHEN e.letter_grade IN ('A+', 'A', 'A-') THEN 1 END) as excellent_evaluations,
-                        COUNT(CASE WHEN e.letter_grade IN ('B+', 'B', 'B-') THEN 1 END) as good_evaluations,
-                        COUNT(CASE WHEN e.letter_grade IN ('C+', 'C', 'C-') THEN 1 END) as fair_evaluations,
-                        COUNT(CASE WHEN e.letter_grade IN ('D+', 'D', 'D-', 'F') THEN 1 END) as poor_evaluations
-                    FROM evaluations e
-                    LEFT JOIN execution_metadata em ON e.id = em.evaluation_id
-                ),
-                activity_metrics AS (
-                    SELECT 
-                        COUNT(CASE WHEN e.last_evaluated >= CURRENT_DATE - INTERVAL '1 day' THEN 1 END) as evals_last_day,
-                        COUNT(CASE WHEN e.last_evaluated >= CURRENT_DATE - INTERVAL '7 days' THEN 1 END) as evals_last_week,
-                        COUNT(CASE WHEN e.last_evaluated >= CURRENT_DATE - INTERVAL '30 days' THEN 1 END) as evals_last_month
-                    FROM evaluations e
-                ),
-                recommendation_metrics AS (
-                    SELECT 
-                        COUNT(DISTINCT CASE WHEN r.priority = 'High' THEN r.evaluation_id END) as high_priority_issues,
-                        COUNT(DISTINCT CASE WHEN r.priority = 'Medium' THEN r.evaluation_id END) as medium_priority_issues
-                    FROM recommendations r
-                ),
-                pattern_metrics AS (
-                    SELECT 
-                        COUNT(DISTINCT e.id) as analyses_with_patterns
-                    FROM evaluations e
-                    WHERE e.detected_patterns IS NOT NULL 
-                    AND e.detected_patterns::text != '[]'
-                    AND e.detected_patterns::text != 'null'
-                    AND e.detected_patterns::text != ''
-                )
-                SELECT 
-                    sc.*,
-                    em.*,
-                    am.*,
-                    rm.*,
-                    pm.analyses_with_patterns
-                FROM system_counts sc, evaluation_metrics em, activity_metrics am, 
-                     recommendation_metrics rm, pattern_metrics pm
-            """)
-            
-            summary_result = session.execute(summary_query).fetchone()
-            
-            # Get quest breakdown with corrected calculations
-            quest_breakdown_query = text("""
-                SELECT 
-                    q.name as quest_name,
-                    q.display_name as quest_display_name,
-                    COUNT(DISTINCT sc.id) as subcategory_count,
-                    COUNT(DISTINCT sf.id) as file_count,
-                    COUNT(DISTINCT e.id) as evaluation_count,
-                    ROUND(AVG(e.numeric_score)::numeric, 2) as avg_score,
-                    CASE 
-                        WHEN COUNT(e.id) > 0 THEN
-                            ROUND((COUNT(CASE WHEN em.execution_success = true THEN 1 END)::numeric / 
-                            COUNT(e.id) * 100), 1)
-                        ELSE 0
-                    END as success_rate,
-                    MAX(e.last_evaluated) as last_evaluated,
-                    COUNT(CASE WHEN e.letter_grade IN ('A+', 'A', 'A-') THEN 1 END) as excellent_count
-                FROM quests q
-                LEFT JOIN subcategories sc ON q.id = sc.quest_id
-                LEFT JOIN sql_files sf ON sc.id = sf.subcategory_id
-                LEFT JOIN evaluations e ON sf.id = e.sql_file_id
-                LEFT JOIN execution_metadata em ON e.id = em.evaluation_id
-                GROUP BY q.id, q.name, q.display_name, q.order_index
-                ORDER BY q.order_index
-            """)
-            
-            quest_breakdown = session.execute(quest_breakdown_query).fetchall()
-            
-            # Get top performing files
-            top_performers_query = text("""
-                SELECT 
-                    sf.file_path as relative_path,
-                    q.display_name as quest_name,
-                    sc.name as subcategory_name,
-                    e.letter_grade,
-                    e.numeric_score,
-                    e.last_evaluated as evaluation_date,
-                    em.execution_time_ms,
-                    CASE 
-                        WHEN e.detected_patterns IS NOT NULL 
-                        THEN json_array_length(e.detected_patterns)
-                        ELSE 0
-                    END as pattern_count
-                FROM sql_files sf
-                JOIN evaluations e ON sf.id = e.sql_file_id
-                JOIN subcategories sc ON sf.subcategory_id = sc.id
-                JOIN quests q ON sc.quest_id = q.id
-                LEFT JOIN execution_metadata em ON e.id = em.evaluation_id
-                WHERE e.letter_grade IN ('A+', 'A', 'A-')
-                ORDER BY e.numeric_score DESC, e.last_evaluated DESC
-                LIMIT 10
-            """)
-            
-            top_performers = session.execute(top_performers_query).fetchall()
-            
-            # Get pattern insights with improved accuracy
-            pattern_insights_query = text("""
-                SELECT 
-                    sp.display_name,
-                    sp.category,
-                    sp.complexity_level,
-                    COUNT(DISTINCT CASE 
-                        WHEN e.detected_patterns IS NOT NULL 
-                        AND e.detected_patterns::text LIKE '%"' || sp.name || '"%' 
-                        THEN e.id 
-                    END) as usage_count,
-                    ROUND(AVG(CASE 
-                        WHEN e.detected_patterns IS NOT NULL 
-                        AND e.detected_patterns::text LIKE '%"' || sp.name || '"%' 
-                        THEN e.numeric_score 
-                    END)::numeric, 1) as avg_score_when_used
-                FROM sql_patterns sp
-                LEFT JOIN evaluations e ON e.detected_patterns IS NOT NULL
-                GROUP BY sp.id, sp.display_name, sp.category, sp.complexity_level
-                HAVING COUNT(DISTINCT CASE 
-                    WHEN e.detected_patterns IS NOT NULL 
-                    AND e.detected_patterns::text LIKE '%"' || sp.name || '"%' 
-                    THEN e.id 
-                END) > 0
-                ORDER BY usage_count DESC, avg_score_when_used DESC NULLS LAST
-                LIMIT 10
-            """)
-            
-            pattern_insights = session.execute(pattern_insights_query).fetchall()
-            
-            session.close()
-            
-            # Calculate additional insights with proper bounds checking
-            total_evals = summary_result.total_evaluations or 0
-            excellent_count = summary_result.excellent_evaluations or 0
-            excellent_percentage = round(excellent_count / max(total_evals, 1) * 100, 1) if total_evals > 0 else 0
-            # Ensure percentage doesn't exceed 100%
-            excellent_percentage = min(excellent_percentage, 100.0)
-            
-            active_percentage = round((summary_result.evals_last_week or 0) / max(total_evals, 1) * 100, 1) if total_evals > 0 else 0
-            active_percentage = min(active_percentage, 100.0)
-            
-            return {
-                'system_overview': {
-                    'total_quests': summary_result.total_quests or 0,
-                    'total_subcategories': summary_result.total_subcategories or 0,
-                    'total_sql_files': summary_result.total_sql_files or 0,
-                    'total_evaluations': total_evals,
-                    'total_patterns': summary_result.total_patterns or 0,
-                    'pattern_categories': summary_result.pattern_categories or 0
-                },
-                'quality_metrics': {
-                    'overall_avg_score': float(summary_result.overall_avg_score or 0),
-                    'overall_success_rate': round(float(summary_result.overall_success_rate or 0), 1),
-                    'excellent_evaluations': summary_result.excellent_evaluations or 0,
-                    'excellent_percentage': excellent_percentage,
-                    'good_evaluations': summary_result.good_evaluations or 0,
-                    'fair_evaluations': summary_result.fair_evaluations or 0,
-                    'poor_evaluations': summary_result.poor_evaluations or 0,
-                    'high_priority_issues': summary_result.high_priority_issues or 0,
-                    'medium_priority_issues': summary_result.medium_priority_issues or 0
-                },
-                'activity_metrics': {
-                    'evaluations_last_day': summary_result.evals_last_day or 0,
-                    'evaluations_last_week': summary_result.evals_last_week or 0,
-                    'evaluations_last_month': summary_result.evals_last_month or 0,
-                    'recent_activity_percentage': active_percentage
-                },
-                'quest_breakdown': [dict(row._mapping) for row in quest_breakdown],
-                'top_performers': [dict(row._mapping) for row in top_performers],
-                'pattern_insights': [dict(row._mapping) for row in pattern_insights],
-                'insights': {
-                    'most_active_quest': max(quest_breakdown, key=lambda x: x.evaluation_count or 0).quest_display_name if quest_breakdown else 'None',
-                    'highest_scoring_quest': max(quest_breakdown, key=lambda x: x.avg_score or 0).quest_display_name if quest_breakdown else 'None',
-                    'patterns_with_analysis': summary_result.analyses_with_patterns or 0,
-                    'system_health': 'Excellent' if excellent_percentage > 70 else 'Good' if excellent_percentage > 50 else 'Needs Improvement'
-                }
-            }
+            with self._reporting_connection() as conn:
+                state = conn.execute(MART_SOURCE_STATE_QUERY).scalar()
+            return self._cached(
+                f"{SUMMARY_CACHE_PREFIX}{state}",
+                lambda: self._build_summary(self._fetch_bundle(SUMMARY_BUNDLE_QUERY))
+            )
             
         except Exception as e:
             print(f"❌ Error getting comprehensive summary: {e}")
             return {'error': str(e)}
+    
+    def _build_summary(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape a bundled summary payload into the report structure"""
+        summary = data['summary']
+        quest_breakdown = data['quest_breakdown']
+        
+        # Calculate additional insights with proper bounds checking
+        total_evals = summary['total_evaluations'] or 0
+        excellent_count = summary['excellent_evaluations'] or 0
+        excellent_percentage = round(excellent_count / max(total_evals, 1) * 100, 1) if total_evals > 0 else 0
+        # Ensure percentage doesn't exceed 100%
+        excellent_percentage = min(excellent_percentage, 100.0)
+        
+        active_percentage = round((summary['evals_last_week'] or 0) / max(total_evals, 1) * 100, 1) if total_evals > 0 else 0
+        active_percentage = min(active_percentage, 100.0)
+        
+        return {
+            'system_overview': {
+                'total_quests': summary['total_quests'] or 0,
+                'total_subcategories': summary['total_subcategories'] or 0,
+                'total_sql_files': summary['total_sql_files'] or 0,
+                'total_evaluations': total_evals,
+                'total_patterns': summary['total_patterns'] or 0,
+                'pattern_categories': summary['pattern_categories'] or 0
+            },
+            'quality_metrics': {
+                'overall_avg_score': float(summary['overall_avg_score'] or 0),
+                'overall_success_rate': round(float(summary['overall_success_rate'] or 0), 1),
+                'excellent_evaluations': summary['excellent_evaluations'] or 0,
+                'excellent_percentage': excellent_percentage,
+                'good_evaluations': summary['good_evaluations'] or 0,
+                'fair_evaluations': summary['fair_evaluations'] or 0,
+                'poor_evaluations': summary['poor_evaluations'] or 0,
+                'high_priority_issues': summary['high_priority_issues'] or 0,
+                'medium_priority_issues': summary['medium_priority_issues'] or 0
+            },
+            'activity_metrics': {
+                'evaluations_last_day': summary['evals_last_day'] or 0,
+                'evaluations_last_week': summary['evals_last_week'] or 0,
+                'evaluations_last_month': summary['evals_last_month'] or 0,
+                'recent_activity_percentage': active_percentage
+            },
+            'quest_breakdown': quest_breakdown,
+            'top_performers': data['top_performers'],
+            'pattern_insights': data['pattern_insights'],
+            'insights': {
+                'most_active_quest': max(quest_breakdown, key=lambda x: x['evaluation_count'] or 0)['quest_display_name'] if quest_breakdown else 'None',
+                'highest_scoring_quest': max(quest_breakdown, key=lambda x: x['avg_score'] or 0)['quest_display_name'] if quest_breakdown else 'None',
+                'patterns_with_analysis': summary['analyses_with_patterns'] or 0,
+                'system_health': 'Excellent' if excellent_percentage > 70 else 'Good' if excellent_percentage > 50 else 'Needs Improvement'
+            }
+        }
 
     def get_dashboard_data(self) -> Dict[str, Any]:
-        """Get comprehensive dashboard data"""
+        """Get comprehensive dashboard data, served from cache while recent"""
+        return self._cached(DASHBOARD_CACHE_KEY, self._compute_dashboard_data)
+    
+    def _compute_dashboard_data(self) -> Dict[str, Any]:
         if not self.db_manager.SessionLocal:
             return {}
         
         try:
-            # Get the enhanced comprehensive summary
-            comprehensive_data = self.get_comprehensive_summary()
-            if 'error' in comprehensive_data:
-                return comprehensive_data
-            
-            session = self.db_manager.SessionLocal()
-            
-            # Get recent evaluations
-            recent_evaluations = session.execute(text("""
-                SELECT * FROM evaluation_summary 
-                ORDER BY evaluation_date DESC 
-                LIMIT 10
-            """)).fetchall()
-            
-            # Get improvement opportunities - show all files with recommendations regardless of score
-            improvements = session.execute(text("""
-                SELECT * FROM get_improvement_opportunities() LIMIT 10
-            """)).fetchall()
-            
-            session.close()
+            # Summary, recent evaluations and improvement opportunities in one round-trip
+            data = self._fetch_bundle(DASHBOARD_BUNDLE_QUERY)
             
             # Combine comprehensive summary with dashboard specific data
             return {
-                **comprehensive_data,
-                'recent_evaluations': [dict(row._mapping) for row in recent_evaluations],
-                'improvement_opportunities': [dict(row._mapping) for row in improvements]
+                **self._build_summary(data),
+                'recent_evaluations': data['recent_evaluations'],
+                'improvement_opportunities': data['improvement_opportunities']
             }
             
         except Exception as e:
             print(f"❌ Error getting dashboard data: {e}")
             return {'error': str(e)}
-            
-        except Exception as e:
-            print(f"❌ Error getting dashboard data: {e}")
-            return {'error': str(e)}
     
     def get_detailed_analytics(self, quest_name: str = None, days: int = 30) -> Dict[str, Any]:
-        """Get detailed analytics for a specific quest or overall"""
+        """Get detailed analytics for a specific quest or overall, served from cache while recent"""
+        return self._cached(
+            f"{DETAILED_CACHE_PREFIX}{quest_name}:{days}",
+            lambda: self._compute_detailed_analytics(quest_name, days)
+        )
+    
+    def _compute_detailed_analytics(self, quest_name: str, days: int) -> Dict[str, Any]:
         if not self.db_manager.SessionLocal:
             return {}
         
         try:
-            session = self.db_manager.SessionLocal()
-            
-            # Build base filter
-            date_filter = f"AND e.last_evaluated >= CURRENT_DATE - INTERVAL '{days} days'"
-            quest_filter = f"AND q.name = '{quest_name}'" if quest_name else ""
+            # Bound filter values; the statement itself is built once at import
+            params = {'days': days, 'quest_name': quest_name}
             
-            # Score distribution
-            score_dist_query = text(f"""
-                SELECT 
-                    e.letter_grade,
-                    COUNT(*) as count,
-                    ROUND(COUNT(*)::numeric / SUM(COUNT(*)) OVER () * 100, 1) as percentage
-                FROM evaluations e
-                JOIN sql_files sf ON e.sql_file_id = sf.id
-                JOIN subcategories sc ON sf.subcategory_id = sc.id
-                JOIN quests q ON sc.quest_id = q.id
-                WHERE 1=1 {date_filter} {quest_filter}
-                GROUP BY e.letter_grade
-                ORDER BY 
-                    CASE e.letter_grade 
-                        WHEN 'A+' THEN 1 WHEN 'A' THEN 2 WHEN 'A-' THEN 3
-                        WHEN 'B+' THEN 4 WHEN 'B' THEN 5 WHEN 'B-' THEN 6
-                        WHEN 'C+' THEN 7 WHEN 'C' THEN 8 WHEN 'C-' THEN 9
-                        WHEN 'D+' THEN 10 WHEN 'D' THEN 11 WHEN 'D-' THEN 12
-                        WHEN 'F' THEN 13 ELSE 14
-                    END
-            """)
-            
-            score_distribution = session.execute(score_dist_query).fetchall()
-            
-            # Pattern usage over time - simplified for JSON patterns
-            pattern_trends_query = text(f"""
-                SELECT 
-                    DATE(e.last_evaluated) as evaluation_date,
-                    'Mixed' as category,  -- Simplified since we don't have pattern categories in JSON
-                    COUNT(DISTINCT e.id) as pattern_usage_count
-                FROM evaluations e
-                JOIN analyses a ON e.id = a.evaluation_id
-                JOIN sql_files sf ON e.sql_file_id = sf.id
-                JOIN subcategories sc ON sf.subcategory_id = sc.id
-                JOIN quests q ON sc.quest_id = q.id
-                WHERE e.detected_patterns IS NOT NULL 
-                AND json_array_length(e.detected_patterns) > 0
-                {date_filter} {quest_filter}
-                GROUP BY DATE(e.last_evaluated)
-                ORDER BY evaluation_date
-            """)
-            
-            pattern_trends = session.execute(pattern_trends_query).fetchall()
-            
-            # Performance metrics over time
-            performance_query = text(f"""
-                SELECT 
-                    DATE(e.last_evaluated) as evaluation_date,
-                    COUNT(*) as evaluation_count,
-                    ROUND(AVG(e.numeric_score), 2) as avg_score,
-                    ROUND(AVG(em.execution_time_ms), 2) as avg_execution_time,
-                    COUNT(CASE WHEN em.execution_success = true THEN 1 END)::float / 
-                    NULLIF(COUNT(*), 0) * 100 as success_rate
-                FROM evaluations e
-                JOIN sql_files sf ON e.sql_file_id = sf.id
-                JOIN subcategories sc ON sf.subcategory_id = sc.id
-                JOIN quests q ON sc.quest_id = q.id
-                LEFT JOIN execution_metadata em ON e.id = em.evaluation_id
-                WHERE 1=1 {date_filter} {quest_filter}
-                GROUP BY DATE(e.last_evaluated)
-                ORDER BY evaluation_date
-            """)
-            
-            performance_trends = session.execute(performance_query).fetchall()
-            
-            session.close()
+            # Score distribution, pattern usage and performance over time in one round-trip
+            data = self._fetch_bundle(DETAILED_ANALYTICS_QUERY, params)
             
             return {
                 'period_days': days,
                 'quest_filter': quest_name,
-                'score_distribution': [dict(row._mapping) for row in score_distribution],
-                'pattern_trends': [dict(row._mapping) for row in pattern_trends],
-                'performance_trends': [dict(row._mapping) for row in performance_trends]
+                'score_distribution': data['score_distribution'],
+                'pattern_trends': data['pattern_trends'],
+                'performance_trends': data['performance_trends']
             }
             
         except Exception as e:
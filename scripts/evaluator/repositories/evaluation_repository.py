@@ -4,11 +4,14 @@ Enhanced Evaluation Repository for normalized schema with reasoning
 Handles the new structure: Evaluation + ExecutionMetadata + Analysis with reasoning
 """
 
+import copy
 import re
+import time
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from repositories.base_repository import BaseRepository
 from database.tables import (
@@ -17,15 +20,42 @@ from database.tables import (
 )
 from config import EvaluationConfig
 
+# Precompiled patterns for parsing loosely formatted LLM values
+NUMBER_PATTERN = re.compile(r'(\d+\.?\d*)')
+INTEGER_PATTERN = re.compile(r'(\d+)')
+TIME_TEXT_PATTERN = re.compile(r'(\d+)[-\s]*(\d+)?\s*(min|minute|hour)')
+
+# Flat alias lookups for constraint values; anything unlisted normalizes to 'Medium'
+PRIORITY_ALIASES = {
+    'low': 'Low', 'minor': 'Low',
+    'high': 'High', 'critical': 'High', 'important': 'High',
+}
+EFFORT_ALIASES = {
+    'low': 'Low', 'easy': 'Low', 'simple': 'Low',
+    'high': 'High', 'hard': 'High', 'difficult': 'High', 'complex': 'High',
+}
+IMPACT_ALIASES = {
+    'low': 'Low', 'small': 'Low', 'minor': 'Low',
+    'high': 'High', 'large': 'High', 'major': 'High', 'significant': 'High',
+}
+
+# Derived statistics keyed by (database url, report, args) -> (sentinel, result, expires_at).
+# The sentinel is (MAX(last_evaluated), COUNT(*)), so any new or updated evaluation misses.
+# Entries expire after the TTL and the least recently used one is evicted past the size cap.
+ANALYTICS_CACHE_TTL_SECONDS = 60
+ANALYTICS_CACHE_MAX_ENTRIES = 128
+_stats_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
 class EvaluationRepository(BaseRepository[Evaluation]):
     def __init__(self, session: Session):
         super().__init__(session, Evaluation)
         self.config = EvaluationConfig()
     
-    def upsert_evaluation(self, evaluation_data: Dict[str, Any], execution_metadata: Optional[Dict[str, Any]] = None) -> Optional[Evaluation]:
+    def upsert_evaluation(self, evaluation_data: Dict[str, Any], execution_metadata: Optional[Dict[str, Any]] = None, commit: bool = True) -> Optional[Evaluation]:
         """
         UPSERT: Insert or update evaluation with normalized structure
         Handles: Evaluation + ExecutionMetadata + Analysis + Recommendations
+        Pass commit=False to batch several upserts into one transaction.
         """
         try:
             sql_file_path = evaluation_data.get('file_path')
@@ -186,7 +216,8 @@ class EvaluationRepository(BaseRepository[Evaluation]):
                     )
                     self.session.add(recommendation)
             
-            self.session.commit()
+            if commit:
+                self.session.commit()
             return evaluation
             
         except Exception as e:
@@ -201,7 +232,7 @@ class EvaluationRepository(BaseRepository[Evaluation]):
                 return float(value)
             elif isinstance(value, str):
                 # Try to extract number from string
-                number_match = re.search(r'(\d+\.?\d*)', value)
+                number_match = NUMBER_PATTERN.search(value)
                 if number_match:
                     return float(number_match.group(1))
             return 5.0  # Default score
@@ -212,7 +243,7 @@ class EvaluationRepository(BaseRepository[Evaluation]):
         """Parse time estimate string to minutes"""
         try:
             # Extract numbers from time string
-            numbers = re.findall(r'\d+', str(time_str))
+            numbers = INTEGER_PATTERN.findall(str(time_str))
             if numbers:
                 return int(numbers[0])  # Take first number found
             return 10  # Default fallback
@@ -221,25 +252,11 @@ class EvaluationRepository(BaseRepository[Evaluation]):
     
     def _normalize_priority(self, priority: str) -> str:
         """Normalize priority to valid constraint values"""
-        priority_lower = priority.lower() if priority else 'medium'
-        
-        if priority_lower in ['low', 'minor']:
-            return 'Low'
-        elif priority_lower in ['high', 'critical', 'important']:
-            return 'High'
-        else:
-            return 'Medium'
+        return PRIORITY_ALIASES.get(priority.lower(), 'Medium') if priority else 'Medium'
     
     def _normalize_effort(self, effort: str) -> str:
         """Normalize implementation effort to valid constraint values"""
-        effort_lower = effort.lower() if effort else 'medium'
-        
-        if effort_lower in ['low', 'easy', 'simple']:
-            return 'Low'
-        elif effort_lower in ['high', 'hard', 'difficult', 'complex']:
-            return 'High'
-        else:
-            return 'Medium'
+        return EFFORT_ALIASES.get(effort.lower(), 'Medium') if effort else 'Medium'
     
     def _categorize_recommendation(self, recommendation_text: str) -> str:
         """Categorize recommendation based on content keywords"""
@@ -261,61 +278,72 @@ class EvaluationRepository(BaseRepository[Evaluation]):
     def get_evaluation_with_details(self, sql_file_path: str) -> Optional[Dict[str, Any]]:
         """Get complete evaluation details for a SQL file"""
         
-        sql_file = self.session.query(SQLFile).filter(
+        # One round-trip: the evaluation and all of its related rows are joined in
+        evaluation = self.session.query(Evaluation).join(Evaluation.sql_file).filter(
             SQLFile.file_path == sql_file_path
-        ).first()
-        
-        if not sql_file:
-            return None
-            
-        evaluation = self.session.query(Evaluation).filter(
-            Evaluation.sql_file_id == sql_file.id
+        ).options(
+            joinedload(Evaluation.sql_file),
+            joinedload(Evaluation.execution_metadata),
+            joinedload(Evaluation.analysis),
+            joinedload(Evaluation.recommendations)
         ).first()
         
         if not evaluation:
             return None
         
-        # Get related data
-        exec_metadata = self.session.query(ExecutionMetadata).filter(
-            ExecutionMetadata.evaluation_id == evaluation.id
-        ).first()
-        
-        analysis = self.session.query(Analysis).filter(
-            Analysis.evaluation_id == evaluation.id
-        ).first()
-        
-        recommendations = self.session.query(Recommendation).filter(
-            Recommendation.evaluation_id == evaluation.id
-        ).all()
-        
         return {
             'evaluation': evaluation,
-            'execution_metadata': exec_metadata,
-            'analysis': analysis,
-            'recommendations': recommendations,
-            'sql_file': sql_file
+            'execution_metadata': evaluation.execution_metadata,
+            'analysis': evaluation.analysis,
+            'recommendations': evaluation.recommendations,
+            'sql_file': evaluation.sql_file
         }
     
+    def _evaluations_sentinel(self) -> tuple:
+        """Cheap change marker for evaluations: (MAX(last_evaluated), COUNT(*))"""
+        return tuple(self.session.query(
+            func.max(Evaluation.last_evaluated), func.count(Evaluation.id)
+        ).one())
+    
+    def _stats_cache_key(self, *args) -> tuple:
+        return (str(self.session.get_bind().url),) + args
+    
+    def _get_cached_stats(self, cache_key: tuple, sentinel: tuple) -> Optional[Dict[str, Any]]:
+        """Return a cached result if its sentinel still matches and it has not expired"""
+        cached = _stats_cache.get(cache_key)
+        if cached is None:
+            return None
+        if time.monotonic() >= cached[2]:
+            del _stats_cache[cache_key]
+            return None
+        if cached[0] != sentinel:
+            return None
+        _stats_cache.move_to_end(cache_key)
+        # Hand out a copy so a caller's edits never leak into later hits
+        return copy.deepcopy(cached[1])
+    
+    def _store_stats(self, cache_key: tuple, sentinel: tuple, result: Dict[str, Any]) -> None:
+        """Cache a result for the TTL, evicting the least recently used entries past the cap"""
+        _stats_cache[cache_key] = (sentinel, copy.deepcopy(result), time.monotonic() + ANALYTICS_CACHE_TTL_SECONDS)
+        _stats_cache.move_to_end(cache_key)
+        while len(_stats_cache) > ANALYTICS_CACHE_MAX_ENTRIES:
+            _stats_cache.popitem(last=False)
+    
     def get_quest_summary_statistics(self, quest_id: int) -> Dict[str, Any]:
         """Get summary statistics for a quest"""
         
+        # Analysis is one-to-one, so the outer join keeps evaluation counts intact
         query = self.session.query(
             func.count(Evaluation.id).label('total_evaluations'),
             func.avg(Evaluation.numeric_score).label('avg_score'),
             func.count(Evaluation.id).filter(Evaluation.overall_assessment == 'PASS').label('pass_count'),
             func.count(Evaluation.id).filter(Evaluation.overall_assessment == 'FAIL').label('fail_count'),
-            func.count(Evaluation.id).filter(Evaluation.overall_assessment == 'NEEDS_REVIEW').label('review_count')
-        ).filter(Evaluation.quest_id == quest_id)
-        
-        result = query.first()
-        
-        # Get technical and educational score averages
-        tech_edu_query = self.session.query(
+            func.count(Evaluation.id).filter(Evaluation.overall_assessment == 'NEEDS_REVIEW').label('review_count'),
             func.avg(Analysis.technical_score).label('avg_technical'),
             func.avg(Analysis.educational_score).label('avg_educational')
-        ).join(Evaluation).filter(Evaluation.quest_id == quest_id)
+        ).outerjoin(Evaluation.analysis).filter(Evaluation.quest_id == quest_id)
         
-        tech_edu_result = tech_edu_query.first()
+        result = query.first()
         
         return {
             'total_evaluations': result.total_evaluations or 0,
@@ -323,34 +351,29 @@ class EvaluationRepository(BaseRepository[Evaluation]):
             'pass_count': result.pass_count or 0,
             'fail_count': result.fail_count or 0,
             'review_count': result.review_count or 0,
-            'average_technical_score': float(tech_edu_result.avg_technical or 0),
-            'average_educational_score': float(tech_edu_result.avg_educational or 0)
+            'average_technical_score': float(result.avg_technical or 0),
+            'average_educational_score': float(result.avg_educational or 0)
         }
     
     def get_recent_evaluations(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent evaluations with summary info"""
         
-        evaluations = self.session.query(Evaluation).join(SQLFile).order_by(Evaluation.last_evaluated.desc()).limit(limit).all()
-        
-        results = []
-        for evaluation in evaluations:
-            analysis = self.session.query(Analysis).filter(
-                Analysis.evaluation_id == evaluation.id
-            ).first()
-
-            results.append({
-                'file_path': evaluation.sql_file.file_path,
-                'filename': evaluation.sql_file.filename,
-                'quest_name': evaluation.quest.name,
-                'overall_assessment': evaluation.overall_assessment,
-                'letter_grade': evaluation.letter_grade,
-                'numeric_score': evaluation.numeric_score,
-                'technical_score': analysis.technical_score if analysis else None,
-                'educational_score': analysis.educational_score if analysis else None,
-                'last_evaluated': evaluation.last_evaluated
-            })
+        # Labelled columns map straight onto the result dicts; analysis is outer
+        # joined so files without one still appear (with None scores)
+        rows = self.session.query(
+            SQLFile.file_path.label('file_path'),
+            SQLFile.filename.label('filename'),
+            Quest.name.label('quest_name'),
+            Evaluation.overall_assessment.label('overall_assessment'),
+            Evaluation.letter_grade.label('letter_grade'),
+            Evaluation.numeric_score.label('numeric_score'),
+            Analysis.technical_score.label('technical_score'),
+            Analysis.educational_score.label('educational_score'),
+            Evaluation.last_evaluated.label('last_evaluated')
+        ).join(Evaluation.sql_file).join(Evaluation.quest).outerjoin(Evaluation.analysis)\
+            .order_by(Evaluation.last_evaluated.desc()).limit(limit)
         
-        return results
+        return [dict(row._mapping) for row in rows]
 
     # Legacy compatibility methods
     def add_from_data(self, sql_file_id: int, evaluation_data: dict) -> Evaluation:
@@ -377,29 +400,21 @@ class EvaluationRepository(BaseRepository[Evaluation]):
     def get_current_evaluation(self, file_path: str) -> Optional[Dict[str, Any]]:
         """Get current evaluation state for a file"""
         try:
-            sql_file = self.session.query(SQLFile).filter(
+            evaluation = self.session.query(Evaluation).join(Evaluation.sql_file).filter(
                 SQLFile.file_path == file_path
-            ).first()
-            
-            if not sql_file:
-                return None
-            
-            evaluation = self.session.query(Evaluation).filter(
-                Evaluation.sql_file_id == sql_file.id
+            ).options(
+                joinedload(Evaluation.sql_file),
+                joinedload(Evaluation.quest),
+                joinedload(Evaluation.recommendations)
             ).first()
             
             if not evaluation:
                 return None
             
-            # Get related data
-            recommendations = self.session.query(Recommendation).filter(
-                Recommendation.evaluation_id == evaluation.id
-            ).all()
-            
             return {
                 'evaluation': evaluation,
-                'recommendations': recommendations,
-                'file': sql_file,
+                'recommendations': evaluation.recommendations,
+                'file': evaluation.sql_file,
                 'quest': evaluation.quest
             }
             
@@ -413,10 +428,8 @@ class EvaluationRepository(BaseRepository[Evaluation]):
             return 5.0
         
         # Look for patterns like "score: 8", "8/10", "grade: B" etc.
-        import re
-        
         # Try to find direct numbers
-        number_match = re.search(r'(\d+\.?\d*)', text)
+        number_match = NUMBER_PATTERN.search(text)
         if number_match:
             score = float(number_match.group(1))
             # Normalize to 0-10 scale if needed
@@ -444,10 +457,8 @@ class EvaluationRepository(BaseRepository[Evaluation]):
         if not text:
             return 10  # Default 10 minutes
         
-        import re
-        
         # Look for patterns like "5-10 min", "15 minutes", "1 hour"
-        time_match = re.search(r'(\d+)[-\s]*(\d+)?\s*(min|minute|hour)', text.lower())
+        time_match = TIME_TEXT_PATTERN.search(text.lower())
         if time_match:
             time_val = int(time_match.group(1))
             if 'hour' in time_match.group(3):
@@ -455,7 +466,7 @@ class EvaluationRepository(BaseRepository[Evaluation]):
             return time_val
         
         # Look for just numbers with context
-        number_match = re.search(r'(\d+)', text)
+        number_match = INTEGER_PATTERN.search(text)
         if number_match:
             return int(number_match.group(1))
         
@@ -464,56 +475,76 @@ class EvaluationRepository(BaseRepository[Evaluation]):
     
     def get_evaluation_analytics(self, quest_name: Optional[str] = None, 
                                days: int = 30) -> Dict[str, Any]:
-        """Get comprehensive evaluation analytics"""        
+        """Get comprehensive evaluation analytics, reused while evaluations are unchanged"""
+        try:
+            sentinel = self._evaluations_sentinel()
+        except Exception as e:
+            print(f"❌ Error generating analytics: {e}")
+            return {'error': str(e)}
+        
+        # The window is relative to now, so results also expire after a short TTL
+        cache_key = self._stats_cache_key('analytics', quest_name, days)
+        cached = self._get_cached_stats(cache_key, sentinel)
+        if cached is not None:
+            return cached
+        
+        result = self._compute_evaluation_analytics(quest_name, days)
+        if 'error' not in result:
+            self._store_stats(cache_key, sentinel, result)
+        return result
+    
+    def _compute_evaluation_analytics(self, quest_name: Optional[str], days: int) -> Dict[str, Any]:
+        """Run the analytics query and aggregate it"""
         try:            
-            # Base query
-            query = self.session.query(Evaluation)
+            # Aggregate in the database: one scan returns a row per (quest, grade)
+            # group, so Python only folds a handful of partial counts
+            query = self.session.query(
+                Quest.name,
+                Evaluation.letter_grade,
+                func.count(Evaluation.id),
+                func.count(Evaluation.id).filter(ExecutionMetadata.execution_success.is_(True)),
+                func.sum(Evaluation.numeric_score)
+            ).join(Evaluation.quest).outerjoin(Evaluation.execution_metadata)
             if quest_name:
-                quest = self.session.query(Quest).filter(Quest.name == quest_name).first()
-                if quest:
-                    query = query.filter(Evaluation.quest_id == quest.id)
+                query = query.filter(Quest.name == quest_name)
             
             # Date filter
             cutoff_date = datetime.now() - timedelta(days=days)
-            query = query.filter(Evaluation.evaluation_date >= cutoff_date)
+            query = query.filter(Evaluation.last_evaluated >= cutoff_date)
             
-            evaluations = query.all()
+            groups = query.group_by(Quest.name, Evaluation.letter_grade).all()
             
-            if not evaluations:
+            if not groups:
                 return {'message': 'No evaluations found for the specified criteria'}
             
-            # Calculate analytics
-            total_evaluations = len(evaluations)
-            successful_evals = len([e for e in evaluations if e.execution_success])
-            avg_score = sum(e.numeric_score for e in evaluations) / total_evaluations
-            
-            # Score distribution
+            # Fold the grouped partials into totals, grade distribution and quest performance
+            total_evaluations = 0
+            successful_evals = 0
+            score_total = 0.0
             score_distribution = {}
-            for evaluation in evaluations:
-                grade = evaluation.letter_grade
-                score_distribution[grade] = score_distribution.get(grade, 0) + 1
-            
-            # Quest performance
             quest_performance = {}
-            for evaluation in evaluations:
-                quest_name = evaluation.quest.name
-                if quest_name not in quest_performance:
-                    quest_performance[quest_name] = {
-                        'total': 0,
-                        'successful': 0,
-                        'avg_score': 0,
-                        'scores': []
-                    }
-                quest_performance[quest_name]['total'] += 1
-                quest_performance[quest_name]['scores'].append(eval.numeric_score)
-                if evaluation.execution_success:
-                    quest_performance[quest_name]['successful'] += 1
+            for row_quest_name, grade, count, successful, group_score in groups:
+                group_score = float(group_score or 0)
+                
+                total_evaluations += count
+                successful_evals += successful
+                score_total += group_score
+                
+                score_distribution[grade] = score_distribution.get(grade, 0) + count
+                
+                quest_data = quest_performance.setdefault(
+                    row_quest_name, {'total': 0, 'successful': 0, 'score_total': 0.0}
+                )
+                quest_data['total'] += count
+                quest_data['score_total'] += group_score
+                quest_data['successful'] += successful
+            
+            avg_score = score_total / total_evaluations
             
             # Calculate averages
             for quest_data in quest_performance.values():
-                quest_data['avg_score'] = sum(quest_data['scores']) / len(quest_data['scores'])
+                quest_data['avg_score'] = quest_data.pop('score_total') / quest_data['total']
                 quest_data['success_rate'] = quest_data['successful'] / quest_data['total'] * 100
-                del quest_data['scores']  # Remove raw scores
             
             # Simplified: No complex pattern analysis since patterns are stored as JSON
             # Could be added later by parsing the detected_patterns JSON field
@@ -570,22 +601,8 @@ class EvaluationRepository(BaseRepository[Evaluation]):
     
     def _normalize_effort(self, effort: str) -> str:
         """Normalize implementation effort to valid constraint values"""
-        effort_lower = effort.lower() if effort else 'medium'
-        
-        if effort_lower in ['low', 'easy', 'simple']:
-            return 'Low'
-        elif effort_lower in ['high', 'hard', 'difficult', 'complex']:
-            return 'High'
-        else:
-            return 'Medium'
+        return EFFORT_ALIASES.get(effort.lower(), 'Medium') if effort else 'Medium'
     
     def _normalize_impact(self, impact: str) -> str:
         """Normalize expected impact to valid constraint values"""
-        impact_lower = impact.lower() if impact else 'medium'
-        
-        if impact_lower in ['low', 'small', 'minor']:
-            return 'Low'
-        elif impact_lower in ['high', 'large', 'major', 'significant']:
-            return 'High'
-        else:
-            return 'Medium'
\ No newline at end of file
+        return IMPACT_ALIASES.get(impact.lower(), 'Medium') if impact else 'Medium'
\ No newline at end of file
@@ -1,8 +1,12 @@
+import re
 from typing import List, Dict, Any
 
 from repositories.base_repository import BaseRepository
 from database.tables import Quest, Subcategory
 
+# Leading order index in names like "1-data-modeling"
+ORDER_PREFIX_PATTERN = re.compile(r'^(\d+)-')
+
 class QuestRepository(BaseRepository[Quest]):
     def __init__(self, session):
         super().__init__(session, Quest)
@@ -21,8 +25,7 @@ class QuestRepository(BaseRepository[Quest]):
             description = f"Quest covering {quest_data['subcategory_count']} subcategories with {quest_data['total_files']} SQL files. Estimated time: {quest_data['total_estimated_time']} minutes."
             
             # Extract order index from quest name (e.g., "1-data-modeling" -> 1)
-            import re
-            order_match = re.match(r'^(\d+)-', quest_name)
+            order_match = ORDER_PREFIX_PATTERN.match(quest_name)
             order_index = int(order_match.group(1)) if order_match else 0
             
             # Determine difficulty level based on quest name or default to intermediate
@@ -78,7 +81,7 @@ class QuestRepository(BaseRepository[Quest]):
                 sub_difficulty = difficulty_level  # Inherit from quest
                 
                 # Extract subcategory order
-                sub_order_match = re.match(r'^(\d+)-', sub_name)
+                sub_order_match = ORDER_PREFIX_PATTERN.match(sub_name)
                 sub_order = int(sub_order_match.group(1)) if sub_order_match else 0
                 
                 existing_subcategory = self.session.query(Subcategory).filter_by(
@@ -28,15 +28,17 @@ class DateTimeEncoder(json.JSONEncoder):
         if isinstance(obj, datetime):
             return obj.isoformat()
         return super(DateTimeEncoder, self).default(obj)
-from typing import List, Optional, Dict, Any, Set
+from typing import List, Optional, Dict, Any, Set, Tuple
 from dataclasses import dataclass
 
-from core.evaluators import QuestEvaluator
+from core.evaluators import QuestEvaluator, configure_logging
+from utils.discovery import iter_sql_files
 from config import ProjectFolderConfig, EvaluationConfig
 from database.manager import DatabaseManager
 from database.tables import EvaluationBase
 from repositories.sql_file_repository import SQLFileRepository
 from repositories.evaluation_repository import EvaluationRepository
+from reporting.mart import AnalyticsViewManager
 
 
 async def evaluate(target: str, config: EvaluationConfig) -> Dict[str, Any]:
@@ -53,33 +55,28 @@ async def evaluate(target: str, config: EvaluationConfig) -> Dict[str, Any]:
     
     is_quests_root = target_path.is_dir() and (target_path == ProjectFolderConfig().quests_dir or target_path.name == "quests")
     is_quest_dir = target_path.is_dir() and "quests/" in str(target_path) and target_path.name.startswith(('1-', '2-', '3-', '4-', '5-'))
-    is_subcategory_dir = target_path.is_dir() and "quests/" in str(target_path) and any(sql_file.exists() for sql_file in target_path.rglob("*.sql"))
+    is_subcategory_dir = target_path.is_dir() and "quests/" in str(target_path) and next(iter_sql_files(target_path), None) is not None
     is_sql_file = target_path.is_file() and target.endswith(".sql")
     
     if target == "all":
         print("🚀 Starting complete evaluation with quest-level parallelism")
-        return await evaluator.evaluate_all()
+        result = await evaluator.evaluate_all()
+        _refresh_analytics()
+        return result
     
     elif is_quests_root:
         print(f"📁 Evaluating all quests in directory: {target}")
-        return await evaluator.evaluate_all_in_directory(target_path)
+        result = await evaluator.evaluate_all_in_directory(target_path)
+        _refresh_analytics()
+        return result
     
     elif is_quest_dir:
         print(f"📁 Evaluating quest directory: {target}")
         result = await evaluator.evaluate_quest(target_path)
         
-        # Save each evaluation result to database
+        # Save all evaluation results in one session and transaction
         if "files" in result and isinstance(result["files"], list):
-            saved_count = 0
-            for file_result in result["files"]:
-                if isinstance(file_result, dict) and "metadata" in file_result:
-                    # Extract file path from metadata
-                    metadata = file_result["metadata"]
-                    if "full_path" in metadata:
-                        file_path = metadata["full_path"]
-                        success = await save_evaluation_to_database(file_path, file_result)
-                        if success:
-                            saved_count += 1
+            saved_count = await save_evaluations_to_database(_collect_file_results(result["files"]))
             
             if saved_count > 0:
                 print(f"💾 Saved {saved_count} quest evaluations to database successfully")
@@ -90,18 +87,9 @@ async def evaluate(target: str, config: EvaluationConfig) -> Dict[str, Any]:
         print(f"📁 Evaluating subcategory directory: {target}")
         result = await evaluator.evaluate_quest(target_path)
         
-        # Save each evaluation result to database
+        # Save all evaluation results in one session and transaction
         if "files" in result and isinstance(result["files"], list):
-            saved_count = 0
-            for file_result in result["files"]:
-                if isinstance(file_result, dict) and "metadata" in file_result:
-                    # Extract file path from metadata
-                    metadata = file_result["metadata"]
-                    if "full_path" in metadata:
-                        file_path = metadata["full_path"]
-                        success = await save_evaluation_to_database(file_path, file_result)
-                        if success:
-                            saved_count += 1
+            saved_count = await save_evaluations_to_database(_collect_file_results(result["files"]))
             
             if saved_count > 0:
                 print(f"💾 Saved {saved_count} evaluations to database successfully")
@@ -135,8 +123,30 @@ async def evaluate(target: str, config: EvaluationConfig) -> Dict[str, Any]:
     else:
         raise ValueError(f"Invalid target: {target}")
 
+def _refresh_analytics(db_manager: Optional[DatabaseManager] = None):
+    """Refresh the materialized dashboards after new evaluations were stored"""
+    try:
+        db_manager = db_manager or DatabaseManager(EvaluationBase, database_type="evaluator")
+        AnalyticsViewManager(db_manager).refresh_in_background()
+    except Exception as e:
+        print(f"⚠️  Could not refresh analytics views: {e}")
+
+def _collect_file_results(file_results: List[Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Pair each evaluation result with the file path recorded in its metadata"""
+    return [
+        (file_result["metadata"]["full_path"], file_result)
+        for file_result in file_results
+        if isinstance(file_result, dict) and "full_path" in file_result.get("metadata", {})
+    ]
+
 async def save_evaluation_to_database(file_path: str, evaluation_result: Dict[str, Any]) -> bool:
     """Save evaluation result to database with proper error handling"""
+    return await save_evaluations_to_database([(file_path, evaluation_result)]) == 1
+
+async def save_evaluations_to_database(items: List[Tuple[str, Dict[str, Any]]]) -> int:
+    """Save evaluation results through one database manager, session and commit"""
+    if not items:
+        return 0
     try:
         # Initialize database connection
         db_manager = DatabaseManager(EvaluationBase, database_type="evaluator")
@@ -147,37 +157,44 @@ async def save_evaluation_to_database(file_path: str, evaluation_result: Dict[st
             sql_file_repo = SQLFileRepository(session)
             evaluation_repo = EvaluationRepository(session)
             
-            # Ensure SQL file exists in database (create if needed)
-            sql_file = sql_file_repo.get_or_create(file_path)
-            if not sql_file:
-                print(f"❌ Could not create/find SQL file record for: {file_path}")
-                return False
-            
-            # Prepare evaluation data for storage
-            evaluation_data = {
-                'file_path': sql_file.file_path,  # Use normalized path from database
-                'llm_analysis': evaluation_result.get('llm_analysis', {}),
-                'execution': evaluation_result.get('execution', {}),
-                'metadata': evaluation_result.get('metadata', {}),
-                'intent': evaluation_result.get('intent', {}),
-                'evaluated_at': evaluation_result.get('evaluated_at')
-            }
+            saved = []
+            for file_path, evaluation_result in items:
+                # Ensure SQL file exists in database (create if needed)
+                sql_file = await sql_file_repo.get_or_create(file_path)
+                if not sql_file:
+                    print(f"❌ Could not create/find SQL file record for: {file_path}")
+                    continue
+                
+                # Prepare evaluation data for storage
+                evaluation_data = {
+                    'file_path': sql_file.file_path,  # Use normalized path from database
+                    'llm_analysis': evaluation_result.get('llm_analysis', {}),
+                    'execution': evaluation_result.get('execution', {}),
+                    'metadata': evaluation_result.get('metadata', {}),
+                    'intent': evaluation_result.get('intent', {}),
+                    'evaluated_at': evaluation_result.get('evaluated_at')
+                }
+                
+                # Stage the evaluation; everything is committed together below
+                evaluation = evaluation_repo.upsert_evaluation(evaluation_data, commit=False)
+                if evaluation:
+                    saved.append(sql_file.id)
+                else:
+                    print(f"❌ Failed to save evaluation for {file_path}")
             
-            # Save evaluation to database
-            evaluation = evaluation_repo.upsert_evaluation(evaluation_data)
-            if evaluation:
-                print(f"✅ Evaluation saved for file ID {sql_file.id}")
-                return True
-            else:
-                print(f"❌ Failed to save evaluation")
-                return False
+            session.commit()
+            for sql_file_id in saved:
+                print(f"✅ Evaluation saved for file ID {sql_file_id}")
+            if saved:
+                _refresh_analytics(db_manager)
+            return len(saved)
                 
         finally:
             session.close()
             
     except Exception as e:
         print(f"❌ Error saving evaluation to database: {e}")
-        return False
+        return 0
 
 def main():
     """Main function with command line interface"""
@@ -211,6 +228,8 @@ def main():
     print(f"   Caching: {'disabled' if args.no_cache else 'enabled'}")
     print(f"   Skip unchanged: {'disabled' if args.force else 'enabled'}")
     
+    listener = configure_logging()
+    
     try:
         # Run evaluation
         result = asyncio.run(evaluate(args.target, config))
@@ -229,6 +248,8 @@ def main():
     except Exception as e:
         print(f"❌ Evaluation failed: {e}")
         sys.exit(1)
+    finally:
+        listener.stop()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
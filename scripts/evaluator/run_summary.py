@@ -395,8 +395,18 @@ def main():
     parser = argparse.ArgumentParser(description="Generate SQL evaluation summary report using analytics database")
     parser.add_argument("--print", action="store_true", help="Print the summary to console")
     parser.add_argument("--save", metavar="FILE", help="Save the summary report to a JSON file")
+    parser.add_argument("--export", nargs=2, metavar=("VIEW", "FILE"),
+                        help="Export an analytics view (e.g. quest_performance) to a CSV file")
     args = parser.parse_args()
 
+    if args.export:
+        view_name, output_file = args.export
+        analytics = AnalyticsViewManager(DatabaseManager(EvaluationBase, database_type="evaluator"))
+        with open(output_file, 'wb') as f:
+            if analytics.export_view_csv(view_name, f):
+                print(f"✅ {view_name} exported to: {output_file}")
+        return
+
     print("🔍 Loading evaluations...")
     report = generate_summary_report()
 
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import evaluator modules the same way the entry-point scripts do
+sys.path.insert(0, str(Path(__file__).parent.parent.resolve()))
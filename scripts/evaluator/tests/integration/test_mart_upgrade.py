@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+DATABASE_URL = os.getenv("TEST_EVALUATOR_DATABASE_URL")
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL, reason="set TEST_EVALUATOR_DATABASE_URL to a disposable PostgreSQL database"
+)
+
+
+def test_create_analytics_views_upgrades_baseline_schema():
+    from sqlalchemy import text
+
+    from database.manager import DatabaseManager
+    from database.tables import EvaluationBase
+    from reporting.mart import AnalyticsViewManager
+
+    db_manager = DatabaseManager(EvaluationBase, connection_string=DATABASE_URL)
+    with db_manager.engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE; CREATE SCHEMA public"))
+    EvaluationBase.metadata.create_all(bind=db_manager.engine)
+
+    # Recreate the baseline layout: JSON pattern storage read by plain views
+    with db_manager.engine.begin() as conn:
+        conn.execute(text("""
+            ALTER TABLE evaluations DROP COLUMN pattern_count;
+            DROP INDEX IF EXISTS idx_evaluation_patterns;
+            ALTER TABLE evaluations ALTER COLUMN detected_patterns TYPE json USING detected_patterns::json;
+            CREATE VIEW evaluation_summary AS
+                SELECT e.id, COALESCE(json_array_length(e.detected_patterns), 0) AS pattern_count
+                FROM evaluations e;
+            CREATE VIEW pattern_analysis AS
+                SELECT p.id FROM sql_patterns p, evaluations e
+                WHERE e.detected_patterns::text LIKE '%"' || p.name || '"%';
+        """))
+
+    assert AnalyticsViewManager(db_manager).create_analytics_views()
+    with db_manager.engine.connect() as conn:
+        data_type = conn.execute(text("""
+            SELECT data_type FROM information_schema.columns
+            WHERE table_name = 'evaluations' AND column_name = 'detected_patterns'
+        """)).scalar()
+    assert data_type == "jsonb"
@@ -0,0 +1,57 @@
+import os
+
+from utils.cache import (
+    _get_content_key,
+    _load_content_cached,
+    _lookup_stat_key,
+    _open_stat_index,
+    _record_stat_key,
+    _save_content_cached,
+)
+
+
+def test_content_cache_miss_then_hit(tmp_path):
+    key = _get_content_key(b"SELECT 1;", "1:model")
+    assert _load_content_cached(tmp_path, key) is None
+
+    _save_content_cached(tmp_path, key, b'{"ok": true}')
+    assert _load_content_cached(tmp_path, key) == b'{"ok": true}'
+
+
+def test_content_key_changes_with_content_and_version():
+    key = _get_content_key(b"SELECT 1;", "1:model")
+    assert key == _get_content_key(b"SELECT 1;", "1:model")
+    assert key != _get_content_key(b"SELECT 2;", "1:model")
+    assert key != _get_content_key(b"SELECT 1;", "2:model")
+
+
+def test_stat_index_hit_for_unchanged_file(tmp_path):
+    index = _open_stat_index(tmp_path / "cache")
+    sql_file = tmp_path / "query.sql"
+    sql_file.write_text("SELECT 1;")
+    stat = sql_file.stat()
+
+    assert _lookup_stat_key(index, sql_file, stat, "1:model") is None
+    _record_stat_key(index, sql_file, stat, "1:model", "abc")
+    assert _lookup_stat_key(index, sql_file, sql_file.stat(), "1:model") == "abc"
+
+
+def test_stat_index_invalidated_by_change_or_version(tmp_path):
+    index = _open_stat_index(tmp_path / "cache")
+    sql_file = tmp_path / "query.sql"
+    sql_file.write_text("SELECT 1;")
+    _record_stat_key(index, sql_file, sql_file.stat(), "1:model", "abc")
+
+    assert _lookup_stat_key(index, sql_file, sql_file.stat(), "2:model") is None
+
+    sql_file.write_text("SELECT 10;")
+    stat = sql_file.stat()
+    os.utime(sql_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert _lookup_stat_key(index, sql_file, sql_file.stat(), "1:model") is None
+
+
+def test_stat_index_is_optional(tmp_path):
+    sql_file = tmp_path / "query.sql"
+    sql_file.write_text("SELECT 1;")
+    _record_stat_key(None, sql_file, sql_file.stat(), "1:model", "abc")
+    assert _lookup_stat_key(None, sql_file, sql_file.stat(), "1:model") is None
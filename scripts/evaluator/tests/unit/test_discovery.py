@@ -0,0 +1,32 @@
+import pytest
+
+from utils.discovery import BASIC_KEYWORDS, MetadataExtractor
+
+
+def substring_patterns(content):
+    """The per-keyword substring checks the fused scan must agree with"""
+    found = {keyword for keyword in BASIC_KEYWORDS if keyword in content.lower()}
+    patterns = []
+    for label, present in (
+        ('SELECT', 'select' in found),
+        ('JOIN', 'join' in found),
+        ('GROUP BY', 'group by' in found),
+        ('Window Functions', 'window' in found or 'over' in found),
+        ('CTE', 'with' in found and 'as' in found),
+        ('JSON Operations', 'json' in found),
+        ('Recursive CTE', 'recursive' in found),
+    ):
+        if present:
+            patterns.append(label)
+    return patterns
+
+
+@pytest.mark.parametrize("content", [
+    "aselect",
+    "SELECT * FROM t",
+    "WITH RECURSIVE tree AS (SELECT 1) SELECT * FROM tree",
+    "select json_agg(x) over (partition by y) from t join u using (id) group by 1",
+    "-- nothing to see",
+])
+def test_extract_patterns_matches_substring_checks(content):
+    assert MetadataExtractor.extract_patterns(content) == substring_patterns(content)
@@ -0,0 +1,68 @@
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from repositories import evaluation_repository
+from repositories.evaluation_repository import EvaluationRepository
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    monkeypatch.setattr(evaluation_repository, "_stats_cache", evaluation_repository.OrderedDict())
+    repo = EvaluationRepository.__new__(EvaluationRepository)
+    repo.session = FakeSession()
+    return repo
+
+
+def test_stats_cache_hit_and_sentinel_miss(repo):
+    repo._store_stats(("db", "analytics"), (1, 1), {"summary": 1})
+    assert repo._get_cached_stats(("db", "analytics"), (1, 1)) == {"summary": 1}
+    assert repo._get_cached_stats(("db", "analytics"), (2, 2)) is None
+
+
+def test_stats_cache_expires_after_ttl(repo, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(evaluation_repository.time, "monotonic", lambda: now[0])
+    repo._store_stats(("db", "analytics"), (1, 1), {"summary": 1})
+
+    now[0] += evaluation_repository.ANALYTICS_CACHE_TTL_SECONDS
+    assert repo._get_cached_stats(("db", "analytics"), (1, 1)) is None
+    assert ("db", "analytics") not in evaluation_repository._stats_cache
+
+
+def test_stats_cache_evicts_least_recently_used(repo, monkeypatch):
+    monkeypatch.setattr(evaluation_repository, "ANALYTICS_CACHE_MAX_ENTRIES", 2)
+    repo._store_stats(("a",), (1,), {"a": 1})
+    repo._store_stats(("b",), (1,), {"b": 1})
+    repo._get_cached_stats(("a",), (1,))
+    repo._store_stats(("c",), (1,), {"c": 1})
+
+    assert list(evaluation_repository._stats_cache) == [("a",), ("c",)]
+
+
+def test_analytics_cache_hit_leaves_session_open(repo, monkeypatch):
+    monkeypatch.setattr(repo, "_evaluations_sentinel", lambda: (1, 1))
+    monkeypatch.setattr(repo, "_stats_cache_key", lambda *args: ("db",) + args)
+    repo._store_stats(("db", "analytics", None, 30), (1, 1), {"summary": 1})
+
+    assert repo.get_evaluation_analytics() == {"summary": 1}
+    assert not repo.session.closed
+
+
+def test_analytics_cache_hit_is_a_copy(repo, monkeypatch):
+    monkeypatch.setattr(repo, "_evaluations_sentinel", lambda: (1, 1))
+    monkeypatch.setattr(repo, "_stats_cache_key", lambda *args: ("db",) + args)
+    result = {"summary": {"total_evaluations": 1}}
+    repo._store_stats(("db", "analytics", None, 30), (1, 1), result)
+    result["summary"]["total_evaluations"] = 99
+
+    repo.get_evaluation_analytics()["summary"]["total_evaluations"] = 42
+    assert repo.get_evaluation_analytics() == {"summary": {"total_evaluations": 1}}
@@ -0,0 +1,214 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pydantic_ai")
+
+from pydantic_ai.exceptions import ModelHTTPError
+
+from core import evaluators
+from core.evaluators import SQLEvaluator
+from core.models import (
+    Assessment, ComprehensiveAnalysis, EducationalReasoning, Intent, LLMAnalysis, TechnicalReasoning,
+)
+from utils.cache import _open_stat_index
+
+
+class FlakyAgent:
+    """Agent stub that fails with the given errors before succeeding"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def run(self, prompt, output_type=None, model=None):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(output="ok")
+
+
+def make_evaluator(agent) -> SQLEvaluator:
+    evaluator = SQLEvaluator.__new__(SQLEvaluator)
+    evaluator.model = None
+    evaluator.agents = {"sql_instructor": agent}
+    return evaluator
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    async def instant(delay):
+        return None
+    monkeypatch.setattr(evaluators.asyncio, "sleep", instant)
+
+
+def test_run_agent_retries_rate_limits():
+    agent = FlakyAgent(ModelHTTPError(429, "test-model"), ModelHTTPError(429, "test-model"))
+    result = asyncio.run(make_evaluator(agent)._run_agent("sql_instructor", "prompt", str))
+    assert result.output == "ok"
+    assert agent.calls == 3
+
+
+def test_run_agent_gives_up_after_max_retries():
+    agent = FlakyAgent(*[ModelHTTPError(429, "test-model") for _ in range(3)])
+    with pytest.raises(ModelHTTPError):
+        asyncio.run(make_evaluator(agent)._run_agent("sql_instructor", "prompt", str, max_retries=2))
+    assert agent.calls == 3
+
+
+def test_run_agent_does_not_retry_other_errors():
+    agent = FlakyAgent(ModelHTTPError(500, "test-model"))
+    with pytest.raises(ModelHTTPError):
+        asyncio.run(make_evaluator(agent)._run_agent("sql_instructor", "prompt", str))
+    assert agent.calls == 1
+
+
+INTENT = Intent(
+    detailed_purpose="Create a table",
+    educational_context="Data modeling",
+    real_world_applicability="Schema design",
+)
+ANALYSIS = LLMAnalysis(
+    analysis=ComprehensiveAnalysis(
+        overall_feedback="Fine",
+        difficulty_level="Beginner",
+        time_estimate="5 min",
+        technical_reasoning=TechnicalReasoning(
+            score=8, explanation="ok", syntax_quality="ok", performance_considerations="ok"
+        ),
+        educational_reasoning=EducationalReasoning(
+            score=8, explanation="ok", real_world_relevance="ok", pedagogical_value="ok"
+        ),
+    ),
+    assessment=Assessment(grade="A", score=8, overall_assessment="PASS"),
+)
+
+
+def make_cached_evaluator(tmp_path, intent_ok=True, analysis_ok=True, execution_ok=True) -> SQLEvaluator:
+    evaluator = SQLEvaluator.__new__(SQLEvaluator)
+    evaluator.model_name = "test-model"
+    evaluator.cache_enabled = True
+    evaluator.cache_dir = tmp_path / "cache"
+    evaluator.cache_hits = 0
+    evaluator._stat_index = _open_stat_index(evaluator.cache_dir)
+    evaluator.llm_calls = 0
+
+    async def execute_sql_file(file_path, sql_content=None):
+        return {"success": execution_ok, "output_content": "CREATE TABLE", "errors": 0 if execution_ok else 1}
+
+    async def analyze_intent(sql_metadata):
+        evaluator.llm_calls += 1
+        return INTENT, intent_ok
+
+    async def analyze_output(*args):
+        evaluator.llm_calls += 1
+        return ANALYSIS, analysis_ok
+
+    evaluator.execute_sql_file = execute_sql_file
+    evaluator._analyze_sql_intent = analyze_intent
+    evaluator._analyze_sql_output = analyze_output
+    return evaluator
+
+
+def write_sql(tmp_path, content="CREATE TABLE t (id INT);"):
+    sql_file = tmp_path / "quests" / "1-data-modeling" / "00-basics" / "01-table.sql"
+    sql_file.parent.mkdir(parents=True, exist_ok=True)
+    sql_file.write_text(content)
+    return sql_file
+
+
+def evaluate(evaluator, sql_file):
+    return asyncio.run(evaluator.evaluate_sql_file_raw(sql_file, persist=False))
+
+
+def test_successful_evaluation_is_cached(tmp_path):
+    evaluator = make_cached_evaluator(tmp_path)
+    sql_file = write_sql(tmp_path)
+
+    first = evaluate(evaluator, sql_file)
+    second = evaluate(evaluator, sql_file)
+
+    assert evaluator.llm_calls == 2
+    assert evaluator.cache_hits == 1
+    assert second.raw_json == first.raw_json
+
+
+def test_changed_content_misses_cache(tmp_path):
+    evaluator = make_cached_evaluator(tmp_path)
+    sql_file = write_sql(tmp_path)
+    evaluate(evaluator, sql_file)
+
+    write_sql(tmp_path, "CREATE TABLE t (id BIGINT);")
+    evaluate(evaluator, sql_file)
+
+    assert evaluator.llm_calls == 4
+    assert evaluator.cache_hits == 0
+
+
+@pytest.mark.parametrize("failure", [
+    {"intent_ok": False},
+    {"analysis_ok": False},
+    {"execution_ok": False},
+])
+def test_failed_evaluation_is_not_cached(tmp_path, failure):
+    evaluator = make_cached_evaluator(tmp_path, **failure)
+    sql_file = write_sql(tmp_path)
+
+    evaluate(evaluator, sql_file)
+    evaluate(evaluator, sql_file)
+
+    assert evaluator.llm_calls == 4
+    assert evaluator.cache_hits == 0
+
+
+def record_saves(evaluator):
+    saved = []
+
+    async def save(file_path, result):
+        saved.append((file_path, result.metadata["full_path"]))
+    evaluator._save_to_database = save
+    return saved
+
+
+def test_content_cache_hit_is_persisted(tmp_path):
+    evaluator = make_cached_evaluator(tmp_path)
+    saved = record_saves(evaluator)
+    sql_file = write_sql(tmp_path)
+    evaluate(evaluator, sql_file)
+
+    # A new mtime misses the stat index but the content key still hits
+    stat = sql_file.stat()
+    os.utime(sql_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    asyncio.run(evaluator.evaluate_sql_file_raw(sql_file))
+
+    assert evaluator.cache_hits == 1
+    assert saved == [(sql_file, str(sql_file))]
+
+
+def test_identical_content_in_other_file_is_not_shared(tmp_path):
+    evaluator = make_cached_evaluator(tmp_path)
+    sql_file = write_sql(tmp_path)
+    other_file = tmp_path / "quests" / "2-performance" / "00-basics" / "01-table.sql"
+    other_file.parent.mkdir(parents=True)
+    other_file.write_text(sql_file.read_text())
+
+    evaluate(evaluator, sql_file)
+    outcome = evaluate(evaluator, other_file)
+
+    assert evaluator.cache_hits == 0
+    assert outcome.model.metadata["full_path"] == str(other_file)
+    assert outcome.model.metadata["quest"] == "2-performance"
+
+
+def test_stat_index_hit_is_persisted(tmp_path):
+    evaluator = make_cached_evaluator(tmp_path)
+    saved = record_saves(evaluator)
+    sql_file = write_sql(tmp_path)
+    evaluate(evaluator, sql_file)
+
+    asyncio.run(evaluator.evaluate_sql_file_raw(sql_file))
+
+    assert evaluator.cache_hits == 1
+    assert saved == [(sql_file, str(sql_file))]
@@ -0,0 +1,66 @@
+import pytest
+
+from database.manager import REPEATED_STATEMENT_PREVIEW, _append_statement_output, _safe_split_sql
+
+
+def run_inserts(count: int, **kwargs):
+    output, run = [], {}
+    for i in range(count):
+        stmt = f"INSERT INTO users VALUES ({i})"
+        _append_statement_output(output, run, stmt, [f"Statement executed: {stmt}", "Rows affected: 1"], 1, **kwargs)
+    return output
+
+
+def test_statement_output_is_complete_by_default():
+    output = run_inserts(10)
+    assert len(output) == 20
+    assert output[-2] == "Statement executed: INSERT INTO users VALUES (9)"
+    assert not any(line.startswith("...") for line in output)
+
+
+def test_fold_collapses_long_dml_runs():
+    output = run_inserts(10, fold=True)
+    assert len(output) == 2 * REPEATED_STATEMENT_PREVIEW + 1
+    assert output[-1] == (
+        f"... and {10 - REPEATED_STATEMENT_PREVIEW} more INSERT INTO users statements "
+        f"({10 - REPEATED_STATEMENT_PREVIEW} rows affected)"
+    )
+
+
+def test_fold_restarts_on_a_new_target():
+    output, run = [], {}
+    for stmt in ["INSERT INTO a VALUES (1)"] * 5 + ["INSERT INTO b VALUES (1)"]:
+        _append_statement_output(output, run, stmt, [stmt], 1, fold=True)
+    assert output[-1] == "INSERT INTO b VALUES (1)"
+    assert sum(line.startswith("...") for line in output) == 1
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT 1; SELECT 2;", ["SELECT 1", "SELECT 2"]),
+    ("SELECT 1;;\n  ; SELECT 2", ["SELECT 1", "SELECT 2"]),
+    ("SELECT 'a;b'; SELECT 2", ["SELECT 'a;b'", "SELECT 2"]),
+    ('SELECT "odd;name" FROM t; SELECT 2', ['SELECT "odd;name" FROM t', "SELECT 2"]),
+    ("SELECT 'it''s; fine'; SELECT 2", ["SELECT 'it''s; fine'", "SELECT 2"]),
+    (r"SELECT E'it\'s; x'; SELECT 2;", [r"SELECT E'it\'s; x'", "SELECT 2"]),
+    (r"SELECT e'a\\'; SELECT 2", [r"SELECT e'a\\'", "SELECT 2"]),
+    (r"SELECT 'C:\'; SELECT 2", [r"SELECT 'C:\'", "SELECT 2"]),
+    ("SELECT 1 -- trailing; comment\n; SELECT 2", ["SELECT 1 -- trailing; comment", "SELECT 2"]),
+    ("SELECT /* a; b */ 1; SELECT 2", ["SELECT /* a; b */ 1", "SELECT 2"]),
+    (
+        "CREATE FUNCTION f() RETURNS int AS $$ BEGIN RETURN 1; END; $$ LANGUAGE plpgsql; SELECT f()",
+        ["CREATE FUNCTION f() RETURNS int AS $$ BEGIN RETURN 1; END; $$ LANGUAGE plpgsql", "SELECT f()"],
+    ),
+    (
+        "DO $body$ BEGIN PERFORM 1; END $body$; SELECT 2",
+        ["DO $body$ BEGIN PERFORM 1; END $body$", "SELECT 2"],
+    ),
+    (
+        "CREATE RULE r AS ON INSERT TO t DO ALSO (INSERT INTO a VALUES (1); INSERT INTO b VALUES (2)); SELECT 2",
+        ["CREATE RULE r AS ON INSERT TO t DO ALSO (INSERT INTO a VALUES (1); INSERT INTO b VALUES (2))", "SELECT 2"],
+    ),
+    ("SELECT 1; SELECT (1; SELECT 2; SELECT 3;", ["SELECT 1", "SELECT (1", "SELECT 2", "SELECT 3"]),
+    ("SELECT 1); SELECT 2", ["SELECT 1)", "SELECT 2"]),
+    ("SELECT 'unterminated; SELECT 2", ["SELECT 'unterminated; SELECT 2"]),
+])
+def test_safe_split_sql(sql, expected):
+    assert _safe_split_sql(sql) == expected
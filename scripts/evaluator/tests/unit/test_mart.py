@@ -0,0 +1,156 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from reporting import mart
+from reporting.mart import AnalyticsViewManager
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.engine.statements.append(sql)
+        if "pg_extension" in sql:
+            return FakeResult([(1,)] if self.engine.has_prewarm else [])
+        if "pg_matviews" in sql:
+            return FakeResult(["mv_evaluation_summary"])
+        return FakeResult([])
+
+    def commit(self):
+        pass
+
+
+class FakeEngine:
+    def __init__(self, has_prewarm):
+        self.has_prewarm = has_prewarm
+        self.statements = []
+
+    def connect(self):
+        return FakeConnection(self)
+
+
+class FakeDatabaseManager:
+    def __init__(self, engine):
+        self.engine = engine
+
+
+def test_prewarm_skips_quietly_without_extension():
+    engine = FakeEngine(has_prewarm=False)
+    manager = AnalyticsViewManager(FakeDatabaseManager(engine))
+
+    assert manager.prewarm_materialized_views() is False
+    assert manager.prewarm_materialized_views() is False
+    assert len(engine.statements) == 1
+    assert not any("CREATE EXTENSION" in sql for sql in engine.statements)
+
+
+def test_prewarm_checks_extension_once():
+    engine = FakeEngine(has_prewarm=True)
+    manager = AnalyticsViewManager(FakeDatabaseManager(engine))
+
+    assert manager.prewarm_materialized_views() is True
+    assert manager.prewarm_materialized_views() is True
+    assert sum("pg_extension" in sql for sql in engine.statements) == 1
+    assert sum("pg_prewarm(" in sql for sql in engine.statements) == 2
+    assert not any("CREATE EXTENSION" in sql for sql in engine.statements)
+
+
+def test_views_are_dropped_before_column_migrations():
+    ddl = AnalyticsViewManager(FakeDatabaseManager(FakeEngine(has_prewarm=False))).analytics_ddl()
+    last_drop = max(i for i, sql in enumerate(ddl) if "DROP MATERIALIZED VIEW" in sql)
+    first_alter = min(i for i, sql in enumerate(ddl) if "ALTER TABLE" in sql)
+    assert last_drop < first_alter
+
+
+def test_covering_index_replaces_plain_last_evaluated_index():
+    ddl = AnalyticsViewManager(FakeDatabaseManager(FakeEngine(has_prewarm=False))).analytics_ddl()
+    assert any("idx_evaluation_recent" in sql and "INCLUDE" in sql for sql in ddl)
+    assert "DROP INDEX IF EXISTS idx_evaluation_last_evaluated" in ddl
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, payload):
+        self.store[key] = payload
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+    def scan_iter(self, match):
+        # Enough of Redis glob for a trailing '*' over an escaped literal prefix
+        prefix = re.sub(r"\\(.)", r"\1", match[:-1])
+        return [key for key in list(self.store) if key.startswith(prefix)]
+
+
+def make_cache_manager(url, redis_client=None):
+    manager = AnalyticsViewManager(FakeDatabaseManager(SimpleNamespace(url=url)))
+    manager._redis = redis_client
+    return manager
+
+
+@pytest.fixture
+def dashboard_cache(monkeypatch):
+    cache = {}
+    monkeypatch.setattr(mart, "_dashboard_cache", cache)
+    return cache
+
+
+def test_in_process_hit_returns_a_copy(dashboard_cache):
+    manager = make_cache_manager("postgresql://h/db")
+    manager._cached("dash:v1", lambda: {"summary": {"total": 1}})["summary"]["total"] = 99
+
+    hit = manager._cached("dash:v1", lambda: {"summary": {"total": 2}})
+    hit["summary"]["total"] = 42
+    assert manager._cached("dash:v1", lambda: {})["summary"]["total"] == 1
+
+
+def test_expired_entries_are_evicted_on_write(dashboard_cache, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(mart.time, "monotonic", lambda: now[0])
+    manager = make_cache_manager("postgresql://h/db")
+    manager._cached("cs:1", lambda: {"state": 1})
+
+    now[0] += mart.DASHBOARD_CACHE_TTL_SECONDS
+    manager._cached("cs:2", lambda: {"state": 2})
+    assert [key for _, key in dashboard_cache] == ["cs:2"]
+
+
+def test_redis_keys_are_scoped_by_database():
+    shared = FakeRedis()
+    first = make_cache_manager("postgresql://u:***@h/first", shared)
+    second = make_cache_manager("postgresql://u:***@h/second", shared)
+
+    first._cached("det:q:30", lambda: {"db": "first"})
+    assert second._cached("det:q:30", lambda: {"db": "second"}) == {"db": "second"}
+
+    first.invalidate_cache()
+    assert list(shared.store) == ["postgresql://u:***@h/second|det:q:30"]
@@ -0,0 +1,18 @@
+import pytest
+from pydantic import ValidationError
+
+from core.models import Assessment
+
+
+def test_assessment_cleans_decorated_values():
+    assessment = Assessment.model_validate({"grade": "🅰️ Grade A", "score": 8, "overall_assessment": "✅ pass"})
+    assert assessment.grade == "A"
+    assert assessment.overall_assessment == "PASS"
+
+
+@pytest.mark.parametrize("field", ["grade", "overall_assessment"])
+def test_assessment_rejects_unhashable_values(field):
+    data = {"grade": "A", "score": 8, "overall_assessment": "PASS"}
+    data[field] = [data[field]]
+    with pytest.raises(ValidationError):
+        Assessment.model_validate(data)
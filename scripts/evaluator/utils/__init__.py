@@ -4,12 +4,14 @@ Utility components for SQL Adventure AI Evaluator
 
 from .discovery import (
     MetadataExtractor,
+    SQLFileContext,
     discover_sql_file_context,
     discover_subcategory_context,
     discover_quest_context,
     discover_quests,
     get_quest_structure,
-    find_sql_file_by_path
+    find_sql_file_by_path,
+    detect_sql_patterns
 )
 from .pattern_data import SQL_PATTERNS
 from .summarizers import (
@@ -1,8 +1,15 @@
 import hashlib
 import json
+import os
+import sqlite3
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+try:
+    from blake3 import blake3 as _content_hasher
+except ImportError:  # blake3 is optional; blake2b is in the stdlib
+    _content_hasher = hashlib.blake2b
+
 def _get_file_hash(file_path: Path) -> str:
     """Generate hash for file change detection"""
     content = file_path.read_text()
@@ -38,4 +45,67 @@ def _save_cached_result(
     try:
         cache_path.write_text(json.dumps(result, indent=2))
     except Exception as e:
-        print(f"⚠️  Failed to cache result for {file_path}: {e}")
\ No newline at end of file
+        print(f"⚠️  Failed to cache result for {file_path}: {e}")
+
+def _get_content_key(content: bytes, version: str) -> str:
+    """Fingerprint file content together with the prompt version"""
+    return _content_hasher(content + version.encode()).hexdigest()
+
+def _get_content_cache_path(cache_dir: Path, key: str) -> Path:
+    """Get content-addressed cache path, sharded by key prefix"""
+    return cache_dir / key[:2] / f"{key[2:]}.json"
+
+def _load_content_cached(cache_dir: Path, key: str) -> Optional[bytes]:
+    """Load raw cached JSON for a content key, if present"""
+    try:
+        return _get_content_cache_path(cache_dir, key).read_bytes()
+    except OSError:
+        return None
+
+def _save_content_cached(cache_dir: Path, key: str, payload: bytes):
+    """Atomically write cached JSON for a content key"""
+    cache_path = _get_content_cache_path(cache_dir, key)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"⚠️  Failed to cache result for key {key[:12]}: {e}")
+
+def _open_stat_index(cache_dir: Path) -> Optional[sqlite3.Connection]:
+    """Open the (path, mtime, size) -> content key index kept beside the cache"""
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(cache_dir / "stat_index.db", isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS stat_index ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, version TEXT, content_key TEXT)"
+        )
+        return conn
+    except sqlite3.Error as e:
+        print(f"⚠️  Stat index unavailable, falling back to content hashing: {e}")
+        return None
+
+def _lookup_stat_key(conn: Optional[sqlite3.Connection], file_path: Path, stat: os.stat_result, version: str) -> Optional[str]:
+    """Return the content key recorded for an unchanged file, without reading it"""
+    if conn is None:
+        return None
+    row = conn.execute(
+        "SELECT content_key FROM stat_index WHERE path = ? AND mtime_ns = ? AND size = ? AND version = ?",
+        (str(file_path), stat.st_mtime_ns, stat.st_size, version)
+    ).fetchone()
+    return row[0] if row else None
+
+def _record_stat_key(conn: Optional[sqlite3.Connection], file_path: Path, stat: os.stat_result, version: str, key: str):
+    """Remember which content key a file's current (mtime, size) maps to"""
+    if conn is None:
+        return
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO stat_index (path, mtime_ns, size, version, content_key) VALUES (?, ?, ?, ?, ?)",
+            (str(file_path), stat.st_mtime_ns, stat.st_size, version, key)
+        )
+    except sqlite3.Error as e:
+        print(f"⚠️  Failed to update stat index for {file_path}: {e}")
@@ -9,6 +9,8 @@ from typing import List, Tuple, Dict, Any
 from collections import Counter
 from enum import Enum
 
+from .discovery import iter_sql_files
+
 # Difficulty level constants
 LEVEL_KEYWORDS = {
     'beginner': ['beginner', '🟢', 'green'],
@@ -61,7 +63,7 @@ def determine_quest_difficulty(
     """
     # 1) Always check for global override first
     if MetadataExtractor:
-        for sql_file in quest_dir.rglob('*.sql'):
+        for sql_file in map(Path, iter_sql_files(quest_dir)):
             try:
                 meta = MetadataExtractor.parse_header(
                     sql_file.read_text(encoding='utf-8', errors='ignore')
@@ -95,7 +97,7 @@ def collect_difficulty_data(quest_dir: Path, default: str, infer_difficulty, dis
         sub_dir = quest_dir / sub_name
         sub_levels = []
         sub_level_strings = []
-        for sql_file in sub_dir.rglob('*.sql'):
+        for sql_file in map(Path, iter_sql_files(sub_dir)):
             data['file_count'] += 1
             lvl_str = infer_difficulty(sql_file, default)
             level_score = LEVEL_ORDER.get(lvl_str, LEVEL_ORDER[default])
@@ -162,13 +164,16 @@ def apply_difficulty_strategy(
         quest_value = round(percentile_score)
         return ORDER_LEVEL.get(quest_value, default)
     elif strategy == DifficultyStrategy.WEIGHTED_COMPLEXITY:
+        # Count once instead of rescanning levels for max/min/count per element
+        level_counts = Counter(levels)
+        highest, lowest = max(level_counts), min(level_counts)
         weighted_sum = 0
         total_weight = 0
         for level in levels:
             weight = 1.0
-            if level == max(levels) and levels.count(level) == 1:
+            if level == highest and level_counts[level] == 1:
                 weight = 0.5
-            elif level == min(levels) and levels.count(level) == 1:
+            elif level == lowest and level_counts[level] == 1:
                 weight = 0.7
             weighted_sum += level * weight
             total_weight += weight
@@ -7,12 +7,53 @@ Returns structured data for database sync or evaluation
 import os
 import re
 import hashlib
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Tuple, Any, Optional
+from typing import List, Dict, Tuple, Any, Optional, Iterator, Union
+
+from .pattern_data import SQL_PATTERNS
+
+try:
+    import re2  # google-re2: linear-time DFA matching, no catastrophic backtracking
+except ImportError:
+    re2 = None
+
+
+def _compile_scanner(pattern: str):
+    """Compile a case-insensitive content scanner, preferring RE2 when installed."""
+    if re2 is not None:
+        try:
+            return re2.compile(f"(?i){pattern}")
+        except Exception:
+            pass  # Unsupported syntax (e.g. lookarounds); use the backtracking engine
+    return re.compile(pattern, re.IGNORECASE)
 
 # Regex pattern for parsing SQL comment headers
 HEADER_PATTERN = re.compile(r"^--\s*(?P<key>\w+):\s*(?P<value>.+)$", re.IGNORECASE)
 
+# Time estimates like "(10-15 min)" or "(20 min)" in difficulty headers
+TIME_RANGE_PATTERN = re.compile(r'\((\d+)-(\d+)\s*min\)', re.IGNORECASE)
+SINGLE_TIME_PATTERN = re.compile(r'\((\d+)\s*min\)', re.IGNORECASE)
+
+# Numbered quest/subcategory directories like "1-data-modeling" or "00-basic-concepts"
+NUMBERED_DIR_PATTERN = re.compile(r'^\d+-')
+
+# Keywords behind MetadataExtractor.extract_patterns, fused into one alternation.
+# The zero-width lookahead tries every offset, so overlapping keywords (the "as"
+# in "aselect") do not hide each other, matching plain substring checks
+BASIC_KEYWORDS = ('select', 'join', 'group by', 'window', 'over', 'with', 'as', 'json', 'recursive')
+BASIC_KEYWORD_PATTERN = re.compile(
+    '(?=(' + '|'.join(re.escape(k) for k in BASIC_KEYWORDS) + '))'
+)
+
+# Pattern catalog regexes, compiled once at import
+COMPILED_SQL_PATTERNS = [
+    (pattern["name"], pattern["display_name"], pattern["category"], _compile_scanner(pattern["regex_pattern"]))
+    for pattern in SQL_PATTERNS
+    if pattern.get("regex_pattern")
+]
+
 
 class MetadataExtractor:
     """Extract metadata from SQL file headers."""
@@ -39,23 +80,28 @@ class MetadataExtractor:
     @staticmethod
     def extract_patterns(content: str) -> List[str]:
         """Extract SQL patterns from content."""
-        patterns = []
-        content_lower = content.lower()
+        # Single pass over the content collecting every keyword that occurs
+        found = set()
+        for match in BASIC_KEYWORD_PATTERN.finditer(content.lower()):
+            found.add(match.group(1))
+            if len(found) == len(BASIC_KEYWORDS):
+                break
 
         # Basic pattern detection
-        if 'select' in content_lower:
+        patterns = []
+        if 'select' in found:
             patterns.append('SELECT')
-        if 'join' in content_lower:
+        if 'join' in found:
             patterns.append('JOIN')
-        if 'group by' in content_lower:
+        if 'group by' in found:
             patterns.append('GROUP BY')
-        if 'window' in content_lower or 'over' in content_lower:
+        if 'window' in found or 'over' in found:
             patterns.append('Window Functions')
-        if 'with' in content_lower and 'as' in content_lower:
+        if 'with' in found and 'as' in found:
             patterns.append('CTE')
-        if 'json' in content_lower:
+        if 'json' in found:
             patterns.append('JSON Operations')
-        if 'recursive' in content_lower:
+        if 'recursive' in found:
             patterns.append('Recursive CTE')
 
         return patterns
@@ -68,10 +114,13 @@ class MetadataExtractor:
     @staticmethod
     def count_significant_lines(content: str) -> int:
         """Count lines that contain actual SQL code (excluding comments)."""
-        return len([
-            line for line in content.splitlines()
-            if line.strip() and not line.strip().startswith('--')
-        ])
+        # One lstrip per line and no intermediate list
+        count = 0
+        for line in content.splitlines():
+            stripped = line.lstrip()
+            if stripped and not stripped.startswith('--'):
+                count += 1
+        return count
 
     @staticmethod
     def estimate_time_from_difficulty(difficulty: str) -> int:
@@ -79,15 +128,13 @@ class MetadataExtractor:
         difficulty_lower = difficulty.lower()
 
         # Extract time from patterns like "(10-15 min)" or "(20 min)"
-        time_pattern = r'\((\d+)-(\d+)\s*min\)'
-        match = re.search(time_pattern, difficulty, re.IGNORECASE)
+        match = TIME_RANGE_PATTERN.search(difficulty)
         if match:
             min_time = int(match.group(1))
             max_time = int(match.group(2))
             return (min_time + max_time) // 2
 
-        single_time_pattern = r'\((\d+)\s*min\)'
-        match = re.search(single_time_pattern, difficulty, re.IGNORECASE)
+        match = SINGLE_TIME_PATTERN.search(difficulty)
         if match:
             return int(match.group(1))
 
@@ -104,6 +151,139 @@ class MetadataExtractor:
             return 15
 
 
+def _build_hyperscan_database():
+    """Compile the whole pattern catalog into one Hyperscan database, if available."""
+    try:
+        import hyperscan
+    except ImportError:
+        return None
+
+    expressions = [
+        pattern["regex_pattern"].encode('utf-8')
+        for pattern in SQL_PATTERNS
+        if pattern.get("regex_pattern")
+    ]
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions),
+        )
+        return database
+    except Exception as e:
+        print(f"⚠️  Hyperscan compile failed, using per-pattern regex scanning: {e}")
+        return None
+
+
+def _on_hyperscan_match(pattern_id, start, end, flags, context):
+    """Record which catalog pattern matched; returning None continues the scan."""
+    context.add(pattern_id)
+
+
+# Optional multi-pattern engine: scans each file once for all catalog patterns
+HYPERSCAN_DATABASE = _build_hyperscan_database()
+
+
+def iter_sql_files(root: Union[str, Path]) -> Iterator[str]:
+    """
+    Recursively yield paths of .sql files under root.
+    Uses an os.scandir walk, which avoids the per-entry stat and Path
+    construction overhead of Path.rglob on large quest trees.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith('.sql'):
+                        yield entry.path
+        except OSError:
+            continue
+
+
+def detect_sql_patterns(content: str) -> List[Tuple[str, str, str]]:
+    """
+    Detect catalog SQL patterns in file content.
+
+    Returns:
+        List of (pattern_name, display_name, category) tuples
+    """
+    if HYPERSCAN_DATABASE is not None:
+        # One pass over the content reports every catalog pattern that matches
+        matched = set()
+        HYPERSCAN_DATABASE.scan(
+            content.encode('utf-8'), match_event_handler=_on_hyperscan_match, context=matched
+        )
+        return [
+            (name, display_name, category)
+            for idx, (name, display_name, category, _) in enumerate(COMPILED_SQL_PATTERNS)
+            if idx in matched
+        ]
+
+    return [
+        (name, display_name, category)
+        for name, display_name, category, regex in COMPILED_SQL_PATTERNS
+        if regex.search(content)
+    ]
+
+
+@lru_cache(maxsize=4096)
+def _analyze_content(content_hash: str, content: str) -> Tuple[Tuple[Tuple[str, str], ...], Tuple[str, ...], int, int]:
+    """
+    Pure per-content analysis, memoized by content hash.
+    Returns immutable (metadata items, patterns, estimated minutes, significant lines).
+    """
+    metadata = MetadataExtractor.parse_header(content)
+    return (
+        tuple(metadata.items()),
+        tuple(MetadataExtractor.extract_patterns(content)),
+        MetadataExtractor.estimate_time_from_difficulty(metadata.get('difficulty', '')),
+        MetadataExtractor.count_significant_lines(content),
+    )
+
+
+def clear_analysis_cache() -> None:
+    """Drop memoized content analysis (called at the start of each discovery run)."""
+    _analyze_content.cache_clear()
+
+
+# Complexity indicators by weight, shared by the time estimators
+BASIC_COMPLEXITY_PATTERNS = ('select', 'insert', 'update', 'delete', 'create table')
+INTERMEDIATE_COMPLEXITY_PATTERNS = ('join', 'group by', 'having', 'subquery', 'case when')
+ADVANCED_COMPLEXITY_PATTERNS = ('window function', 'cte', 'recursive', 'partition by', 'json')
+EXPERT_COMPLEXITY_PATTERNS = ('trigger', 'procedure', 'function', 'array_agg', 'lateral')
+
+
+@dataclass(slots=True)
+class SQLFileContext:
+    """
+    Per-file derivations computed once and shared by every content check,
+    instead of each check re-lowering and re-splitting the content.
+    """
+    content: str
+    content_lower: str = field(init=False)
+    significant_lines: int = field(init=False)
+
+    def __post_init__(self):
+        self.content_lower = self.content.lower()
+        self.significant_lines = MetadataExtractor.count_significant_lines(self.content)
+
+    def complexity_score(self, weighted_patterns: Tuple[Tuple[int, Tuple[str, ...]], ...]) -> int:
+        """Sum weights of the complexity indicators present in the content."""
+        content_lower = self.content_lower
+        return sum(
+            weight
+            for weight, patterns in weighted_patterns
+            for pattern in patterns
+            if pattern in content_lower
+        )
+
+
 def discover_sql_file_context(file_path: Path) -> Optional[Dict[str, Any]]:
     """
     Get rich context for a single SQL file.
@@ -113,23 +293,22 @@ def discover_sql_file_context(file_path: Path) -> Optional[Dict[str, Any]]:
     """
     try:
         content = file_path.read_text(encoding='utf-8', errors='ignore')
-        metadata = MetadataExtractor.parse_header(content)
-        patterns = MetadataExtractor.extract_patterns(content)
+        content_hash = MetadataExtractor.get_content_hash(content)
+        metadata_items, patterns, estimated_time, significant_lines = _analyze_content(content_hash, content)
+        metadata = dict(metadata_items)
 
         return {
             'file_path': file_path,
             'filename': file_path.name,
             'content': content,
             'metadata': metadata,
-            'patterns': patterns,
+            'patterns': list(patterns),
             'purpose': metadata.get('purpose', ''),
             'concepts': metadata.get('concepts', ''),
             'difficulty': metadata.get('difficulty', ''),
-            'estimated_time_minutes': MetadataExtractor.estimate_time_from_difficulty(
-                metadata.get('difficulty', '')
-            ),
-            'content_hash': MetadataExtractor.get_content_hash(content),
-            'significant_lines': MetadataExtractor.count_significant_lines(content),
+            'estimated_time_minutes': estimated_time,
+            'content_hash': content_hash,
+            'significant_lines': significant_lines,
             'content_length': len(content)
         }
 
@@ -200,7 +379,7 @@ def discover_quest_context(quest_path: Path) -> Dict[str, Any]:
     total_files = 0
 
     for sub_dir in sorted(quest_path.iterdir()):
-        if sub_dir.is_dir() and re.match(r'^\d+-', sub_dir.name):
+        if sub_dir.is_dir() and NUMBERED_DIR_PATTERN.match(sub_dir.name):
             sub_context = discover_subcategory_context(sub_dir)
             subcategories.append(sub_context)
 
@@ -231,10 +410,11 @@ def discover_quests(base_path: Path) -> List[Dict[str, Any]]:
         List of quest dictionaries with metadata
     """
     quests = []
+    clear_analysis_cache()
 
     # Look for numbered directories (1-data-modeling, 2-performance-tuning, etc.)
     for quest_dir in sorted(base_path.iterdir()):
-        if quest_dir.is_dir() and re.match(r'^\d+-', quest_dir.name):
+        if quest_dir.is_dir() and NUMBERED_DIR_PATTERN.match(quest_dir.name):
             quest_context = discover_quest_context(quest_dir)
             quests.append(quest_context)
 
@@ -248,9 +428,10 @@ def get_quest_structure(base_path: Path) -> Dict[str, Any]:
     Returns:
         Dictionary containing quests, subcategories, and files
     """
+    quests = discover_quests(base_path)
     return {
-        'quests': discover_quests(base_path),
-        'total_quests': len(discover_quests(base_path)),
+        'quests': quests,
+        'total_quests': len(quests),
         'base_path': base_path
     }
 
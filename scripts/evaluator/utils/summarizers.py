@@ -6,7 +6,27 @@ Provides unified summarization for quests and subcategories using dependency inj
 import asyncio
 from pathlib import Path
 from typing import List, Tuple
-from .discovery import MetadataExtractor
+from .discovery import (
+    MetadataExtractor,
+    SQLFileContext,
+    TIME_RANGE_PATTERN,
+    SINGLE_TIME_PATTERN,
+    BASIC_COMPLEXITY_PATTERNS,
+    INTERMEDIATE_COMPLEXITY_PATTERNS,
+    ADVANCED_COMPLEXITY_PATTERNS,
+    EXPERT_COMPLEXITY_PATTERNS,
+    iter_sql_files
+)
+
+
+# Complexity weights: basic 1, intermediate 2, advanced 3, expert 5 points per indicator
+SUBCATEGORY_COMPLEXITY_WEIGHTS = (
+    (1, BASIC_COMPLEXITY_PATTERNS),
+    (2, INTERMEDIATE_COMPLEXITY_PATTERNS),
+    (3, ADVANCED_COMPLEXITY_PATTERNS),
+    (5, EXPERT_COMPLEXITY_PATTERNS),
+)
+FALLBACK_COMPLEXITY_WEIGHTS = SUBCATEGORY_COMPLEXITY_WEIGHTS[:3]
 
 
 # =============================================================================
@@ -265,7 +285,7 @@ async def generate_subcategory_description_ai(subcategory_path: Path) -> str:
         return generate_subcategory_description_fallback(subcategory_path)
 
 
-async def estimate_subcategory_time(subcategory_path: Path) -> int:
+def estimate_subcategory_time(subcategory_path: Path) -> int:
     """
     Estimate the time needed to complete a subcategory based on SQL content complexity.
     
@@ -280,38 +300,15 @@ async def estimate_subcategory_time(subcategory_path: Path) -> int:
     
     for sql_file in sql_files:
         try:
-            content = sql_file.read_text(encoding='utf-8', errors='ignore')
-            
-            # Count significant lines (non-comment, non-empty)
-            significant_lines = len([
-                line for line in content.splitlines() 
-                if line.strip() and not line.strip().startswith('--')
-            ])
+            file_context = SQLFileContext(sql_file.read_text(encoding='utf-8', errors='ignore'))
             
             # Estimate based on complexity indicators
-            complexity_score = 0
-            content_lower = content.lower()
-            
-            # Basic patterns (1 point each)
-            basic_patterns = ['select', 'insert', 'update', 'delete', 'create table']
-            complexity_score += sum(1 for pattern in basic_patterns if pattern in content_lower)
-            
-            # Intermediate patterns (2 points each)
-            intermediate_patterns = ['join', 'group by', 'having', 'subquery', 'case when']
-            complexity_score += sum(2 for pattern in intermediate_patterns if pattern in content_lower)
-            
-            # Advanced patterns (3 points each)
-            advanced_patterns = ['window function', 'cte', 'recursive', 'partition by', 'json']
-            complexity_score += sum(3 for pattern in advanced_patterns if pattern in content_lower)
-            
-            # Expert patterns (5 points each)
-            expert_patterns = ['trigger', 'procedure', 'function', 'array_agg', 'lateral']
-            complexity_score += sum(5 for pattern in expert_patterns if pattern in content_lower)
+            complexity_score = file_context.complexity_score(SUBCATEGORY_COMPLEXITY_WEIGHTS)
             
             # Time estimation formula: base time + complexity + length factor
             base_time = 5  # minimum 5 minutes per file
             complexity_time = complexity_score * 2  # 2 minutes per complexity point
-            length_factor = min(20, significant_lines * 0.5)  # up to 20 minutes for length
+            length_factor = min(20, file_context.significant_lines * 0.5)  # up to 20 minutes for length
             
             file_estimated_time = int(base_time + complexity_time + length_factor)
             total_estimated_time += file_estimated_time
@@ -591,33 +588,42 @@ async def analyze_sql_file_ai(file_path: str) -> Tuple[str, int]:
         Tuple of (description, estimated_time_minutes) extracted from file headers
     """
     try:
-        # Read the SQL file content
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+        # Read the SQL file content off the event loop so concurrent callers overlap I/O
+        content = await asyncio.to_thread(_read_sql_text, file_path)
+        return _describe_sql_content(file_path, content)
+
+    except Exception as e:
+        print(f"⚠️  Metadata extraction failed for {file_path}: {e}")
+        return generate_sql_file_analysis_fallback(file_path)
+
+
+def _read_sql_text(file_path: str) -> str:
+    """Read a SQL file in one binary read and a single decode."""
+    return Path(file_path).read_bytes().decode('utf-8', errors='ignore')
 
+
+def _describe_sql_content(file_path: str, content: str, metadata: dict = None) -> Tuple[str, int]:
+    """Build (description, estimated_time_minutes) from already-read file content."""
+    if metadata is None:
         # Extract metadata from headers using the existing MetadataExtractor
         metadata = MetadataExtractor.parse_header(content)
 
-        # Extract purpose for description
-        purpose = metadata.get('purpose', '')
-        if not purpose:
-            # Fallback: generate basic description from filename
-            filename = Path(file_path).name
-            name_parts = filename.replace('.sql', '').replace('-', ' ').replace('_', ' ')
-            display_name = ' '.join(word.capitalize() for word in name_parts.split())
-            description = f"SQL exercise: {display_name}"
-        else:
-            description = purpose
+    # Extract purpose for description
+    purpose = metadata.get('purpose', '')
+    if not purpose:
+        # Fallback: generate basic description from filename
+        filename = Path(file_path).name
+        name_parts = filename.replace('.sql', '').replace('-', ' ').replace('_', ' ')
+        display_name = ' '.join(word.capitalize() for word in name_parts.split())
+        description = f"SQL exercise: {display_name}"
+    else:
+        description = purpose
 
-        # Extract time estimate from difficulty header
-        difficulty = metadata.get('difficulty', '')
-        estimated_time = extract_time_from_difficulty(difficulty)
+    # Extract time estimate from difficulty header
+    difficulty = metadata.get('difficulty', '')
+    estimated_time = extract_time_from_difficulty(difficulty)
 
-        return description, estimated_time
-
-    except Exception as e:
-        print(f"⚠️  Metadata extraction failed for {file_path}: {e}")
-        return generate_sql_file_analysis_fallback(file_path)
+    return description, estimated_time
 
 
 def extract_time_from_difficulty(difficulty_header: str) -> int:
@@ -631,11 +637,8 @@ def extract_time_from_difficulty(difficulty_header: str) -> int:
     Returns:
         Estimated time in minutes (average of range or default)
     """
-    import re
-
     # Pattern to match time ranges like "(5-10 min)" or "(10-15 min)"
-    time_pattern = r'\((\d+)-(\d+)\s*min\)'
-    match = re.search(time_pattern, difficulty_header, re.IGNORECASE)
+    match = TIME_RANGE_PATTERN.search(difficulty_header)
 
     if match:
         min_time = int(match.group(1))
@@ -644,8 +647,7 @@ def extract_time_from_difficulty(difficulty_header: str) -> int:
         return (min_time + max_time) // 2
 
     # Fallback patterns for single time values
-    single_time_pattern = r'\((\d+)\s*min\)'
-    match = re.search(single_time_pattern, difficulty_header, re.IGNORECASE)
+    match = SINGLE_TIME_PATTERN.search(difficulty_header)
 
     if match:
         return int(match.group(1))
@@ -675,38 +677,20 @@ def generate_sql_file_analysis_fallback(file_path: str) -> Tuple[str, int]:
         Tuple of (description, estimated_time_minutes)
     """
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+        file_context = SQLFileContext(_read_sql_text(file_path))
         
         # Extract filename for basic description
         filename = Path(file_path).name
         name_parts = filename.replace('.sql', '').replace('-', ' ').replace('_', ' ')
         display_name = ' '.join(word.capitalize() for word in name_parts.split())
         
-        # Basic time estimation based on content complexity
-        lines = content.splitlines()
-        significant_lines = len([line for line in lines if line.strip() and not line.strip().startswith('--')])
-        
-        # Simple complexity scoring
-        content_lower = content.lower()
-        complexity_score = 0
-        
-        # Basic patterns (1 point each)
-        basic_patterns = ['select', 'insert', 'update', 'delete', 'create table']
-        complexity_score += sum(1 for pattern in basic_patterns if pattern in content_lower)
-        
-        # Intermediate patterns (2 points each)  
-        intermediate_patterns = ['join', 'group by', 'having', 'subquery', 'case when']
-        complexity_score += sum(2 for pattern in intermediate_patterns if pattern in content_lower)
-        
-        # Advanced patterns (3 points each)
-        advanced_patterns = ['window function', 'cte', 'recursive', 'partition by', 'json']
-        complexity_score += sum(3 for pattern in advanced_patterns if pattern in content_lower)
+        # Simple complexity scoring (no expert tier in the fallback)
+        complexity_score = file_context.complexity_score(FALLBACK_COMPLEXITY_WEIGHTS)
         
         # Time estimation: base time + complexity + length factor
         base_time = 5
         complexity_time = complexity_score * 1
-        length_factor = min(15, significant_lines * 0.3)
+        length_factor = min(15, file_context.significant_lines * 0.3)
         
         estimated_time = int(base_time + complexity_time + length_factor)
         estimated_time = max(5, min(45, estimated_time))  # Bounds: 5-45 minutes
@@ -752,19 +736,15 @@ async def sync_sql_file_metadata(file_path: str, db_manager) -> bool:
         bool: True if sync successful, False otherwise
     """
     try:
-        # Extract metadata from file headers
-        description, estimated_time = await analyze_sql_file_ai(file_path)
-
-        # Read file content for hash calculation
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+        # Read the file once; the same content feeds metadata and the hash
+        content = await asyncio.to_thread(_read_sql_text, file_path)
+        metadata = MetadataExtractor.parse_header(content)
+        description, estimated_time = _describe_sql_content(file_path, content, metadata)
 
         # Calculate content hash for change detection
-        import hashlib
-        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        content_hash = MetadataExtractor.get_content_hash(content)
 
         # Extract additional metadata
-        metadata = MetadataExtractor.parse_header(content)
         concepts = metadata.get('concepts', '')
         difficulty = metadata.get('difficulty', '')
 
@@ -791,13 +771,14 @@ async def sync_sql_file_metadata(file_path: str, db_manager) -> bool:
         return False
 
 
-async def bulk_sync_sql_metadata(quest_path: Path, db_manager) -> dict:
+async def bulk_sync_sql_metadata(quest_path: Path, db_manager, max_concurrency: int = 32) -> dict:
     """
     Bulk sync all SQL file metadata for a quest using ROBUST extraction.
 
     Args:
         quest_path: Path to the quest directory
         db_manager: Database manager instance
+        max_concurrency: Maximum files synced at once
 
     Returns:
         dict: Sync statistics and results
@@ -813,21 +794,27 @@ async def bulk_sync_sql_metadata(quest_path: Path, db_manager) -> dict:
     print(f"🔄 Starting bulk metadata sync for quest: {quest_path.name}")
 
     # Find all SQL files in the quest
-    sql_files = list(quest_path.rglob('*.sql'))
+    sql_files = [Path(p) for p in iter_sql_files(quest_path)]
     stats['total_files'] = len(sql_files)
 
-    for sql_file in sql_files:
-        try:
-            success = await sync_sql_file_metadata(str(sql_file), db_manager)
-            if success:
-                stats['successful_syncs'] += 1
-            else:
-                stats['failed_syncs'] += 1
-                stats['errors'].append(f"Failed to sync {sql_file.name}")
+    # Sync files concurrently; blocking reads run in worker threads
+    semaphore = asyncio.Semaphore(max_concurrency)
 
-        except Exception as e:
+    async def sync_one(sql_file: Path) -> bool:
+        async with semaphore:
+            return await sync_sql_file_metadata(str(sql_file), db_manager)
+
+    results = await asyncio.gather(*(sync_one(f) for f in sql_files), return_exceptions=True)
+
+    for sql_file, result in zip(sql_files, results):
+        if isinstance(result, Exception):
             stats['failed_syncs'] += 1
-            stats['errors'].append(f"Error syncing {sql_file.name}: {str(e)}")
+            stats['errors'].append(f"Error syncing {sql_file.name}: {str(result)}")
+        elif result:
+            stats['successful_syncs'] += 1
+        else:
+            stats['failed_syncs'] += 1
+            stats['errors'].append(f"Failed to sync {sql_file.name}")
 
     print(f"📊 Bulk sync complete: {stats['successful_syncs']}/{stats['total_files']} files synced successfully")
     return stats
@@ -849,9 +836,10 @@ async def analyze_sql_file_ai_legacy(file_path: str) -> Tuple[str, int]:
     try:
         from core.agents import sql_file_summary_agent
 
-        # Read the SQL file content
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+        # Read the SQL file content off the event loop so concurrent callers overlap I/O
+        content = await asyncio.to_thread(
+            Path(file_path).read_text, encoding='utf-8', errors='ignore'
+        )
 
         # Extract metadata from headers
         metadata = MetadataExtractor.parse_header(content)